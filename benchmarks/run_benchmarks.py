@@ -0,0 +1,377 @@
+"""Benchmark the palletizer_core layout pipeline on a fixed corpus.
+
+The corpus is every carton in ``cartons.xml`` on every pallet in
+``pallets.xml`` plus a few synthetic small-carton cases.  For each case and
+mode (``default``, ``extended_library``, ``deep_search``) the runner times
+every generator job, the batch scorer, the even/odd sequencer and the full
+:func:`~palletizer_core.engine.build_layouts` call, records carton counts and
+the peak traced memory of the pipeline, and writes everything as JSON::
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --quick --compare bench.json
+
+``--compare`` prints speed ratios and carton-count changes against an
+earlier result file, so both speed and packing quality can be diffed
+across commits.  ``--rectpack`` additionally times the optional
+``rectpack`` packer against the built-in MaxRects engine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from packing_app.data.repository import load_cartons, load_pallets  # noqa: E402
+from palletizer_core.algorithms import pack_rectangles_dynamic  # noqa: E402
+from palletizer_core.engine import PalletInputs, build_layouts  # noqa: E402
+from palletizer_core.models import Carton, Pallet  # noqa: E402
+from palletizer_core.selector import PatternSelector, _unpack_output  # noqa: E402
+from palletizer_core.sequencer import EvenOddSequencer  # noqa: E402
+
+MODES: Dict[str, Dict[str, bool]] = {
+    "default": {},
+    "extended_library": {"extended_library": True},
+    "deep_search": {"deep_search": True},
+}
+
+# Small cartons stress the dynamic packer and the deep-search budgets.
+SYNTHETIC_CASES: List[Tuple[str, Tuple[float, float, float]]] = [
+    ("small_60x40", (60.0, 40.0, 50.0)),
+    ("small_45.5x30.2", (45.5, 30.2, 40.0)),
+    ("small_25x17", (25.0, 17.0, 20.0)),
+]
+SYNTHETIC_PALLET = "EUR1"
+
+QUICK_CARTONS = 4
+
+Case = Dict[str, object]
+
+
+def load_corpus(quick: bool = False) -> List[Case]:
+    """Return the benchmark cases in a stable order."""
+
+    pallets = load_pallets()
+    cartons = sorted(load_cartons().items())
+    if quick:
+        cartons = cartons[:QUICK_CARTONS]
+        pallets = pallets[:1]
+    cases: List[Case] = []
+    for pallet in pallets:
+        for code, dims in cartons:
+            cases.append(_case(pallet, code, dims))
+    by_name = {pallet["name"]: pallet for pallet in load_pallets()}
+    synthetic_pallet = by_name.get(SYNTHETIC_PALLET, load_pallets()[0])
+    for code, dims in SYNTHETIC_CASES:
+        cases.append(_case(synthetic_pallet, code, dims))
+    return cases
+
+
+def _case(pallet: Dict[str, object], code: str, dims) -> Case:
+    return {
+        "name": f"{pallet['name']}/{code}",
+        "pallet": [pallet["w"], pallet["l"], pallet["h"]],
+        "carton": list(dims),
+    }
+
+
+def _timed(fn: Callable, *args, repeat: int = 1, **kwargs):
+    """Return ``(result, best_seconds)`` over ``repeat`` calls."""
+
+    best = float("inf")
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def _inputs(case: Case) -> PalletInputs:
+    pallet_w, pallet_l, pallet_h = case["pallet"]
+    box_w, box_l, box_h = case["carton"]
+    return PalletInputs(
+        pallet_w=pallet_w,
+        pallet_l=pallet_l,
+        pallet_h=pallet_h,
+        box_w=box_w,
+        box_l=box_l,
+        box_h=box_h,
+        thickness=0.0,
+        spacing=0.0,
+        slip_count=0,
+        num_layers=4,
+        max_stack=1600.0,
+        include_pallet_height=False,
+    )
+
+
+def _pipeline(case: Case, options: Dict[str, bool]):
+    return build_layouts(
+        _inputs(case),
+        maximize_mixed=False,
+        center_enabled=True,
+        center_mode="Cała warstwa",
+        shift_even=False,
+        **options,
+    )
+
+
+def run_case(
+    case: Case, mode: str, *, repeat: int = 1, memory: bool = True
+) -> Dict[str, object]:
+    """Time each stage of ``mode`` on ``case`` and return the record."""
+
+    options = MODES[mode]
+    pallet = Pallet(*case["pallet"])
+    carton = Carton(*case["carton"])
+    selector = PatternSelector(carton, pallet)
+    extended = options.get("extended_library", False)
+    jobs = selector.generator_jobs(
+        extended_library=extended,
+        dynamic_variants=extended,
+        deep_search=options.get("deep_search", False),
+    )
+
+    generators: Dict[str, Dict[str, object]] = {}
+    patterns: Dict[str, list] = {}
+    for name, fn, args in jobs:
+        result, seconds = _timed(fn, *args, repeat=repeat)
+        output = _unpack_output(result)
+        generators[name] = {
+            "seconds": seconds,
+            "cartons": {key: len(layout) for key, layout in output.patterns.items()},
+            "complete": output.complete,
+            "note": output.note,
+        }
+        patterns.update(output.patterns)
+
+    layouts = list(patterns.values())
+    _, score_seconds = _timed(selector.score_many, layouts, repeat=repeat)
+
+    # The sequencer runs on the densest raw pattern (first on ties).
+    densest = max(layouts, key=len, default=[])
+    sequencer = EvenOddSequencer(densest, carton, pallet)
+    _, sequence_seconds = _timed(sequencer.best_shift, repeat=repeat)
+
+    computation, pipeline_seconds = _timed(_pipeline, case, options, repeat=repeat)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            _pipeline(case, options)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "case": case["name"],
+        "mode": mode,
+        "pallet": case["pallet"],
+        "carton": case["carton"],
+        "stages": {
+            "generators": sum(entry["seconds"] for entry in generators.values()),
+            "scorer": score_seconds,
+            "sequencer": sequence_seconds,
+            "pipeline": pipeline_seconds,
+        },
+        "generators": generators,
+        "patterns": len(patterns),
+        "solutions": len(computation.solution_catalog.solutions),
+        "best_layout": computation.best_layout_key,
+        "cartons": len(computation.best_even),
+        "max_cartons": len(densest),
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_rectpack(case: Case, *, repeat: int = 1) -> Dict[str, object] | None:
+    """Compare the built-in dynamic packer with ``rectpack`` on ``case``."""
+
+    try:
+        from rectpack import newPacker
+    except ImportError:
+        return None
+
+    pallet_w, pallet_l, _ = case["pallet"]
+    box_w, box_l, _ = case["carton"]
+
+    def _rectpack():
+        packer = newPacker(rotation=True)
+        estimate = int((pallet_w * pallet_l) // (box_w * box_l)) + 5
+        for i in range(min(estimate, 600)):
+            packer.add_rect(box_w, box_l, i)
+        packer.add_bin(pallet_w, pallet_l)
+        packer.pack()
+        return [(x, y, w, h) for (_, x, y, w, h, _) in packer.rect_list()]
+
+    reference, rectpack_seconds = _timed(_rectpack, repeat=repeat)
+    (_, layout), maxrects_seconds = _timed(
+        pack_rectangles_dynamic, pallet_w, pallet_l, box_w, box_l, repeat=repeat
+    )
+    return {
+        "case": case["name"],
+        "rectpack_seconds": rectpack_seconds,
+        "maxrects_seconds": maxrects_seconds,
+        "rectpack_cartons": len(reference),
+        "maxrects_cartons": len(layout),
+        "identical": reference == layout,
+    }
+
+
+def summarize(records: List[Dict[str, object]]) -> Dict[str, Dict[str, float]]:
+    summary: Dict[str, Dict[str, float]] = {}
+    for record in records:
+        entry = summary.setdefault(
+            record["mode"],
+            {"cases": 0, "cartons": 0, "peak_memory_bytes": 0}
+            | {stage: 0.0 for stage in record["stages"]},
+        )
+        entry["cases"] += 1
+        entry["cartons"] += record["cartons"]
+        entry["peak_memory_bytes"] = max(
+            entry["peak_memory_bytes"], record["peak_memory_bytes"] or 0
+        )
+        for stage, seconds in record["stages"].items():
+            entry[stage] += seconds
+    return summary
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(
+    modes: List[str],
+    *,
+    quick: bool = False,
+    repeat: int = 1,
+    memory: bool = True,
+    rectpack: bool = False,
+    progress: Callable[[str], None] | None = None,
+) -> Dict[str, object]:
+    """Run the benchmark and return the JSON-ready report."""
+
+    cases = load_corpus(quick)
+    records = []
+    comparisons = []
+    for case in cases:
+        for mode in modes:
+            if progress is not None:
+                progress(f"{case['name']} [{mode}]")
+            records.append(run_case(case, mode, repeat=repeat, memory=memory))
+        if rectpack:
+            comparison = run_rectpack(case, repeat=repeat)
+            if comparison is not None:
+                comparisons.append(comparison)
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "modes": modes,
+            "quick": quick,
+            "repeat": repeat,
+        },
+        "summary": summarize(records),
+        "results": records,
+    }
+    if rectpack:
+        report["rectpack"] = comparisons
+    return report
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object]) -> List[str]:
+    """Return report lines comparing ``current`` with ``baseline``."""
+
+    lines = []
+    for mode, entry in current["summary"].items():
+        base = baseline.get("summary", {}).get(mode)
+        if not base:
+            continue
+        ratio = entry["pipeline"] / base["pipeline"] if base["pipeline"] else 0.0
+        lines.append(
+            f"{mode}: pipeline {base['pipeline']:.2f}s -> {entry['pipeline']:.2f}s"
+            f" (x{ratio:.2f}), cartons {base['cartons']} -> {entry['cartons']}"
+        )
+    previous = {(r["case"], r["mode"]): r for r in baseline.get("results", [])}
+    for record in current["results"]:
+        old = previous.get((record["case"], record["mode"]))
+        if old is not None and old["cartons"] != record["cartons"]:
+            lines.append(
+                f"  {record['case']} [{record['mode']}]: cartons"
+                f" {old['cartons']} -> {record['cartons']}"
+            )
+    return lines
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    parser.add_argument(
+        "--modes",
+        default=",".join(MODES),
+        help="comma-separated modes (default: all of %(default)s)",
+    )
+    parser.add_argument("--quick", action="store_true", help="small corpus")
+    parser.add_argument("--repeat", type=int, default=1, help="best of N timings")
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip the traced memory run"
+    )
+    parser.add_argument(
+        "--rectpack", action="store_true", help="also time the rectpack packer"
+    )
+    parser.add_argument("--compare", type=Path, help="earlier JSON report")
+    args = parser.parse_args(argv)
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(unknown)}")
+
+    report = run(
+        modes,
+        quick=args.quick,
+        repeat=args.repeat,
+        memory=not args.no_memory,
+        rectpack=args.rectpack,
+        progress=lambda text: print(text, file=sys.stderr),
+    )
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    for mode, entry in report["summary"].items():
+        print(
+            f"{mode}: {entry['cases']} cases, pipeline {entry['pipeline']:.2f}s,"
+            f" cartons {entry['cartons']}"
+        )
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        for line in compare(report, baseline):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
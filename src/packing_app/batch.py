@@ -0,0 +1,27 @@
+"""``palletizer`` command with the application's catalogues as defaults.
+
+:mod:`palletizer_core.cli` does not know where :mod:`packing_app` keeps its
+data files, so this wrapper passes ``cartons.xml`` and ``pallets.xml`` from
+:mod:`packing_app.data` as the fallback catalogues.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Sequence
+
+from packing_app.data.paths import cartons_xml_path, pallets_xml_path
+from palletizer_core import cli
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    return cli.main(
+        argv,
+        default_cartons=Path(cartons_xml_path()),
+        default_pallets=Path(pallets_xml_path()),
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
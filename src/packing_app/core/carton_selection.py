@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import heapq
+from concurrent.futures import Executor, as_completed
 from dataclasses import dataclass
 from itertools import permutations
-from typing import Iterable, Sequence
+from typing import Iterable, Iterator, Sequence
 
+from palletizer_core.algorithms import layer_upper_bound
 from palletizer_core.engine import PalletInputs, build_layouts
 
 
@@ -36,7 +39,46 @@ def best_product_fit(carton_dims: Sequence[float], product_dims: Sequence[float]
     return best
 
 
-def rank_cartons(
+def layer_count_bounds(inputs: PalletInputs) -> tuple[int, int]:
+    """Return closed-form ``(lower, upper)`` bounds on cartons per layer.
+
+    The lower bound is the better of the two uniform grids, which every
+    layout search includes; the upper bound is the area / Barnes bound.
+    When they meet, the pipeline would return exactly that count.
+    """
+
+    pw, pl = inputs.pallet_w, inputs.pallet_l
+    bw, bl = inputs.box_w_ext, inputs.box_l_ext
+    if min(pw, pl, bw, bl) <= 0:
+        return 0, 0
+    grid = max(int(pw // bw) * int(pl // bl), int(pw // bl) * int(pl // bw))
+    upper = layer_upper_bound(pw, pl, bw, bl)
+    return grid, max(grid, upper)
+
+
+def cartons_per_layer(inputs: PalletInputs) -> int:
+    """Cartons in the best layer found by the full layout pipeline."""
+
+    comp = build_layouts(
+        inputs,
+        False,
+        False,
+        "Cała warstwa",
+        False,
+        filter_sanity=False,
+        result_limit=1,
+        lazy=True,
+    )
+    return len(comp.best_odd)
+
+
+def ranking_key(rec: CartonRecommendation):
+    """Sort key of :func:`rank_cartons`, best recommendation first."""
+
+    return (-rec.products_per_pallet, -rec.carton_volume_eff, rec.pallet_height)
+
+
+def iter_rank_cartons(
     cartons: dict[str, Sequence[float]],
     pallets: Iterable[dict],
     *,
@@ -47,26 +89,29 @@ def rank_cartons(
     clearance: float = 0.0,
     max_pallet_mass: float = 600.0,
     thickness: float = 3.0,
-) -> list[CartonRecommendation]:
+    top_n: int | None = None,
+    executor: Executor | None = None,
+    batch_size: int = 16,
+) -> Iterator[CartonRecommendation]:
+    """Yield carton recommendations as they are computed (unsorted).
+
+    Cartons whose layer count follows from :func:`layer_count_bounds` come
+    first and never touch the layout pipeline.  The rest are evaluated in
+    order of their upper bound, ``batch_size`` at a time on ``executor`` when
+    given.  With ``top_n`` a carton is skipped once even its upper bound
+    cannot reach the ``top_n``-th best result so far, so only the cartons
+    that can still make the top ``top_n`` are yielded.
+    """
+
     pallet = next(iter(pallets), {"w": 1200, "l": 800, "h": 144, "weight": 0})
-    results: list[CartonRecommendation] = []
-    for name, dims in cartons.items():
-        if len(dims) < 3:
-            continue
-        cw, cl, ch = [float(v) for v in dims[:3]]
-        pieces, vol_eff, orientation = best_product_fit((cw, cl, ch), product_dims, clearance)
-        if pieces <= 0:
-            results.append(CartonRecommendation(name, 0, 0.0, orientation, 0, 0, 0, 0, 0.0, None, "nie mieści się"))
-            continue
-        usable = max_pallet_height - (float(pallet.get("h", 0)) if include_pallet_height else 0)
-        layer_h = ch + 2 * thickness
-        layers = max(int(usable // layer_h), 0) if usable > 0 and layer_h > 0 else 1
-        inputs = PalletInputs(float(pallet.get("w", 1200)), float(pallet.get("l", 800)), float(pallet.get("h", 0)), cw, cl, ch, thickness, 0, 0, max(layers, 1), max_pallet_height, include_pallet_height)
-        comp = build_layouts(inputs, False, False, "Cała warstwa", False, filter_sanity=False, result_limit=1)
-        cartons_per_layer = len(comp.best_odd)
-        cartons_per_pallet = cartons_per_layer * layers
+    pallet_h = float(pallet.get("h", 0))
+    base_h = pallet_h if include_pallet_height else 0
+    best: list[int] = []  # min-heap of the top_n products per pallet
+
+    def finish(name, pieces, vol_eff, orientation, per_layer, layers, layer_h):
+        cartons_per_pallet = per_layer * layers
         products = cartons_per_pallet * pieces
-        height = layers * layer_h + (float(pallet.get("h", 0)) if include_pallet_height else 0)
+        height = layers * layer_h + base_h
         mass = products * product_mass + float(pallet.get("weight", 0)) if product_mass is not None and product_mass > 0 else None
         warnings = []
         if height > max_pallet_height > 0:
@@ -75,5 +120,76 @@ def rank_cartons(
             warnings.append("za ciężka paleta")
         if vol_eff < 0.35:
             warnings.append("słabe wykorzystanie")
-        results.append(CartonRecommendation(name, pieces, vol_eff, orientation, cartons_per_layer, layers, cartons_per_pallet, products, height, mass, ", ".join(warnings) if warnings else "OK"))
-    return sorted(results, key=lambda r: (-r.products_per_pallet, -r.carton_volume_eff, r.pallet_height))
+        if top_n is not None and top_n > 0:
+            if len(best) < top_n:
+                heapq.heappush(best, products)
+            elif products > best[0]:
+                heapq.heapreplace(best, products)
+        return CartonRecommendation(name, pieces, vol_eff, orientation, per_layer, layers, cartons_per_pallet, products, height, mass, ", ".join(warnings) if warnings else "OK")
+
+    pending = []
+    for name, dims in cartons.items():
+        if len(dims) < 3:
+            continue
+        cw, cl, ch = [float(v) for v in dims[:3]]
+        pieces, vol_eff, orientation = best_product_fit((cw, cl, ch), product_dims, clearance)
+        if pieces <= 0:
+            yield CartonRecommendation(name, 0, 0.0, orientation, 0, 0, 0, 0, 0.0, None, "nie mieści się")
+            continue
+        usable = max_pallet_height - base_h
+        layer_h = ch + 2 * thickness
+        layers = max(int(usable // layer_h), 0) if usable > 0 and layer_h > 0 else 1
+        inputs = PalletInputs(float(pallet.get("w", 1200)), float(pallet.get("l", 800)), pallet_h, cw, cl, ch, thickness, 0, 0, max(layers, 1), max_pallet_height, include_pallet_height)
+        lower, upper = layer_count_bounds(inputs)
+        case = (name, pieces, vol_eff, orientation, layers, layer_h)
+        if lower >= upper:
+            yield finish(*case[:4], upper, *case[4:])
+        else:
+            pending.append((upper * layers * pieces, inputs, case))
+
+    pending.sort(key=lambda item: item[0], reverse=True)
+    batch_size = max(1, int(batch_size)) if executor is not None else 1
+    start = 0
+    while start < len(pending):
+        threshold = best[0] if top_n is not None and len(best) >= top_n > 0 else None
+        batch = [
+            (inputs, case)
+            for bound, inputs, case in pending[start : start + batch_size]
+            if threshold is None or bound >= threshold
+        ]
+        if not batch:
+            return
+        start += batch_size
+        if executor is None:
+            for inputs, case in batch:
+                yield finish(*case[:4], cartons_per_layer(inputs), *case[4:])
+            continue
+        futures = {executor.submit(cartons_per_layer, inputs): case for inputs, case in batch}
+        for future in as_completed(futures):
+            case = futures[future]
+            yield finish(*case[:4], future.result(), *case[4:])
+
+
+def rank_cartons(
+    cartons: dict[str, Sequence[float]],
+    pallets: Iterable[dict],
+    *,
+    product_dims: Sequence[float],
+    product_mass: float | None = None,
+    max_pallet_height: float = 1600.0,
+    include_pallet_height: bool = True,
+    clearance: float = 0.0,
+    max_pallet_mass: float = 600.0,
+    thickness: float = 3.0,
+    top_n: int | None = None,
+    executor: Executor | None = None,
+) -> list[CartonRecommendation]:
+    order = {name: index for index, name in enumerate(cartons)}
+    results = iter_rank_cartons(
+        cartons, pallets, product_dims=product_dims, product_mass=product_mass,
+        max_pallet_height=max_pallet_height, include_pallet_height=include_pallet_height,
+        clearance=clearance, max_pallet_mass=max_pallet_mass, thickness=thickness,
+        top_n=top_n, executor=executor,
+    )
+    ranked = sorted(results, key=lambda r: (*ranking_key(r), order[r.carton_name]))
+    return ranked[:top_n] if top_n is not None and top_n > 0 else ranked
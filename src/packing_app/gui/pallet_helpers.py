@@ -17,3 +17,39 @@ def apply_pattern_selection_after_restore(tab, previous_flag: bool, target_key:
 
 def filter_selection_for_layer(selected_indices, layer_idx: int):
     return {(layer, idx) for layer, idx in selected_indices if layer == layer_idx}
+
+
+def profile_summary(report) -> str:
+    """One-line summary of a :class:`ProfileReport` for the profile panel."""
+
+    if report is None:
+        return "Brak danych – uruchom obliczenia."
+    text = (
+        f"Łącznie {report.total_seconds * 1000:.0f} ms, "
+        f"kandydaci {report.candidates}, unikalne {report.unique} (duplikaty {report.dedupe_ratio:.0%})"
+    )
+    if report.cache_hit:
+        text += " – wynik z pamięci podręcznej"
+    return text
+
+
+def profile_rows(report) -> list[tuple[str, str, str, str]]:
+    """Rows ``(stage, ms, calls, items)``: stages first, then generators."""
+
+    if report is None:
+        return []
+    rows = []
+    for prefix, timings in (("", report.stages), ("generator: ", report.generators)):
+        for timing in sorted(timings, key=lambda t: t.seconds, reverse=True):
+            name = f"{prefix}{timing.name}"
+            if not timing.complete:
+                name += " (przerwany)"
+            rows.append(
+                (
+                    name,
+                    f"{timing.seconds * 1000:.1f}",
+                    str(timing.calls),
+                    str(timing.items),
+                )
+            )
+    return rows
@@ -6,11 +6,13 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from packing_app.core.algorithms import (
     pack_rectangles_2d,
     pack_rectangles_mixed_greedy,
+    mixed_greedy_plan,
     maximize_mixed_layout,
     place_air_cushions,
     pack_circles_grid_bottomleft,
     pack_hex_top_down,
     pack_hex_bottom_up,
+    count_circle_layouts,
 )
 from packing_app.data.repository import load_cartons
 
@@ -1065,6 +1067,7 @@ class TabPacking2D(ttk.Frame):
 
         margin = self.parse_dim_safe(self.margin)
         results = []
+        circle_cartons = []
         for key, dims in self.predefined_cartons.items():
             w_c, l_c, h_c = dims
             if h_p > 0 and h_p > h_c:
@@ -1074,16 +1077,25 @@ class TabPacking2D(ttk.Frame):
                     continue
                 c_vert, _ = pack_rectangles_2d(w_c, l_c, w_p, l_p, margin)
                 c_horz, _ = pack_rectangles_2d(w_c, l_c, l_p, w_p, margin)
-                c_mix, _ = pack_rectangles_mixed_greedy(w_c, l_c, w_p, l_p, margin)
+                c_mix, _ = mixed_greedy_plan(w_c, l_c, w_p, l_p, margin)
                 best_count = max(c_vert, c_horz, c_mix)
                 best_layout = "Poziomo" if best_count == c_vert else "Pionowo" if best_count == c_horz else "Mieszane"
                 results.append((key, w_c, l_c, h_c, c_vert, c_horz, c_mix, best_count, best_layout))
             else:
                 if not self.validate_dimensions(w_c, l_c, diam=diam, margin=margin):
                     continue
-                c_grid = len(pack_circles_grid_bottomleft(w_c, l_c, diam, margin))
-                c_hex = len(pack_hex_top_down(w_c, l_c, diam, margin))
-                c_rev = len(pack_hex_bottom_up(l_c, w_c, diam, margin))
+                circle_cartons.append((key, w_c, l_c, h_c))
+        if circle_cartons:
+            # One batch over the catalogue; centres are only built for the
+            # carton the user picks.
+            counts = count_circle_layouts(
+                [w_c for _, w_c, _, _ in circle_cartons],
+                [l_c for _, _, l_c, _ in circle_cartons],
+                diam,
+                margin,
+            )
+            for (key, w_c, l_c, h_c), c_grid, c_hex, c_rev in zip(circle_cartons, *counts):
+                c_grid, c_hex, c_rev = int(c_grid), int(c_hex), int(c_rev)
                 best_count = max(c_grid, c_hex, c_rev)
                 best_layout = "Siatka" if best_count == c_grid else "Hex" if best_count == c_hex else "Hex(rev)"
                 results.append((key, w_c, l_c, h_c, c_grid, c_hex, c_rev, best_count, best_layout))
@@ -1163,7 +1175,7 @@ class TabPacking2D(ttk.Frame):
                 return
             c1, _ = pack_rectangles_2d(w_c, l_c, w_p, l_p, margin)
             c2, _ = pack_rectangles_2d(w_c, l_c, l_p, w_p, margin)
-            c3, _ = pack_rectangles_mixed_greedy(w_c, l_c, w_p, l_p, margin)
+            c3, _ = mixed_greedy_plan(w_c, l_c, w_p, l_p, margin)
             layout_map = {
                 "Poziomo": c1,
                 "Pionowo": c2,
@@ -1174,9 +1186,10 @@ class TabPacking2D(ttk.Frame):
             diam = self.parse_dim_safe(self.prod_diam)
             if not self.validate_dimensions(w_c, l_c, diam=diam, margin=margin):
                 return
-            c1 = len(pack_circles_grid_bottomleft(w_c, l_c, diam, margin))
-            c2 = len(pack_hex_top_down(w_c, l_c, diam, margin))
-            c3 = len(pack_hex_bottom_up(l_c, w_c, diam, margin))
+            c1, c2, c3 = (
+                int(count[0])
+                for count in count_circle_layouts([w_c], [l_c], diam, margin)
+            )
             layout_map = {"Siatka": c1, "Hex": c2, "Hex(rev)": c3}
             best = layout_map.get(self.layout_choice.get(), max(c1, c2, c3))
 
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import bisect
+import logging
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-from packing_app.core.carton_selection import rank_cartons
+from packing_app.core.carton_selection import iter_rank_cartons, ranking_key
 from packing_app.data.repository import load_cartons, load_pallets_with_weights
 from packing_app.gui.pallet_input_parsing import parse_dim
+from palletizer_core.parallel import create_executor
+
+logger = logging.getLogger(__name__)
 
 
 class TabCartonSelection(ttk.Frame):
@@ -24,6 +31,12 @@ class TabCartonSelection(ttk.Frame):
         self.clearance_var = tk.StringVar(value="0")
         self.max_mass_var = tk.StringVar(value="600")
         self._rows: dict[str, str] = {}
+        self._row_keys: list[tuple] = []
+        self._queue: queue.Queue = queue.Queue()
+        self._job_id = 0
+        self._polling = False
+        self._order: dict[str, int] = {}
+        self.status_var = tk.StringVar(value="")
         self._build_ui()
 
     def _build_ui(self) -> None:
@@ -39,8 +52,10 @@ class TabCartonSelection(ttk.Frame):
             ttk.Label(form, text=text).grid(row=i // 4, column=(i % 4) * 2, sticky="w", padx=4, pady=4)
             ttk.Entry(form, textvariable=var, width=10).grid(row=i // 4, column=(i % 4) * 2 + 1, sticky="w", padx=4, pady=4)
         ttk.Checkbutton(form, text="wysokość zawiera nośnik", variable=self.include_pallet_height_var).grid(row=2, column=0, columnspan=2, sticky="w", padx=4, pady=4)
-        ttk.Button(form, text="Porównaj kartony", command=self.calculate).grid(row=2, column=2, padx=4, pady=4, sticky="w")
+        self.compare_btn = ttk.Button(form, text="Porównaj kartony", command=self.calculate)
+        self.compare_btn.grid(row=2, column=2, padx=4, pady=4, sticky="w")
         ttk.Button(form, text="Przenieś do Paletyzacji", command=self.transfer_to_palletization).grid(row=2, column=3, columnspan=2, padx=4, pady=4, sticky="w")
+        ttk.Label(form, textvariable=self.status_var).grid(row=2, column=5, columnspan=3, padx=4, pady=4, sticky="w")
 
         columns = ("carton", "pieces", "eff", "orientation", "c_layer", "layers", "c_pallet", "p_pallet", "height", "mass", "status")
         self.tree = ttk.Treeview(self, columns=columns, show="headings", height=16)
@@ -60,10 +75,12 @@ class TabCartonSelection(ttk.Frame):
         return (w, l, h)
 
     def calculate(self) -> None:
+        """Rank cartons in a background thread, streaming rows into the table."""
+
         try:
             mass = parse_dim(self.mass_var)
-            results = rank_cartons(
-                self.cartons, self.pallets, product_dims=self._product_dims(),
+            options = dict(
+                product_dims=self._product_dims(),
                 product_mass=mass if mass > 0 else None,
                 max_pallet_height=parse_dim(self.max_height_var) or 1600,
                 include_pallet_height=self.include_pallet_height_var.get(),
@@ -73,12 +90,59 @@ class TabCartonSelection(ttk.Frame):
         except ValueError as exc:
             messagebox.showerror("Dobór kartonu", str(exc)); return
         self._rows.clear()
+        self._row_keys.clear()
         for item in self.tree.get_children():
             self.tree.delete(item)
-        for rec in results:
-            iid = rec.carton_name
-            self._rows[iid] = rec.carton_name
-            self.tree.insert("", "end", iid=iid, values=(rec.carton_name, rec.pieces_per_carton, f"{rec.carton_volume_eff*100:.1f}", " × ".join(f"{v:.0f}" for v in rec.orientation), rec.cartons_per_layer, rec.layers, rec.cartons_per_pallet, rec.products_per_pallet, f"{rec.pallet_height:.1f}", "" if rec.pallet_mass is None else f"{rec.pallet_mass:.2f}", rec.status))
+        self._job_id += 1
+        self._order = {name: index for index, name in enumerate(self.cartons)}
+        self.status_var.set("Obliczanie...")
+        self.compare_btn.state(["disabled"])
+        thread = threading.Thread(target=self._run_ranking, args=(self._job_id, dict(self.cartons), list(self.pallets), options), daemon=True)
+        thread.start()
+        if not self._polling:
+            self._polling = True
+            self.after(50, self._poll_results)
+
+    def _run_ranking(self, job_id: int, cartons, pallets, options) -> None:
+        try:
+            with create_executor() as executor:
+                for rec in iter_rank_cartons(cartons, pallets, executor=executor, **options):
+                    self._queue.put(("row", job_id, rec))
+        except Exception as exc:
+            logger.exception("Failed to rank cartons")
+            self._queue.put(("error", job_id, exc))
+            return
+        self._queue.put(("done", job_id, None))
+
+    def _poll_results(self) -> None:
+        try:
+            while True:
+                kind, job_id, payload = self._queue.get_nowait()
+                if job_id != self._job_id:
+                    continue
+                if kind == "row":
+                    self._insert_row(payload)
+                    continue
+                self._polling = False
+                self.compare_btn.state(["!disabled"])
+                if kind == "error":
+                    self.status_var.set("")
+                    messagebox.showerror("Dobór kartonu", str(payload))
+                else:
+                    self.status_var.set(f"Gotowe ({len(self._rows)} kartonów)")
+                return
+        except queue.Empty:
+            pass
+        self.status_var.set(f"Obliczanie... ({len(self._rows)}/{len(self.cartons)})")
+        self.after(50, self._poll_results)
+
+    def _insert_row(self, rec) -> None:
+        key = (*ranking_key(rec), self._order.get(rec.carton_name, len(self._order)))
+        index = bisect.bisect(self._row_keys, key)
+        self._row_keys.insert(index, key)
+        iid = rec.carton_name
+        self._rows[iid] = rec.carton_name
+        self.tree.insert("", index, iid=iid, values=(rec.carton_name, rec.pieces_per_carton, f"{rec.carton_volume_eff*100:.1f}", " × ".join(f"{v:.0f}" for v in rec.orientation), rec.cartons_per_layer, rec.layers, rec.cartons_per_pallet, rec.products_per_pallet, f"{rec.pallet_height:.1f}", "" if rec.pallet_mass is None else f"{rec.pallet_mass:.2f}", rec.status))
 
     def transfer_to_palletization(self) -> None:
         selected = self.tree.selection()
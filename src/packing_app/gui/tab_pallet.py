@@ -30,6 +30,8 @@ from packing_app.gui.layer_propagation import propagate_carton_delta
 from packing_app.gui.pallet_helpers import (
     apply_pattern_selection_after_restore,
     filter_selection_for_layer,
+    profile_rows,
+    profile_summary,
 )
 from packing_app.gui.pallet_state_apply import apply_layout_result_to_tab_state
 from palletizer_core import Carton, Pallet
@@ -43,6 +45,7 @@ from palletizer_core.engine import (
     group_cartons,
     normalize_row_by_row_counts,
 )
+from palletizer_core.layout_cache import LayoutCache
 from packing_app.core.test_card import build_packaging_test_card
 from palletizer_core.selector import (
     RISK_CONTACT_THRESHOLD,
@@ -68,6 +71,9 @@ from packing_app.gui.pallet_snapshot_api import build_snapshot_from_tab
 
 logger = logging.getLogger(__name__)
 
+# Seconds of pattern generation allowed when "deep search" is enabled.
+DEEP_SEARCH_TIME_BUDGET_S = 10.0
+
 
 def _matching_layers_for_pattern(obj, layer_idx: int) -> list[int]:
     patterns = getattr(obj, "layer_patterns", [])
@@ -844,6 +850,8 @@ class TabPallet(ttk.Frame):
             command=self.open_ur_caps_tab,
         ).grid(row=1, column=0, padx=PAD_X, pady=(0, PAD_Y * 2), sticky="ew")
 
+        self._build_profile_panel(right_col, row=3, pad_x=PAD_X, pad_y=PAD_Y)
+
         columns = (
             "pattern",
             "cartons",
@@ -946,6 +954,66 @@ class TabPallet(ttk.Frame):
         self.compute_pallet()
         self.manual_carton_weight_var.trace_add("write", self._on_manual_weight_changed)
 
+    def _build_profile_panel(self, parent, *, row: int, pad_x: int, pad_y: int) -> None:
+        """Collapsible "Profil obliczeń" panel with the last compute timings."""
+
+        profile_frame = ttk.Frame(parent)
+        profile_frame.grid(row=row, column=0, sticky="ew", padx=0, pady=(pad_y * 2, 0))
+        profile_frame.columnconfigure(0, weight=1)
+        self.profile_expanded_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            profile_frame,
+            text="Profil obliczeń",
+            variable=self.profile_expanded_var,
+            command=self._toggle_profile_panel,
+        ).grid(row=0, column=0, padx=pad_x, sticky="w")
+
+        self.profile_body = ttk.Frame(profile_frame)
+        self.profile_body.columnconfigure(0, weight=1)
+        self.profile_summary_var = tk.StringVar(value=profile_summary(None))
+        ttk.Label(
+            self.profile_body,
+            textvariable=self.profile_summary_var,
+            wraplength=420,
+            justify="left",
+        ).grid(row=0, column=0, columnspan=2, padx=pad_x, pady=(0, pad_y), sticky="w")
+        columns = ("stage", "ms", "calls", "items")
+        self.profile_tree = ttk.Treeview(
+            self.profile_body, columns=columns, show="headings", height=8
+        )
+        for column, heading, width, anchor in (
+            ("stage", "Etap", 200, "w"),
+            ("ms", "Czas [ms]", 80, "e"),
+            ("calls", "Wywołania", 80, "e"),
+            ("items", "Elementy", 80, "e"),
+        ):
+            self.profile_tree.heading(column, text=heading)
+            self.profile_tree.column(
+                column, width=width, anchor=anchor, stretch=column == "stage"
+            )
+        self.profile_tree.grid(row=1, column=0, sticky="ew", padx=(pad_x, 0))
+        scrollbar = ttk.Scrollbar(
+            self.profile_body, orient=tk.VERTICAL, command=self.profile_tree.yview
+        )
+        self.profile_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.grid(row=1, column=1, sticky="ns", padx=(0, pad_x))
+
+    def _toggle_profile_panel(self) -> None:
+        if self.profile_expanded_var.get():
+            self.profile_body.grid(row=1, column=0, sticky="ew")
+        else:
+            self.profile_body.grid_remove()
+
+    def _update_profile_panel(self, result: LayoutComputation) -> None:
+        tree = getattr(self, "profile_tree", None)
+        if tree is None:
+            return
+        report = getattr(result, "profile", None)
+        self.profile_summary_var.set(profile_summary(report))
+        tree.delete(*tree.get_children())
+        for values in profile_rows(report):
+            tree.insert("", "end", values=values)
+
     def validate_number(self, value):
         if value == "":
             return True
@@ -1586,6 +1654,11 @@ class TabPallet(ttk.Frame):
         row_by_row_user_modified = options.pop("row_by_row_user_modified")
         row_by_row_vertical = options.pop("row_by_row_vertical")
         row_by_row_horizontal = options.pop("row_by_row_horizontal")
+        options["cache_token"] = (
+            row_by_row_user_modified,
+            row_by_row_vertical,
+            row_by_row_horizontal,
+        )
         job_id = self._next_compute_job_id()
 
         def row_by_row_customizer(carton: Carton, pallet: Pallet, pattern: LayerLayout | None):
@@ -1661,7 +1734,11 @@ class TabPallet(ttk.Frame):
                 if kind == "result":
                     inputs, result = payload
                     self._finalize_results(inputs, result)
-                    self._set_compute_status("Gotowe", disable_button=False, disable_tree=False)
+                    status = "Gotowe"
+                    if result.truncated_generators:
+                        truncated = ", ".join(result.truncated_generators)
+                        status += f" (przerwane: {truncated})"
+                    self._set_compute_status(status, disable_button=False, disable_tree=False)
                     return
         except queue.Empty:
             pass
@@ -1793,6 +1870,7 @@ class TabPallet(ttk.Frame):
         allow_offsets: bool,
         min_support: float,
         assume_full_support: bool,
+        cache_token=None,
     ) -> LayoutComputation:
         return build_layouts(
             inputs,
@@ -1809,8 +1887,18 @@ class TabPallet(ttk.Frame):
             allow_offsets=allow_offsets,
             min_support=min_support,
             assume_full_support=assume_full_support,
+            cache=self._get_layout_cache(),
+            cache_token=cache_token,
+            time_budget_s=DEEP_SEARCH_TIME_BUDGET_S if deep_search else None,
         )
 
+    def _get_layout_cache(self) -> LayoutCache:
+        cache = getattr(self, "_layout_cache", None)
+        if cache is None:
+            cache = LayoutCache()
+            self._layout_cache = cache
+        return cache
+
     def _finalize_results(self, inputs: PalletInputs, result: LayoutComputation) -> None:
         """Persist computed layouts and refresh dependent UI elements."""
 
@@ -1835,6 +1923,7 @@ class TabPallet(ttk.Frame):
             f"Patterns: raw={raw_count}, shown={shown_count}"
         )
         self.update_pattern_stats()
+        self._update_profile_panel(result)
         self._update_snapshot(inputs)
 
     def _update_snapshot(self, inputs: PalletInputs) -> None:
@@ -2,6 +2,7 @@
 
 from .engine import LayoutComputation, PalletInputs, build_layouts
 from .models import Carton, Pallet
+from .profiling import ProfileReport, Profiler
 from .selector import PatternSelector, PatternScore
 from .sequencer import EvenOddSequencer
 from .solutions import Solution, SolutionCatalog
@@ -13,6 +14,8 @@ __all__ = [
     "PalletInputs",
     "LayoutComputation",
     "build_layouts",
+    "Profiler",
+    "ProfileReport",
     "PatternSelector",
     "PatternScore",
     "EvenOddSequencer",
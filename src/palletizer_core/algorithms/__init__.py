@@ -1,10 +1,22 @@
+from .annealing import AnnealingResult, anneal_layout
 from .box_search_3d import random_box_optimizer_3d
+from .capacity import CapacityTable, capacity_table
 from .interlock import compute_interlocked_layout
 from .strip_dp import generate_strip_layouts
 from .guillotine import generate_guillotine_layouts
+from .free_space import FreeSpace
+from .maxrects import MaxRectsBin, pack_identical
+from .pallet_loading import (
+    PalletLoadingResult,
+    layer_upper_bound,
+    solve_pallet_loading,
+)
 from .rect_packing import (
     DEEP_MAX_RECTS,
     DEFAULT_MAX_RECTS,
+    count_circle_layouts,
+    materialize_mixed_greedy,
+    mixed_greedy_plan,
     pack_circles_grid_bottomleft,
     pack_hex_bottom_up,
     pack_hex_top_down,
@@ -21,6 +33,8 @@ from .void_fill import check_collision, maximize_mixed_layout, place_air_cushion
 __all__ = [
     "pack_rectangles_2d",
     "pack_rectangles_mixed_greedy",
+    "mixed_greedy_plan",
+    "materialize_mixed_greedy",
     "pack_rectangles_row_by_row",
     "pack_pinwheel",
     "pack_rectangles_mixed_max",
@@ -31,11 +45,22 @@ __all__ = [
     "pack_circles_grid_bottomleft",
     "pack_hex_top_down",
     "pack_hex_bottom_up",
+    "count_circle_layouts",
     "compute_interlocked_layout",
     "generate_strip_layouts",
     "generate_guillotine_layouts",
+    "MaxRectsBin",
+    "pack_identical",
+    "PalletLoadingResult",
+    "solve_pallet_loading",
+    "layer_upper_bound",
+    "AnnealingResult",
+    "anneal_layout",
     "check_collision",
     "place_air_cushions",
+    "FreeSpace",
+    "CapacityTable",
+    "capacity_table",
     "maximize_mixed_layout",
     "random_box_optimizer_3d",
 ]
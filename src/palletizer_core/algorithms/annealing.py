@@ -0,0 +1,293 @@
+"""Simulated annealing of one-carton layers over sequence pairs.
+
+A layer of ``n`` cartons is encoded as a sequence pair ``(positive,
+negative)`` plus one orientation bit per carton (Murata et al.): carton
+``a`` is left of ``b`` when it precedes ``b`` in both sequences and below
+``b`` when it follows ``b`` in ``positive`` but precedes it in ``negative``.
+Decoding computes the compacted bottom-left coordinates as weighted longest
+common subsequences with a Fenwick tree of prefix maxima, ``O(n log n)`` per
+evaluation (Tang & Wong).  Any decoding is overlap-free, so the cartons that
+end up inside the pallet always form a valid layout.
+
+The annealer starts from the sequence pair of a given layout with one more
+carton appended and minimises the number of cartons left outside, with their
+overhang as tie-break.  Moves and acceptance draw from ``random.Random(seed)``
+and the run length is a fixed number of iterations, so a seed always gives the
+same layout; a ``deadline`` can only end the run earlier.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from .pallet_loading import layer_upper_bound
+from .raster import SCALE, integer_grid
+
+LayerLayout = List[Tuple[float, float, float, float]]
+
+DEFAULT_ITERATIONS = 2000
+# Layers with more cartons are left alone: every move decodes the whole
+# sequence pair, and tiny cartons leave little room for a local search anyway.
+MAX_CARTONS = 80
+
+_START_TEMPERATURE = 0.6
+_END_TEMPERATURE = 0.02
+
+
+@dataclass(frozen=True)
+class AnnealingResult:
+    """Outcome of :func:`anneal_layout`.
+
+    ``layout`` holds the ``count`` cartons of the best decoding seen (never
+    fewer than the seed layout); ``complete`` is ``False`` when the
+    deadline ended the run before ``iterations`` moves.
+    """
+
+    count: int
+    layout: LayerLayout = field(default_factory=list)
+    iterations: int = 0
+    complete: bool = True
+
+
+class _PrefixMax:
+    """Fenwick tree answering ``max(values[:index])`` with point raises."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def raise_to(self, index: int, value: int) -> None:
+        index += 1
+        tree = self.tree
+        while index <= self.size:
+            if tree[index] < value:
+                tree[index] = value
+            index += index & -index
+
+    def query(self, index: int) -> int:
+        best = 0
+        tree = self.tree
+        while index > 0:
+            if tree[index] > best:
+                best = tree[index]
+            index -= index & -index
+        return best
+
+
+def _decode(
+    positive: Sequence[int],
+    negative: Sequence[int],
+    widths: Sequence[int],
+    lengths: Sequence[int],
+) -> Tuple[List[int], List[int]]:
+    """Bottom-left compacted ``(xs, ys)`` of a sequence pair."""
+
+    n = len(positive)
+    rank = [0] * n
+    for index, carton in enumerate(negative):
+        rank[carton] = index
+    xs = [0] * n
+    ys = [0] * n
+    left = _PrefixMax(n)
+    for carton in positive:
+        x = left.query(rank[carton])
+        xs[carton] = x
+        left.raise_to(rank[carton], x + widths[carton])
+    below = _PrefixMax(n)
+    for carton in reversed(positive):
+        y = below.query(rank[carton])
+        ys[carton] = y
+        below.raise_to(rank[carton], y + lengths[carton])
+    return xs, ys
+
+
+def _topological(n: int, before, key) -> List[int]:
+    """Order ``range(n)`` so that ``before(a, b)`` puts ``a`` first.
+
+    Kahn's algorithm taking the smallest ``key`` among ready cartons; a
+    cycle, which overlapping input could produce, is broken the same way.
+    """
+
+    successors = [[b for b in range(n) if b != a and before(a, b)] for a in range(n)]
+    pending = [0] * n
+    for targets in successors:
+        for b in targets:
+            pending[b] += 1
+    order: List[int] = []
+    done = [False] * n
+    while len(order) < n:
+        ready = [c for c in range(n) if not done[c] and pending[c] == 0]
+        if not ready:
+            ready = [c for c in range(n) if not done[c]]
+        carton = min(ready, key=key)
+        done[carton] = True
+        order.append(carton)
+        for b in successors[carton]:
+            pending[b] -= 1
+    return order
+
+
+def _sequence_pair(
+    boxes: Sequence[Tuple[int, int, int, int]],
+) -> Tuple[List[int], List[int]]:
+    """Sequence pair whose decoding places no carton right of or above
+    its position in ``boxes``.
+
+    ``positive`` must put ``a`` before ``b`` when ``a`` is left of or above
+    ``b``, ``negative`` when it is left of or below.  A diagonal pair may
+    take either order in one of the sequences, as the other one already
+    separates it, so both are linear extensions of the forced pairs.
+    """
+
+    def left(a: int, b: int) -> bool:
+        return boxes[a][0] + boxes[a][2] <= boxes[b][0]
+
+    def below(a: int, b: int) -> bool:
+        return boxes[a][1] + boxes[a][3] <= boxes[b][1]
+
+    n = len(boxes)
+    positive = _topological(
+        n,
+        lambda a, b: (left(a, b) or below(b, a))
+        and not (left(b, a) or below(a, b)),
+        lambda c: (boxes[c][0], -boxes[c][1]),
+    )
+    negative = _topological(
+        n,
+        lambda a, b: (left(a, b) or below(a, b))
+        and not (left(b, a) or below(b, a)),
+        lambda c: (boxes[c][0], boxes[c][1]),
+    )
+    return positive, negative
+
+
+def anneal_layout(
+    pallet_w: float,
+    pallet_l: float,
+    box_w: float,
+    box_l: float,
+    layout: Sequence[Tuple[float, float, float, float]],
+    *,
+    iterations: int = DEFAULT_ITERATIONS,
+    seed: int = 0,
+    deadline: Optional[float] = None,
+) -> AnnealingResult:
+    """Try to fit one more carton into ``layout`` by simulated annealing.
+
+    ``layout`` must be a valid layer of ``box_w x box_l`` cartons; layers
+    with more than :data:`MAX_CARTONS` cartons or already at
+    :func:`~.pallet_loading.layer_upper_bound` are returned unchanged.
+    ``deadline`` is a :func:`time.monotonic` value.
+    """
+
+    seed_layout = [tuple(box) for box in layout]
+    if (
+        pallet_w <= 0
+        or pallet_l <= 0
+        or box_w <= 0
+        or box_l <= 0
+        or not seed_layout
+        or len(seed_layout) > MAX_CARTONS
+        or iterations <= 0
+        or len(seed_layout) >= layer_upper_bound(pallet_w, pallet_l, box_w, box_l)
+    ):
+        return AnnealingResult(len(seed_layout), list(seed_layout))
+
+    width, length, a, b, unit = integer_grid(pallet_w, pallet_l, box_w, box_l)
+    scale = unit / SCALE
+
+    def snap(value: float) -> int:
+        return int(round(value / scale))
+
+    rotated = [abs(w - box_w) > abs(w - box_l) for _, _, w, _ in seed_layout]
+    boxes = [
+        (snap(x), snap(y), *((b, a) if turned else (a, b)))
+        for (x, y, _, _), turned in zip(seed_layout, rotated)
+    ]
+    positive, negative = _sequence_pair(boxes)
+    # The extra carton goes right of everything; annealing has to make room.
+    n = len(boxes) + 1
+    positive.append(n - 1)
+    negative.append(n - 1)
+    rotated.append(False)
+
+    rng = random.Random(seed)
+    perimeter = n * (width + length)
+
+    def evaluate(positive, negative, rotated):
+        widths = [b if r else a for r in rotated]
+        lengths = [a if r else b for r in rotated]
+        xs, ys = _decode(positive, negative, widths, lengths)
+        outside = 0
+        overhang = 0
+        for carton in range(n):
+            over = max(0, xs[carton] + widths[carton] - width) + max(
+                0, ys[carton] + lengths[carton] - length
+            )
+            if over:
+                outside += 1
+                overhang += over
+        energy = outside + overhang / perimeter
+        return energy, outside, (xs, ys, widths, lengths)
+
+    energy, outside, decoded = evaluate(positive, negative, rotated)
+    best = (outside, energy, decoded)
+    moves = 0
+    complete = True
+    cooling = (_END_TEMPERATURE / _START_TEMPERATURE) ** (1.0 / iterations)
+    temperature = _START_TEMPERATURE
+    while moves < iterations:
+        if deadline is not None and moves % 64 == 0 and time.monotonic() > deadline:
+            complete = False
+            break
+        moves += 1
+        new_positive, new_negative, new_rotated = positive, negative, rotated
+        move = rng.randrange(4)
+        i, j = rng.randrange(n), rng.randrange(n)
+        if move == 0:
+            new_rotated = list(rotated)
+            new_rotated[i] = not new_rotated[i]
+        else:
+            if i == j:
+                j = (i + 1) % n
+            if move in (1, 3):
+                new_positive = list(positive)
+                new_positive[i], new_positive[j] = new_positive[j], new_positive[i]
+            if move in (2, 3):
+                # Move 3 swaps the same two cartons in both sequences.
+                new_negative = list(negative)
+                if move == 3:
+                    i = new_negative.index(positive[i])
+                    j = new_negative.index(positive[j])
+                new_negative[i], new_negative[j] = new_negative[j], new_negative[i]
+        new_energy, new_outside, new_decoded = evaluate(
+            new_positive, new_negative, new_rotated
+        )
+        delta = new_energy - energy
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            positive, negative, rotated = new_positive, new_negative, new_rotated
+            energy, outside = new_energy, new_outside
+            if (outside, energy) < best[:2]:
+                best = (outside, energy, new_decoded)
+                if outside == 0:
+                    break
+        temperature *= cooling
+
+    xs, ys, widths, lengths = best[2]
+    sizes = ((box_w, box_l), (box_l, box_w))
+    placed = [
+        (xs[c] * scale, ys[c] * scale, *sizes[widths[c] != a])
+        for c in range(n)
+        if xs[c] + widths[c] <= width and ys[c] + lengths[c] <= length
+    ]
+    if len(placed) < len(seed_layout):
+        placed = list(seed_layout)
+    placed.sort(key=lambda item: (item[1], item[0]))
+    return AnnealingResult(len(placed), placed, moves, complete)
+
+
+__all__ = ["AnnealingResult", "DEFAULT_ITERATIONS", "MAX_CARTONS", "anneal_layout"]
@@ -0,0 +1,113 @@
+"""Carton counts per sub-rectangle for one carton / pallet pair.
+
+Block-based generators split the pallet at combinations of the carton sides
+and fill every part with a uniform grid, so the same ``int(span // side)``
+counts are asked for again and again.  :class:`CapacityTable` answers them
+from one memo per carton and pallet pair, so every span is divided once and
+a block's grid size is known before any coordinates are built.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+LayerLayout = List[Tuple[float, float, float, float]]
+
+
+class CapacityTable:
+    """Uniform-grid capacities of sub-rectangles of a pallet.
+
+    ``fit(span, side)`` is ``int(span // side)`` (``0`` for a non-positive
+    side), ``count(w, l, rotated)`` the number of cartons a ``w x l`` block
+    holds in one orientation and ``block`` materialises that grid.  Results
+    are identical to evaluating the expressions directly.
+    """
+
+    def __init__(
+        self, box_w: float, box_l: float, pallet_w: float, pallet_l: float
+    ) -> None:
+        self.box_w = box_w
+        self.box_l = box_l
+        self.pallet_w = pallet_w
+        self.pallet_l = pallet_l
+        self._fits: Dict[Tuple[float, float], int] = {}
+        self._grids: Dict[Tuple[float, float, bool], Tuple[int, int]] = {}
+        self._steps: Dict[float, List[float]] = {}
+
+    def fit(self, span: float, side: float) -> int:
+        key = (span, side)
+        value = self._fits.get(key)
+        if value is None:
+            value = int(span // side) if side > 0 else 0
+            self._fits[key] = value
+        return value
+
+    def size(self, rotated: bool = False) -> Tuple[float, float]:
+        return (self.box_l, self.box_w) if rotated else (self.box_w, self.box_l)
+
+    def grid(
+        self, block_w: float, block_l: float, rotated: bool = False
+    ) -> Tuple[int, int]:
+        """``(columns, rows)`` of the uniform grid in a ``block_w x block_l``."""
+
+        key = (block_w, block_l, rotated)
+        grid = self._grids.get(key)
+        if grid is None:
+            box_w, box_l = self.size(rotated)
+            grid = (self.fit(block_w, box_w), self.fit(block_l, box_l))
+            self._grids[key] = grid
+        return grid
+
+    def count(self, block_w: float, block_l: float, rotated: bool = False) -> int:
+        cols, rows = self.grid(block_w, block_l, rotated)
+        if cols <= 0 or rows <= 0:
+            return 0
+        return cols * rows
+
+    def best(self, block_w: float, block_l: float) -> Tuple[int, bool]:
+        """Larger of the two orientation counts and whether it is rotated."""
+
+        upright = self.count(block_w, block_l)
+        rotated = self.count(block_w, block_l, True)
+        return (rotated, True) if rotated > upright else (upright, False)
+
+    def _offsets(self, side: float, count: int) -> List[float]:
+        offsets = self._steps.get(side)
+        if offsets is None or len(offsets) < count:
+            offsets = [i * side for i in range(count)]
+            self._steps[side] = offsets
+        return offsets[:count] if len(offsets) > count else offsets
+
+    def block(
+        self,
+        x0: float,
+        y0: float,
+        block_w: float,
+        block_l: float,
+        rotated: bool = False,
+    ) -> LayerLayout:
+        """Cartons of the ``block_w x block_l`` grid anchored at ``(x0, y0)``."""
+
+        cols, rows = self.grid(block_w, block_l, rotated)
+        if cols <= 0 or rows <= 0:
+            return []
+        box_w, box_l = self.size(rotated)
+        xs = self._offsets(box_w, cols)
+        return [
+            (x0 + dx, y0 + dy, box_w, box_l)
+            for dy in self._offsets(box_l, rows)
+            for dx in xs
+        ]
+
+
+@lru_cache(maxsize=32)
+def capacity_table(
+    box_w: float, box_l: float, pallet_w: float, pallet_l: float
+) -> CapacityTable:
+    """Shared :class:`CapacityTable`, built once per carton and pallet."""
+
+    return CapacityTable(box_w, box_l, pallet_w, pallet_l)
+
+
+__all__ = ["CapacityTable", "capacity_table"]
@@ -0,0 +1,169 @@
+"""Maximal free rectangles of a bin, for void-fill style placement.
+
+:class:`FreeSpace` keeps the empty part of a bin as the set of maximal free
+rectangles (MaxRects).  Rectangles are stored by their corners, so splits
+reuse the exact coordinates of the occupying rectangle and never accumulate
+rounding.  An index of x-intervals limits each split to the free rectangles
+that can overlap it, split pieces contained in another free rectangle are
+pruned immediately, and a max-heap by area with lazy deletion returns the
+largest free rectangle without re-sorting.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+Rect = Tuple[float, float, float, float]
+# Free rectangle corners: (x0, y0, x1, y1).
+_Corners = Tuple[float, float, float, float]
+
+
+class FreeSpace:
+    """Free space of the ``width x height`` bin anchored at ``(x, y)``.
+
+    ``usable(w, h)`` filters rectangles that are worth keeping, typically
+    "a carton fits in some orientation"; rectangles failing it are dropped
+    together with everything that would be split from them.  ``cell`` is the
+    bucket width of the x-interval index and defaults to a sixteenth of the
+    bin width.
+    """
+
+    def __init__(
+        self,
+        width: float,
+        height: float,
+        *,
+        x: float = 0.0,
+        y: float = 0.0,
+        usable: Callable[[float, float], bool] | None = None,
+        cell: float | None = None,
+    ) -> None:
+        self.usable = usable
+        self.origin = x
+        self.cell = cell if cell and cell > 0 else (width / 16 if width > 0 else 1.0)
+        self._rects: Dict[int, _Corners] = {}
+        self._heap: List[Tuple[float, int]] = []
+        self._buckets: Dict[int, Set[int]] = {}
+        self._next_id = 0
+        if width > 0 and height > 0 and self._keep(width, height):
+            self._add((x, y, x + width, y + height))
+
+    # -- bookkeeping ---------------------------------------------------
+    def _keep(self, w: float, h: float) -> bool:
+        return w > 0 and h > 0 and (self.usable is None or self.usable(w, h))
+
+    def _columns(self, x0: float, x1: float) -> range:
+        start = math.floor((x0 - self.origin) / self.cell)
+        return range(start, math.floor((x1 - self.origin) / self.cell) + 1)
+
+    def _add(self, rect: _Corners) -> int:
+        rect_id = self._next_id
+        self._next_id += 1
+        self._rects[rect_id] = rect
+        x0, y0, x1, y1 = rect
+        heapq.heappush(self._heap, (-(x1 - x0) * (y1 - y0), rect_id))
+        for column in self._columns(x0, x1):
+            self._buckets.setdefault(column, set()).add(rect_id)
+        return rect_id
+
+    def _remove(self, rect_id: int) -> None:
+        x0, _, x1, _ = self._rects.pop(rect_id)
+        for column in self._columns(x0, x1):
+            self._buckets[column].discard(rect_id)
+
+    def _near(self, x0: float, x1: float) -> Set[int]:
+        found: Set[int] = set()
+        for column in self._columns(x0, x1):
+            found.update(self._buckets.get(column, ()))
+        return found
+
+    def _containing(self, rect: _Corners) -> Iterator[int]:
+        x0, y0, x1, y1 = rect
+        # A container spans x0, so it is listed in x0's bucket.
+        column = math.floor((x0 - self.origin) / self.cell)
+        for rect_id in self._buckets.get(column, ()):
+            fx0, fy0, fx1, fy1 = self._rects[rect_id]
+            if fx0 <= x0 and fy0 <= y0 and x1 <= fx1 and y1 <= fy1:
+                yield rect_id
+
+    # -- queries -------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._rects)
+
+    def __iter__(self) -> Iterator[Rect]:
+        for x0, y0, x1, y1 in self._rects.values():
+            yield (x0, y0, x1 - x0, y1 - y0)
+
+    def overlapping(self, x: float, y: float, w: float, h: float) -> List[Rect]:
+        """Free rectangles whose interior meets ``(x, y, w, h)``."""
+
+        x1, y1 = x + w, y + h
+        found = []
+        for rect_id in sorted(self._near(x, x1)):
+            fx0, fy0, fx1, fy1 = self._rects[rect_id]
+            if fx0 < x1 and x < fx1 and fy0 < y1 and y < fy1:
+                found.append((fx0, fy0, fx1 - fx0, fy1 - fy0))
+        return found
+
+    def is_free(self, x: float, y: float, w: float, h: float) -> bool:
+        """Whether ``(x, y, w, h)`` lies entirely in free space.
+
+        Every empty rectangle is contained in some maximal free rectangle, so
+        one containment test per candidate is enough.
+        """
+
+        return next(self._containing((x, y, x + w, y + h)), None) is not None
+
+    def largest(self) -> Optional[Rect]:
+        """The free rectangle of largest area; the oldest one on ties."""
+
+        heap = self._heap
+        while heap:
+            rect_id = heap[0][1]
+            rect = self._rects.get(rect_id)
+            if rect is not None:
+                x0, y0, x1, y1 = rect
+                return (x0, y0, x1 - x0, y1 - y0)
+            heapq.heappop(heap)
+        return None
+
+    # -- updates -------------------------------------------------------
+    def occupy(self, x: float, y: float, w: float, h: float) -> None:
+        """Mark ``(x, y, w, h)`` as used, splitting the free rectangles."""
+
+        px1, py1 = x + w, y + h
+        fresh: List[int] = []
+        for rect_id in sorted(self._near(x, px1)):
+            mx0, my0, mx1, my1 = self._rects[rect_id]
+            if mx0 >= px1 or mx1 <= x or my0 >= py1 or my1 <= y:
+                continue
+            self._remove(rect_id)
+            pieces = []
+            if x > mx0:
+                pieces.append((mx0, my0, x, my1))
+            if px1 < mx1:
+                pieces.append((px1, my0, mx1, my1))
+            if py1 < my1:
+                pieces.append((mx0, py1, mx1, my1))
+            if y > my0:
+                pieces.append((mx0, my0, mx1, y))
+            for piece in pieces:
+                if self._keep(piece[2] - piece[0], piece[3] - piece[1]):
+                    fresh.append(self._add(piece))
+
+        # Untouched rectangles were maximal already and no piece can contain
+        # them, so only the pieces are checked; of equal pieces the first
+        # one is kept.
+        for rect_id in fresh:
+            rect = self._rects.get(rect_id)
+            if rect is None:
+                continue
+            for other in list(self._containing(rect)):
+                if other != rect_id and (self._rects[other] != rect or other < rect_id):
+                    self._remove(rect_id)
+                    break
+
+
+__all__ = ["FreeSpace"]
@@ -1,28 +1,256 @@
 from __future__ import annotations
 
+import time
+from bisect import insort
 from typing import Dict, List, Tuple
 
 from palletizer_core.signature import layout_signature
 
+from .raster import SCALE, RasterPoints, integer_grid
+
 LayerLayout = List[Tuple[float, float, float, float]]
 
+DEFAULT_NODE_LIMIT = 100_000
+
+# Cut tree node: ("grid", rotated) | ("vcut", x) | ("hcut", y).  The children
+# of a cut are the memoised best plans one level deeper.
+_Plan = Tuple
+# Placements on the integer grid, relative to the sub-rectangle's corner.
+_Layout = Tuple[Tuple[int, int, int, int], ...]
+
+
+class _KBest:
+    """The ``k`` densest distinct layouts offered so far, first ones on ties."""
+
+    def __init__(self, k: int) -> None:
+        self.k = k
+        self._items: List[Tuple[int, int, _Layout]] = []
+        self._seen = set()
+
+    @property
+    def floor(self) -> int:
+        """Count a new layout must exceed to enter; ``-1`` while not full."""
+
+        if len(self._items) < self.k:
+            return -1
+        return -self._items[-1][0]
+
+    def add(self, layout: _Layout) -> None:
+        if len(layout) <= self.floor:
+            return
+        key = frozenset(layout)
+        if key in self._seen:
+            return
+        self._seen.add(key)
+        insort(self._items, (-len(layout), len(self._seen), layout))
+        if len(self._items) > self.k:
+            self._items.pop()
+
+    def layouts(self) -> List[_Layout]:
+        return [layout for _, _, layout in self._items]
+
+
+class _GuillotineDP:
+    """Count-only k-stage guillotine DP over raster points.
+
+    ``best(width, length, depth)`` stores just ``(count, plan)`` per reduced
+    sub-rectangle and remaining depth, so the cost grows with the number of
+    distinct sub-rectangles instead of the number of layouts.
+    """
+
+    def __init__(
+        self,
+        a: int,
+        b: int,
+        node_limit: int,
+        k: int = 1,
+        deadline: float | None = None,
+    ) -> None:
+        self.a = a
+        self.b = b
+        self.points = RasterPoints(a, b)
+        self.node_limit = node_limit
+        self.k = k
+        self.deadline = deadline
+        self.nodes = 0
+        self.exhausted = False
+        self._memo: Dict[Tuple[int, int, int], Tuple[int, _Plan]] = {}
+        self._variants: Dict[Tuple[int, int, int], List[_Layout]] = {}
+
+    def grid(self, width: int, length: int) -> Tuple[int, _Plan]:
+        upright = (width // self.a) * (length // self.b)
+        rotated = (width // self.b) * (length // self.a)
+        if rotated > upright:
+            return rotated, ("grid", True)
+        return upright, ("grid", False)
+
+    def best(self, width: int, length: int, depth: int) -> Tuple[int, _Plan]:
+        width = self.points.reduce(width)
+        length = self.points.reduce(length)
+        key = (width, length, depth)
+        cached = self._memo.get(key)
+        if cached is not None:
+            return cached
+        count, plan = self.grid(width, length)
+        if depth > 0 and count < (width * length) // (self.a * self.b):
+            for cut, value in self.cuts(width, length, depth, mirror=False):
+                if value > count:
+                    count, plan = value, cut
+        self._memo[key] = (count, plan)
+        return count, plan
+
+    def _spend(self) -> bool:
+        # Once the budget is spent, sub-rectangles not solved yet fall back to
+        # their homogeneous grid, which keeps the result deterministic.  The
+        # wall-clock ``deadline`` (``time.monotonic()``) ends it early.
+        if self.exhausted:
+            return False
+        self.nodes += 1
+        if self.nodes > self.node_limit or (
+            self.deadline is not None
+            and self.nodes % 256 == 0
+            and time.monotonic() > self.deadline
+        ):
+            self.exhausted = True
+            return False
+        return True
+
+    def cuts(
+        self, width: int, length: int, depth: int, *, mirror: bool
+    ) -> List[Tuple[_Plan, int]]:
+        """Return every single cut of the rectangle with its best count.
+
+        Without ``mirror`` only cuts in the lower half are listed, since the
+        mirrored cut holds the same number of cartons.  The root listing
+        (``mirror=True``) is not charged to the node budget.
+        """
 
-def _grid_layout_int(
-    rect_w: int, rect_l: int, box_w: int, box_l: int
-) -> List[Tuple[int, int, int, int]]:
-    cols = rect_w // box_w if box_w > 0 else 0
-    rows = rect_l // box_l if box_l > 0 else 0
-    layout: List[Tuple[int, int, int, int]] = []
-    for i in range(cols):
-        for j in range(rows):
-            layout.append((i * box_w, j * box_l, box_w, box_l))
-    return layout
+        result: List[Tuple[_Plan, int]] = []
+        for x in self.points.raster(width):
+            if mirror or 2 * x <= width:
+                if not mirror and not self._spend():
+                    return result
+                value = (
+                    self.best(x, length, depth - 1)[0]
+                    + self.best(width - x, length, depth - 1)[0]
+                )
+                result.append((("vcut", x), value))
+        for y in self.points.raster(length):
+            if mirror or 2 * y <= length:
+                if not mirror and not self._spend():
+                    return result
+                value = (
+                    self.best(width, y, depth - 1)[0]
+                    + self.best(width, length - y, depth - 1)[0]
+                )
+                result.append((("hcut", y), value))
+        return result
 
+    def variants(
+        self, width: int, length: int, depth: int, k: int = 0
+    ) -> List[_Layout]:
+        """Return up to ``k`` (default ``self.k``) distinct layouts, densest first.
 
-def _layout_score(layout: List[Tuple[int, int, int, int]]) -> Tuple[int, int]:
-    count = len(layout)
-    area = sum(w * length for _, _, w, length in layout)
-    return count, area
+        Both grids and every cut are candidates; a cut combines the k best
+        layouts of its two parts and is only expanded while its DP count can
+        still beat the current k-th layout.  Once the node budget is spent,
+        parts fall back to their single best layout.
+        """
+
+        width = self.points.reduce(width)
+        length = self.points.reduce(length)
+        key = (width, length, depth)
+        cached = self._variants.get(key)
+        if cached is not None:
+            return cached
+        ranked = _KBest(k or self.k)
+        for rotated in (False, True) if self.a != self.b else (False,):
+            layout = self._grid_layout(width, length, rotated)
+            if layout:
+                ranked.add(layout)
+        if depth > 0:
+            options: List[Tuple[int, _Plan]] = []
+            for x in self.points.raster(width):
+                bound = (
+                    self.best(x, length, depth - 1)[0]
+                    + self.best(width - x, length, depth - 1)[0]
+                )
+                options.append((bound, ("vcut", x)))
+            for y in self.points.raster(length):
+                bound = (
+                    self.best(width, y, depth - 1)[0]
+                    + self.best(width, length - y, depth - 1)[0]
+                )
+                options.append((bound, ("hcut", y)))
+            options.sort(key=lambda option: -option[0])
+            for bound, (kind, cut) in options:
+                if bound <= ranked.floor:
+                    break
+                if kind == "vcut":
+                    first = self._part_layouts(cut, length, depth - 1)
+                    second = self._part_layouts(width - cut, length, depth - 1)
+                    shift = (cut, 0)
+                else:
+                    first = self._part_layouts(width, cut, depth - 1)
+                    second = self._part_layouts(width, length - cut, depth - 1)
+                    shift = (0, cut)
+                top_second = len(second[0]) if second else 0
+                for head in first:
+                    if len(head) + top_second <= ranked.floor:
+                        break
+                    for tail in second:
+                        if len(head) + len(tail) <= ranked.floor:
+                            break
+                        ranked.add(
+                            head
+                            + tuple(
+                                (x + shift[0], y + shift[1], w, l_)
+                                for x, y, w, l_ in tail
+                            )
+                        )
+        result = ranked.layouts()
+        self._variants[key] = result
+        return result
+
+    def _part_layouts(self, width: int, length: int, depth: int) -> List[_Layout]:
+        if self._spend():
+            return self.variants(width, length, depth)
+        count, plan = self.best(width, length, depth)
+        if count <= 0:
+            return []
+        return [tuple(self.place(width, length, depth, plan, 0, 0))]
+
+    def _grid_layout(self, width: int, length: int, rotated: bool) -> _Layout:
+        w, l_ = (self.b, self.a) if rotated else (self.a, self.b)
+        return tuple(
+            (i * w, j * l_, w, l_)
+            for i in range(width // w)
+            for j in range(length // l_)
+        )
+
+    def place(
+        self, width: int, length: int, depth: int, plan: _Plan, x0: int, y0: int
+    ) -> List[Tuple[int, int, int, int]]:
+        width = self.points.reduce(width)
+        length = self.points.reduce(length)
+        kind = plan[0]
+        if kind == "grid":
+            w, l_ = (self.b, self.a) if plan[1] else (self.a, self.b)
+            return [
+                (x0 + i * w, y0 + j * l_, w, l_)
+                for i in range(width // w)
+                for j in range(length // l_)
+            ]
+        cut = plan[1]
+        if kind == "vcut":
+            parts = ((cut, length, x0, y0), (width - cut, length, x0 + cut, y0))
+        else:
+            parts = ((width, cut, x0, y0), (width, length - cut, x0, y0 + cut))
+        placed: List[Tuple[int, int, int, int]] = []
+        for w, l_, px, py in parts:
+            child = self.best(w, l_, depth - 1)[1]
+            placed.extend(self.place(w, l_, depth - 1, child, px, py))
+        return placed
 
 
 def generate_guillotine_layouts(
@@ -34,91 +262,48 @@ def generate_guillotine_layouts(
     max_variants: int = 30,
     max_depth: int = 3,
     per_split_limit: int = 6,
+    node_limit: int = DEFAULT_NODE_LIMIT,
+    deadline: float | None = None,
 ) -> List[LayerLayout]:
-    if pallet_w <= 0 or pallet_l <= 0 or box_w <= 0 or box_l <= 0:
-        return []
-
-    scale = 1000
-    pw = int(round(pallet_w * scale))
-    pl = int(round(pallet_l * scale))
-    bw = int(round(box_w * scale))
-    bl = int(round(box_l * scale))
+    """Return up to ``max_variants`` guillotine layouts, densest first.
 
-    cache: Dict[Tuple[int, int, int], List[List[Tuple[int, int, int, int]]]] = {}
+    The DP finds the best count for every sub-rectangle with up to
+    ``max_depth`` nested cuts.  Variants are then enumerated k-best: every
+    sub-rectangle reached keeps its ``max_variants`` densest distinct layouts,
+    and cuts whose DP count cannot beat the current k-th layout are never
+    expanded.  Layouts mirroring an earlier one are skipped.
+    ``node_limit`` caps the number of cuts evaluated for very small cartons;
+    past ``deadline`` (a :func:`time.monotonic` value) the search stops the
+    same way and the layouts found so far are returned.
+    ``per_split_limit`` is accepted for compatibility and no longer used.
+    """
 
-    cut_steps = sorted({bw, bl})
-
-    def cut_positions(total: int) -> List[int]:
-        positions = set()
-        min_step = min(cut_steps) if cut_steps else 0
-        for step in cut_steps:
-            if step <= 0:
-                continue
-            pos = step
-            while pos < total - min_step:
-                positions.add(pos)
-                pos += step
-        return sorted(positions)
-
-    def pack(rect_w: int, rect_l: int, depth: int) -> List[List[Tuple[int, int, int, int]]]:
-        key = (rect_w, rect_l, depth)
-        if key in cache:
-            return cache[key]
-
-        layouts: List[List[Tuple[int, int, int, int]]] = []
-
-        grid_a = _grid_layout_int(rect_w, rect_l, bw, bl)
-        if grid_a:
-            layouts.append(grid_a)
+    if pallet_w <= 0 or pallet_l <= 0 or box_w <= 0 or box_l <= 0:
+        return []
+    if max_variants <= 0:
+        return []
 
-        if bw != bl:
-            grid_b = _grid_layout_int(rect_w, rect_l, bl, bw)
-            if grid_b:
-                layouts.append(grid_b)
+    width, length, a, b, unit = integer_grid(pallet_w, pallet_l, box_w, box_l)
+    dp = _GuillotineDP(
+        a, b, max(0, int(node_limit)), k=max_variants, deadline=deadline
+    )
+    dp.best(width, length, max_depth)
 
-        if depth > 0:
-            for cut in cut_positions(rect_w):
-                left = pack(cut, rect_l, depth - 1)[:per_split_limit]
-                right = pack(rect_w - cut, rect_l, depth - 1)[:per_split_limit]
-                for left_layout in left:
-                    for right_layout in right:
-                        combined = list(left_layout)
-                        combined.extend(
-                            (x + cut, y, w, lgt) for x, y, w, lgt in right_layout
-                        )
-                        layouts.append(combined)
-
-            for cut in cut_positions(rect_l):
-                bottom = pack(rect_w, cut, depth - 1)[:per_split_limit]
-                top = pack(rect_w, rect_l - cut, depth - 1)[:per_split_limit]
-                for b in bottom:
-                    for t in top:
-                        combined = list(b)
-                        combined.extend((x, y + cut, w, lgt) for x, y, w, lgt in t)
-                        layouts.append(combined)
-
-        ranked: List[Tuple[Tuple[int, int], List[Tuple[int, int, int, int]]]] = []
-        seen = set()
-        for layout in layouts:
-            signature = tuple(sorted(layout))
-            if signature in seen:
-                continue
-            seen.add(signature)
-            ranked.append((_layout_score(layout), layout))
-
-        ranked.sort(key=lambda item: (item[0][0], item[0][1], item[1]), reverse=True)
-        cache[key] = [layout for _, layout in ranked[:max_variants]]
-        return cache[key]
-
-    int_layouts = pack(pw, pl, max_depth)
+    # Mirrored layouts share a symmetric signature, so the root keeps a
+    # longer list than the parts.
     layouts: List[LayerLayout] = []
     seen = set()
-    for layout in int_layouts:
+    for placed in dp.variants(width, length, max_depth, k=4 * max_variants):
         float_layout = [
-            (x / scale, y / scale, w / scale, length / scale)
-            for x, y, w, length in layout
+            (
+                x * unit / SCALE,
+                y * unit / SCALE,
+                box_w if w == a else box_l,
+                box_l if w == a else box_w,
+            )
+            for x, y, w, _ in placed
         ]
-        signature = layout_signature(float_layout)
+        signature = layout_signature(float_layout, symmetric=True)
         if signature in seen:
             continue
         seen.add(signature)
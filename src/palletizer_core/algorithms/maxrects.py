@@ -0,0 +1,231 @@
+"""MaxRects bin packing specialised for a single carton type.
+
+Free space is kept as the list of maximal free rectangles (Jylänki's
+MaxRects).  Because every item has the same size, a free rectangle that is
+too small for the carton in every allowed orientation can never receive a
+carton, and neither can anything split from it or contained in it, so such
+rectangles are dropped as soon as they appear.  The list therefore only
+holds usable rectangles, each stored with its far corner, and after a
+placement only the freshly split rectangles are checked for containment:
+the surviving ones were already maximal.
+
+With :data:`BEST_SHORT_SIDE_FIT` the placements are identical to
+``rectpack``'s ``MaxRectsBssf`` (the default ``newPacker`` algorithm),
+including its tie-breaking order.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+LayerLayout = List[Tuple[float, float, float, float]]
+
+BEST_SHORT_SIDE_FIT = "best_short_side_fit"
+BOTTOM_LEFT = "bottom_left"
+CONTACT_POINT = "contact_point"
+STRATEGIES = (BEST_SHORT_SIDE_FIT, BOTTOM_LEFT, CONTACT_POINT)
+
+# Free rectangle: (x, y, width, height, right, top).
+_Free = Tuple[float, float, float, float, float, float]
+
+
+def _free(x: float, y: float, w: float, h: float) -> _Free:
+    return (x, y, w, h, x + w, y + h)
+
+
+def _overlap(a0: float, a1: float, b0: float, b1: float) -> float:
+    return max(0.0, min(a1, b1) - max(a0, b0))
+
+
+class MaxRectsBin:
+    """A ``width x height`` bin receiving ``box_w x box_l`` cartons.
+
+    ``strategy`` selects the free rectangle and orientation of each
+    carton; ties keep the first candidate in free-list order, upright
+    orientations before rotated ones.
+    """
+
+    def __init__(
+        self,
+        width: float,
+        height: float,
+        box_w: float,
+        box_l: float,
+        *,
+        strategy: str = BEST_SHORT_SIDE_FIT,
+        rotation: bool = True,
+    ) -> None:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown MaxRects strategy: {strategy!r}")
+        self.width = width
+        self.height = height
+        self.strategy = strategy
+        self.orientations = [(box_w, box_l)]
+        if rotation and box_w != box_l:
+            self.orientations.append((box_l, box_w))
+        self.placed: LayerLayout = []
+        self.free: List[_Free] = []
+        if self._usable(width, height):
+            self.free.append(_free(0, 0, width, height))
+        # Placed edges keyed by coordinate, for the contact-point score.
+        self._edges: Tuple[Dict[float, List[Tuple[float, float]]], ...] = (
+            {},
+            {},
+            {},
+            {},
+        )
+
+    def _usable(self, w: float, h: float) -> bool:
+        return any(ow <= w and oh <= h for ow, oh in self.orientations)
+
+    # -- selection -----------------------------------------------------
+    def _select(self) -> Optional[Tuple[float, float, float, float]]:
+        best = None
+        best_score = None
+        strategy = self.strategy
+        for ow, oh in self.orientations:
+            for fx, fy, fw, fh, _, _ in self.free:
+                if ow > fw or oh > fh:
+                    continue
+                if strategy == BEST_SHORT_SIDE_FIT:
+                    score = min(fw - ow, fh - oh)
+                elif strategy == BOTTOM_LEFT:
+                    score = (fy + oh, fx)
+                else:
+                    score = -self._contact(fx, fy, ow, oh)
+                if best_score is None or score < best_score:
+                    best, best_score = (fx, fy, ow, oh), score
+        return best
+
+    def _contact(self, x: float, y: float, w: float, h: float) -> float:
+        right, top = x + w, y + h
+        score = 0.0
+        if x == 0:
+            score += h
+        if right == self.width:
+            score += h
+        if y == 0:
+            score += w
+        if top == self.height:
+            score += w
+        by_right, by_left, by_top, by_bottom = self._edges
+        for y0, y1 in by_right.get(x, ()):
+            score += _overlap(y, top, y0, y1)
+        for y0, y1 in by_left.get(right, ()):
+            score += _overlap(y, top, y0, y1)
+        for x0, x1 in by_top.get(y, ()):
+            score += _overlap(x, right, x0, x1)
+        for x0, x1 in by_bottom.get(top, ()):
+            score += _overlap(x, right, x0, x1)
+        return score
+
+    # -- placement -----------------------------------------------------
+    def insert(self) -> Optional[Tuple[float, float, float, float]]:
+        """Place one more carton and return it, or ``None`` when full."""
+
+        rect = self._select()
+        if rect is None:
+            return None
+        px, py, pw, ph = rect
+        p_right = px + pw
+        p_top = py + ph
+
+        usable = self._usable
+        updated: List[_Free] = []
+        fresh: List[_Free] = []
+        for m in self.free:
+            mx, my, mw, mh, m_right, m_top = m
+            if my >= p_top or m_top <= py or mx >= p_right or m_right <= px:
+                updated.append(m)
+                continue
+            splits = []
+            if px > mx:
+                splits.append((mx, my, px - mx, mh))
+            if p_right < m_right:
+                splits.append((p_right, my, m_right - p_right, mh))
+            if p_top < m_top:
+                splits.append((mx, p_top, mw, m_top - p_top))
+            if py > my:
+                splits.append((mx, my, mw, py - my))
+            for sx, sy, sw, sh in splits:
+                if usable(sw, sh):
+                    piece = _free(sx, sy, sw, sh)
+                    updated.append(piece)
+                    fresh.append(piece)
+
+        if fresh:
+            # Rectangles that survived the split were maximal already and no
+            # split piece can contain them; only the pieces need checking.
+            # Equal rectangles are all dropped, as rectpack does.
+            contained = set()
+            for piece in fresh:
+                nx, ny, _, _, n_right, n_top = piece
+                for other in updated:
+                    if other is piece:
+                        continue
+                    if (
+                        ny >= other[1]
+                        and nx >= other[0]
+                        and n_top <= other[5]
+                        and n_right <= other[4]
+                    ):
+                        contained.add(piece[:4])
+                        break
+            if contained:
+                updated = [m for m in updated if m[:4] not in contained]
+        self.free = updated
+
+        self.placed.append(rect)
+        if self.strategy == CONTACT_POINT:
+            by_right, by_left, by_top, by_bottom = self._edges
+            by_right.setdefault(p_right, []).append((py, p_top))
+            by_left.setdefault(px, []).append((py, p_top))
+            by_top.setdefault(p_top, []).append((px, p_right))
+            by_bottom.setdefault(py, []).append((px, p_right))
+        return rect
+
+
+def pack_identical(
+    width: float,
+    height: float,
+    box_w: float,
+    box_l: float,
+    *,
+    strategy: str = BEST_SHORT_SIDE_FIT,
+    rotation: bool = True,
+    max_items: int | None = None,
+    deadline: float | None = None,
+) -> LayerLayout:
+    """Pack identical cartons into ``width x height`` until none fits.
+
+    Returns the ``(x, y, w, l)`` placements in insertion order, at most
+    ``max_items`` of them when given, and only those inserted before
+    ``deadline`` (a :func:`time.monotonic` value) when one is given.
+    """
+
+    if box_w <= 0 or box_l <= 0:
+        return []
+    packer = MaxRectsBin(
+        width, height, box_w, box_l, strategy=strategy, rotation=rotation
+    )
+    while max_items is None or len(packer.placed) < max_items:
+        if (
+            deadline is not None
+            and len(packer.placed) % 64 == 63
+            and time.monotonic() > deadline
+        ):
+            break
+        if packer.insert() is None:
+            break
+    return packer.placed
+
+
+__all__ = [
+    "BEST_SHORT_SIDE_FIT",
+    "BOTTOM_LEFT",
+    "CONTACT_POINT",
+    "STRATEGIES",
+    "MaxRectsBin",
+    "pack_identical",
+]
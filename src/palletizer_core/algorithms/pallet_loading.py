@@ -0,0 +1,316 @@
+"""Bounded exact search for the single-carton pallet loading problem.
+
+The solver packs as many identical ``box_w x box_l`` cartons (either
+orientation) as possible into a ``pallet_w x pallet_l`` rectangle.  It
+recursively splits the rectangle with guillotine cuts and first-order
+non-guillotine 5-block partitions (Morabito & Morales), restricted to raster
+points and memoised on sub-rectangle dimensions.  Every sub-problem is
+bounded by the area bound and Barnes' bar-colouring bound, which prunes most
+partitions and proves optimality whenever a layout reaches the bound.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .raster import SCALE, RasterPoints, integer_grid
+
+LayerLayout = List[Tuple[float, float, float, float]]
+
+DEFAULT_NODE_LIMIT = 200_000
+
+# Plan of a memoised sub-rectangle:
+#   ("grid", rotated) | ("vcut", x) | ("hcut", y) | ("block5", x1, x2, y1, y2)
+_Plan = Tuple
+
+
+@dataclass(frozen=True)
+class PalletLoadingResult:
+    """Outcome of :func:`solve_pallet_loading`.
+
+    ``count`` cartons are placed by ``layout``; no layout can hold more than
+    ``upper_bound``.  ``complete`` is ``False`` when the node or time budget
+    cut the search short.
+    """
+
+    count: int
+    upper_bound: int
+    layout: LayerLayout = field(default_factory=list)
+    nodes: int = 0
+    complete: bool = True
+
+    @property
+    def gap(self) -> int:
+        return max(0, self.upper_bound - self.count)
+
+    @property
+    def optimal(self) -> bool:
+        return self.count >= self.upper_bound
+
+
+def _min_colour_count(width: int, length: int, bar: int) -> int:
+    """Return the rarest colour count of ``(i + j) mod bar`` over the grid.
+
+    Every ``1 x bar`` strip covers each colour exactly once, so no packing of
+    the ``width x length`` grid holds more strips than this (Barnes).
+    """
+
+    r = width % bar
+    s = length % bar
+    full = (width * length - r * s) // bar
+    if r == 0 or s == 0:
+        return full
+    # Cells of the r x s corner on anti-diagonal t: min(t+1, r, s, r+s-1-t).
+    corner = math.inf
+    for colour in range(bar):
+        total = 0
+        for t in (colour, colour + bar):
+            if t <= r + s - 2:
+                total += min(t + 1, r, s, r + s - 1 - t)
+        corner = min(corner, total)
+    return full + int(corner)
+
+
+class _Solver:
+    def __init__(
+        self,
+        a: int,
+        b: int,
+        node_limit: int,
+        deadline: Optional[float],
+    ) -> None:
+        self.a = a
+        self.b = b
+        self.node_limit = node_limit
+        self.deadline = deadline
+        self.nodes = 0
+        self.exhausted = False
+        self._points = RasterPoints(a, b)
+        self.reduce = self._points.reduce
+        self.raster = self._points.raster
+        self._bounds: Dict[Tuple[int, int], int] = {}
+        self._memo: Dict[Tuple[int, int], Tuple[int, _Plan, bool]] = {}
+
+    # -- bounds --------------------------------------------------------
+    def upper_bound(self, width: int, length: int) -> int:
+        key = (width, length) if width <= length else (length, width)
+        bound = self._bounds.get(key)
+        if bound is None:
+            a, b = self.a, self.b
+            w, l_ = key
+            if min(w, l_) < min(a, b) or max(w, l_) < max(a, b):
+                bound = 0
+            else:
+                bound = min(
+                    (w * l_) // (a * b),
+                    _min_colour_count(w, l_, a) // b,
+                    _min_colour_count(w, l_, b) // a,
+                )
+            self._bounds[key] = bound
+        return bound
+
+    def _grid(self, width: int, length: int) -> Tuple[int, _Plan]:
+        upright = (width // self.a) * (length // self.b)
+        rotated = (width // self.b) * (length // self.a)
+        if rotated > upright:
+            return rotated, ("grid", True)
+        return upright, ("grid", False)
+
+    def _spend(self) -> bool:
+        if self.exhausted:
+            return False
+        self.nodes += 1
+        if self.nodes > self.node_limit or (
+            self.deadline is not None
+            and self.nodes % 1024 == 0
+            and time.perf_counter() > self.deadline
+        ):
+            self.exhausted = True
+            return False
+        return True
+
+    # -- search --------------------------------------------------------
+    def solve(self, width: int, length: int) -> int:
+        width = self.reduce(width)
+        length = self.reduce(length)
+        if width <= 0 or length <= 0:
+            return 0
+        cached = self._memo.get((width, length))
+        if cached is not None and (cached[2] or self.exhausted):
+            return cached[0]
+
+        bound = self.upper_bound(width, length)
+        best, plan = self._grid(width, length)
+        complete = True
+        if best < bound:
+            best, plan, complete = self._search(width, length, best, plan, bound)
+        self._memo[(width, length)] = (best, plan, complete)
+        return best
+
+    def _search(
+        self, width: int, length: int, best: int, plan: _Plan, bound: int
+    ) -> Tuple[int, _Plan, bool]:
+        ub = self.upper_bound
+        xs = self.raster(width)
+        ys = self.raster(length)
+
+        # Cuts nearest the middle first: the recursion then halves the
+        # rectangle and the narrower splits mostly hit the memo.
+        for x in reversed(xs):
+            if 2 * x > width:
+                continue
+            if not self._spend():
+                return best, plan, False
+            if ub(x, length) + ub(width - x, length) <= best:
+                continue
+            value = self.solve(x, length) + self.solve(width - x, length)
+            if value > best:
+                best, plan = value, ("vcut", x)
+                if best >= bound:
+                    return best, plan, True
+        for y in reversed(ys):
+            if 2 * y > length:
+                continue
+            if not self._spend():
+                return best, plan, False
+            if ub(width, y) + ub(width, length - y) <= best:
+                continue
+            value = self.solve(width, y) + self.solve(width, length - y)
+            if value > best:
+                best, plan = value, ("hcut", y)
+                if best >= bound:
+                    return best, plan, True
+
+        for i, x1 in enumerate(xs):
+            for x2 in xs[i + 1 :]:
+                # Rotating by 180 degrees maps (x1, x2) to (W-x2, W-x1).
+                if x1 + x2 > width:
+                    break
+                for k, y1 in enumerate(ys):
+                    for y2 in ys[k + 1 :]:
+                        blocks = (
+                            (x1, y2),
+                            (width - x1, y1),
+                            (width - x2, length - y1),
+                            (x2, length - y2),
+                            (x2 - x1, y2 - y1),
+                        )
+                        if not self._spend():
+                            return best, plan, False
+                        if sum(ub(w, l_) for w, l_ in blocks) <= best:
+                            continue
+                        value = sum(self.solve(w, l_) for w, l_ in blocks)
+                        if value > best:
+                            best, plan = value, ("block5", x1, x2, y1, y2)
+                            if best >= bound:
+                                return best, plan, True
+        return best, plan, True
+
+    # -- reconstruction ------------------------------------------------
+    def place(
+        self, width: int, length: int, x0: int, y0: int
+    ) -> List[Tuple[int, int, int, int]]:
+        width = self.reduce(width)
+        length = self.reduce(length)
+        if width <= 0 or length <= 0:
+            return []
+        entry = self._memo.get((width, length))
+        if entry is None:
+            _, plan = self._grid(width, length)
+        else:
+            plan = entry[1]
+        kind = plan[0]
+        if kind == "grid":
+            w, l_ = (self.b, self.a) if plan[1] else (self.a, self.b)
+            return [
+                (x0 + i * w, y0 + j * l_, w, l_)
+                for i in range(width // w)
+                for j in range(length // l_)
+            ]
+        if kind == "vcut":
+            x = plan[1]
+            return self.place(x, length, x0, y0) + self.place(
+                width - x, length, x0 + x, y0
+            )
+        if kind == "hcut":
+            y = plan[1]
+            return self.place(width, y, x0, y0) + self.place(
+                width, length - y, x0, y0 + y
+            )
+        _, x1, x2, y1, y2 = plan
+        return (
+            self.place(x1, y2, x0, y0)
+            + self.place(width - x1, y1, x0 + x1, y0)
+            + self.place(width - x2, length - y1, x0 + x2, y0 + y1)
+            + self.place(x2, length - y2, x0, y0 + y2)
+            + self.place(x2 - x1, y2 - y1, x0 + x1, y0 + y1)
+        )
+
+
+def layer_upper_bound(
+    pallet_w: float, pallet_l: float, box_w: float, box_l: float
+) -> int:
+    """Return the area / Barnes bound on cartons per layer without searching.
+
+    No layout of ``box_w x box_l`` cartons (either orientation) inside the
+    pallet holds more cartons; this is the ``upper_bound`` reported by
+    :func:`solve_pallet_loading`, computed in closed form.
+    """
+
+    if pallet_w <= 0 or pallet_l <= 0 or box_w <= 0 or box_l <= 0:
+        return 0
+    width, length, a, b, _ = integer_grid(pallet_w, pallet_l, box_w, box_l)
+    solver = _Solver(a, b, 0, None)
+    return solver.upper_bound(solver.reduce(width), solver.reduce(length))
+
+
+def solve_pallet_loading(
+    pallet_w: float,
+    pallet_l: float,
+    box_w: float,
+    box_l: float,
+    *,
+    node_limit: int = DEFAULT_NODE_LIMIT,
+    time_limit: float | None = None,
+) -> PalletLoadingResult:
+    """Return the densest guillotine / 5-block layout of identical cartons.
+
+    ``node_limit`` caps the number of partitions evaluated and keeps the
+    result deterministic; ``time_limit`` (seconds) additionally stops the
+    search on the wall clock.  The returned ``upper_bound`` holds for every
+    layout, so ``gap == 0`` proves the layout optimal.
+    """
+
+    if pallet_w <= 0 or pallet_l <= 0 or box_w <= 0 or box_l <= 0:
+        return PalletLoadingResult(count=0, upper_bound=0)
+
+    width, length, a, b, unit = integer_grid(pallet_w, pallet_l, box_w, box_l)
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    solver = _Solver(a, b, max(0, int(node_limit)), deadline)
+
+    count = solver.solve(width, length)
+    bound = solver.upper_bound(solver.reduce(width), solver.reduce(length))
+    placements = solver.place(width, length, 0, 0)
+
+    layout: LayerLayout = []
+    for x, y, w, _ in placements:
+        size = (box_w, box_l) if w == solver.a else (box_l, box_w)
+        layout.append((x * unit / SCALE, y * unit / SCALE, *size))
+    return PalletLoadingResult(
+        count=count,
+        upper_bound=max(bound, count),
+        layout=layout,
+        nodes=solver.nodes,
+        complete=not solver.exhausted,
+    )
+
+
+__all__ = [
+    "DEFAULT_NODE_LIMIT",
+    "PalletLoadingResult",
+    "layer_upper_bound",
+    "solve_pallet_loading",
+]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import math
+from bisect import bisect_right
+from typing import Dict, List, Tuple
+
+# Coordinates are scaled to integer micrometres before searching.
+SCALE = 1000
+
+
+def integer_grid(
+    pallet_w: float, pallet_l: float, box_w: float, box_l: float
+) -> Tuple[int, int, int, int, int]:
+    """Return ``(width, length, a, b, unit)`` on a common integer grid.
+
+    All sizes are scaled by :data:`SCALE` and divided by ``unit``, the
+    greatest common divisor of the carton sides, so ``a``/``b`` are coprime
+    and any layout coordinate is a multiple of ``unit / SCALE`` millimetres.
+    """
+
+    bw = int(round(box_w * SCALE))
+    bl = int(round(box_l * SCALE))
+    unit = math.gcd(bw, bl) or 1
+    width = int(round(pallet_w * SCALE)) // unit
+    length = int(round(pallet_l * SCALE)) // unit
+    return width, length, bw // unit, bl // unit, unit
+
+
+class RasterPoints:
+    """Normal patterns and raster points for cartons of sides ``a`` and ``b``.
+
+    Normal points are the sums ``i*a + j*b``; every packing can be pushed
+    left/down until its coordinates are normal points.  Raster points are the
+    normal points that remain after reducing ``value - r`` for each normal
+    ``r``, which is the smaller set of cut positions guillotine and 5-block
+    searches need to consider.
+    """
+
+    def __init__(self, a: int, b: int) -> None:
+        self.a = a
+        self.b = b
+        self._normal: List[int] = []
+        self._limit = -1
+        self._raster: Dict[int, List[int]] = {}
+
+    def _ensure(self, limit: int) -> None:
+        if limit <= self._limit:
+            return
+        points = set()
+        for i in range(limit // self.a + 1):
+            base = i * self.a
+            for j in range((limit - base) // self.b + 1):
+                points.add(base + j * self.b)
+        self._normal = sorted(points)
+        self._limit = limit
+
+    def reduce(self, value: int) -> int:
+        """Largest combination of the carton sides that fits in ``value``."""
+
+        if value <= 0:
+            return 0
+        self._ensure(value)
+        return self._normal[bisect_right(self._normal, value) - 1]
+
+    def raster(self, value: int) -> List[int]:
+        """Raster points strictly between ``0`` and ``value``."""
+
+        points = self._raster.get(value)
+        if points is None:
+            self._ensure(value)
+            stop = bisect_right(self._normal, value)
+            points = sorted(
+                {self.reduce(value - r) for r in self._normal[:stop]} - {0, value}
+            )
+            self._raster[value] = points
+        return points
+
+
+__all__ = ["SCALE", "RasterPoints", "integer_grid"]
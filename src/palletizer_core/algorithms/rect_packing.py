@@ -1,6 +1,9 @@
 import math
+import time
 
-from .void_fill import maximize_mixed_layout
+import numpy as np
+
+from .maxrects import BEST_SHORT_SIDE_FIT, BOTTOM_LEFT, CONTACT_POINT, pack_identical
 
 
 def pack_rectangles_2d(width, height, wprod, lprod, margin=0):
@@ -19,58 +22,83 @@ def pack_rectangles_2d(width, height, wprod, lprod, margin=0):
     return len(positions), positions
 
 
-def pack_rectangles_mixed_greedy(width, height, wprod, lprod, margin=0):
+def mixed_greedy_plan(width, height, wprod, lprod, margin=0):
+    """Count the best mixed greedy layout without building it.
+
+    The mixed greedy fills the pallet with upright columns followed by
+    rotated columns, or upright rows followed by rotated rows, and keeps
+    the split with the most cartons.  Every split's count is closed form,
+    so this returns ``(count, plan)`` where ``plan`` is ``None`` for an
+    empty layout or ``(by_rows, normal, rotated, eff_width, eff_height,
+    wprod, lprod)``; :func:`materialize_mixed_greedy` turns it into
+    positions.
+    """
+
     eff_width = width - margin
     eff_height = height - margin
     if eff_width < min(wprod, lprod) or eff_height < min(wprod, lprod):
-        return 0, []
+        return 0, None
     best_count = 0
-    best_positions = []
-    max_cols_normal = int(eff_width // wprod)
-    max_rows_normal = int(eff_height // lprod)
-    for normal_cols in range(max_cols_normal + 1):
+    plan = None
+    rows_normal = int(eff_height // lprod)
+    rows_rot = int(eff_height // wprod)
+    for normal_cols in range(int(eff_width // wprod) + 1):
         leftover_x = eff_width - normal_cols * wprod
         if leftover_x < 0:
             continue
         rotated_cols = int(leftover_x // lprod)
-        count_normal = normal_cols * int(eff_height // lprod)
-        count_rot = rotated_cols * int(eff_height // wprod)
-        total_c = count_normal + count_rot
+        total_c = normal_cols * rows_normal + rotated_cols * rows_rot
         if total_c > best_count:
             best_count = total_c
-            temp_positions = []
-            for nc in range(normal_cols):
-                for row in range(int(eff_height // lprod)):
-                    temp_positions.append((nc * wprod, row * lprod, wprod, lprod))
-            for rc in range(rotated_cols):
-                for row in range(int(eff_height // wprod)):
-                    x0 = normal_cols * wprod + rc * lprod
-                    y0 = row * wprod
-                    temp_positions.append((x0, y0, lprod, wprod))
-            best_positions = temp_positions
-    for normal_rows in range(max_rows_normal + 1):
+            plan = (False, normal_cols, rotated_cols)
+    cols_normal = int(eff_width // wprod)
+    cols_rot = int(eff_width // lprod)
+    for normal_rows in range(rows_normal + 1):
         leftover_y = eff_height - normal_rows * lprod
         if leftover_y < 0:
             continue
         rotated_rows = int(leftover_y // wprod)
-        count_normal = normal_rows * int(eff_width // wprod)
-        count_rot = rotated_rows * int(eff_width // lprod)
-        total_c = count_normal + count_rot
+        total_c = normal_rows * cols_normal + rotated_rows * cols_rot
         if total_c > best_count:
             best_count = total_c
-            temp_positions = []
-            for nr in range(normal_rows):
-                for col in range(int(eff_width // wprod)):
-                    temp_positions.append((col * wprod, nr * lprod, wprod, lprod))
-            for rr in range(rotated_rows):
-                for col in range(int(eff_width // lprod)):
-                    x0 = col * lprod
-                    y0 = normal_rows * lprod + rr * wprod
-                    temp_positions.append((x0, y0, lprod, wprod))
-            best_positions = temp_positions
-    return best_count, best_positions
+            plan = (True, normal_rows, rotated_rows)
+    if plan is None:
+        return 0, None
+    return best_count, plan + (eff_width, eff_height, wprod, lprod)
+
+
+def materialize_mixed_greedy(plan):
+    """Positions of a :func:`mixed_greedy_plan` result."""
+
+    if plan is None:
+        return []
+    by_rows, normal, rotated, eff_width, eff_height, wprod, lprod = plan
+    positions = []
+    if by_rows:
+        for nr in range(normal):
+            for col in range(int(eff_width // wprod)):
+                positions.append((col * wprod, nr * lprod, wprod, lprod))
+        for rr in range(rotated):
+            for col in range(int(eff_width // lprod)):
+                x0 = col * lprod
+                y0 = normal * lprod + rr * wprod
+                positions.append((x0, y0, lprod, wprod))
+    else:
+        for nc in range(normal):
+            for row in range(int(eff_height // lprod)):
+                positions.append((nc * wprod, row * lprod, wprod, lprod))
+        for rc in range(rotated):
+            for row in range(int(eff_height // wprod)):
+                x0 = normal * wprod + rc * lprod
+                y0 = row * wprod
+                positions.append((x0, y0, lprod, wprod))
+    return positions
 
 
+def pack_rectangles_mixed_greedy(width, height, wprod, lprod, margin=0):
+    count, plan = mixed_greedy_plan(width, height, wprod, lprod, margin)
+    return count, materialize_mixed_greedy(plan)
+
 
 def pack_rectangles_row_by_row(width, height, wprod, lprod, margin=0):
     """Alternate carton orientation on each row.
@@ -105,12 +133,13 @@ def pack_rectangles_row_by_row(width, height, wprod, lprod, margin=0):
 
 
 
-def pack_pinwheel(width, height, wprod, lprod, margin=0):
+def pack_pinwheel(width, height, wprod, lprod, margin=0, deadline=None):
     """Pack cartons in repeating 2x2 pinwheel blocks.
 
     Any leftover space around the regular pinwheel grid is filled using the
     mixed greedy algorithm so that cartons never overlap and remain inside the
-    pallet bounds.
+    pallet bounds.  ``deadline`` is passed on to
+    :func:`pack_rectangles_mixed_max`.
     """
 
     eff_width = width - margin
@@ -140,14 +169,14 @@ def pack_pinwheel(width, height, wprod, lprod, margin=0):
     # Fill the vertical strip on the right
     if leftover_x > 0:
         _, right_strip = pack_rectangles_mixed_max(
-            leftover_x, eff_height, wprod, lprod
+            leftover_x, eff_height, wprod, lprod, deadline=deadline
         )
         positions.extend((n_x * block_w + x, y, w, h) for x, y, w, h in right_strip)
 
     # Fill the horizontal strip at the top (excluding the right strip area)
     if leftover_y > 0 and n_x * block_w > 0:
         _, top_strip = pack_rectangles_mixed_max(
-            n_x * block_w, leftover_y, wprod, lprod
+            n_x * block_w, leftover_y, wprod, lprod, deadline=deadline
         )
         positions.extend((x, n_y * block_h + y, w, h) for x, y, w, h in top_strip)
 
@@ -155,84 +184,129 @@ def pack_pinwheel(width, height, wprod, lprod, margin=0):
 
 
 
-def pack_rectangles_mixed_max(width, height, wprod, lprod, margin=0):
-    """Search for dense mixed layouts without exhaustive DFS."""
+MIXED_MAX_NODES = 5000
+
+
+def pack_rectangles_mixed_max(
+    width,
+    height,
+    wprod,
+    lprod,
+    margin=0,
+    deadline=None,
+    max_nodes=MIXED_MAX_NODES,
+    time_limit=None,
+):
+    """Search for dense mixed layouts by a bounded guillotine DFS.
+
+    Each node places a carton in the corner of the largest free rectangle
+    and splits the rest of it into a right and a top piece.  Placements form
+    a parent-pointer chain shared between nodes, so no node copies the
+    layout.  A transposition table keyed on the set of free rectangles skips
+    states already reached with at least as many cartons, and a node is cut
+    when its count plus the bound of every free rectangle cannot beat the
+    best layout: a rectangle that takes the carton in one orientation only
+    holds at most that orientation's grid, any other at most its area.
+
+    The search stops after ``max_nodes`` distinct states, after
+    ``time_limit`` seconds or at ``deadline`` (a :func:`time.monotonic`
+    value), whichever comes first; the best layout found so far is returned
+    either way.
+    """
 
     eff_width = width - margin
     eff_height = height - margin
     if eff_width < min(wprod, lprod) or eff_height < min(wprod, lprod):
         return 0, []
+    if time_limit is not None:
+        limit = time.monotonic() + time_limit
+        deadline = limit if deadline is None else min(deadline, limit)
 
+    eps = 1e-9
     box_area = wprod * lprod
     orientations = [(wprod, lprod)]
-    if abs(wprod - lprod) > 1e-9:
+    if abs(wprod - lprod) > eps:
         orientations.append((lprod, wprod))
 
-    best_count = 0
-    best_positions = []
+    def _fits(rect):
+        return any(
+            rect[2] + eps >= ow and rect[3] + eps >= oh for ow, oh in orientations
+        )
 
-    max_nodes = 5000
-    nodes_explored = 0
-    stack = [(0, [], [(0.0, 0.0, eff_width, eff_height)])]
+    def _bound(rect):
+        fw, fh = rect[2] + eps, rect[3] + eps
+        grids = [int(fw // ow) * int(fh // oh) for ow, oh in orientations]
+        if sum(1 for grid in grids if grid > 0) == 1:
+            return max(grids)
+        return int(fw * fh / box_area + eps)
 
     def _split(rect, w, h):
         x, y, W, H = rect
         pieces = []
-        if W - w > 1e-9:
+        if W - w > eps:
             pieces.append((x + w, y, W - w, H))
-        if H - h > 1e-9:
+        if H - h > eps:
             pieces.append((x, y + h, w, H - h))
-        return pieces
-
-    def _prune(free_rects):
-        pruned = []
-        for fx, fy, fw, fh in free_rects:
-            fits = False
-            for ow, oh in orientations:
-                if fw + 1e-9 >= ow and fh + 1e-9 >= oh:
-                    fits = True
-                    break
-            if fits:
-                pruned.append((fx, fy, fw, fh))
-        return pruned
+        return [piece for piece in pieces if _fits(piece)]
+
+    best_count = 0
+    best_chain = None
+    seen = {}
+    nodes_explored = 0
+    root = (0.0, 0.0, eff_width, eff_height)
+    # Nodes are (count, chain, free rectangles, bound of the free rectangles);
+    # a chain is ``None`` or ``(placement, parent chain)``.
+    stack = [(0, None, (root,), _bound(root))]
 
     while stack and nodes_explored < max_nodes:
-        count, positions, free_rects = stack.pop()
-        nodes_explored += 1
+        if (
+            deadline is not None
+            and nodes_explored % 256 == 0
+            and time.monotonic() > deadline
+        ):
+            break
+        count, chain, free_rects, bound = stack.pop()
 
         if count > best_count:
             best_count = count
-            best_positions = positions
-
-        free_area = sum(fw * fh for _, _, fw, fh in free_rects)
-        potential = count + int(free_area // box_area)
-        if potential <= best_count:
+            best_chain = chain
+        if not free_rects or count + bound <= best_count:
             continue
-
-        if not free_rects:
+        key = tuple(sorted(tuple(round(v, 6) for v in rect) for rect in free_rects))
+        if seen.get(key, -1) >= count:
             continue
+        seen[key] = count
+        nodes_explored += 1
 
-        idx = max(range(len(free_rects)), key=lambda i: free_rects[i][2] * free_rects[i][3])
+        idx = max(
+            range(len(free_rects)), key=lambda i: free_rects[i][2] * free_rects[i][3]
+        )
         base_rect = free_rects[idx]
         remaining = free_rects[:idx] + free_rects[idx + 1 :]
+        rest_bound = bound - _bound(base_rect)
 
         placed_any = False
         for ow, oh in orientations:
-            if base_rect[2] + 1e-9 < ow or base_rect[3] + 1e-9 < oh:
+            if base_rect[2] + eps < ow or base_rect[3] + eps < oh:
                 continue
-            new_pos = positions + [(base_rect[0], base_rect[1], ow, oh)]
-            new_free = remaining + _split(base_rect, ow, oh)
-            new_free = _prune(new_free)
-            stack.append((count + 1, new_pos, new_free))
+            pieces = _split(base_rect, ow, oh)
+            stack.append(
+                (
+                    count + 1,
+                    ((base_rect[0], base_rect[1], ow, oh), chain),
+                    remaining + tuple(pieces),
+                    rest_bound + sum(_bound(piece) for piece in pieces),
+                )
+            )
             placed_any = True
 
-        if not placed_any:
-            filtered = _prune(remaining)
-            if len(filtered) != len(remaining):
-                remaining = filtered
-            if remaining:
-                stack.append((count, positions, remaining))
+        if not placed_any and remaining:
+            stack.append((count, chain, remaining, rest_bound))
 
+    best_positions = []
+    while best_chain is not None:
+        placement, best_chain = best_chain
+        best_positions.append(placement)
     ordered = sorted(best_positions, key=lambda item: (item[1], item[0]))
     return best_count, ordered
 
@@ -254,98 +328,147 @@ def pack_circles_grid_bottomleft(W, H, diam, margin=0):
     return centers
 
 
+def _hex_plan(eff_w, eff_h, diam):
+    """Best offset hex rows of ``diam`` circles in ``eff_w x eff_h`` arrays.
+
+    Rows alternate between full rows starting at the left edge and rows
+    shifted right by ``offset``; consecutive rows are ``sqrt(diam**2 -
+    offset**2)`` apart.  The classic hex shift of half a diameter is tried
+    along with the shift that just uses up a full row's slack, which keeps
+    every row as long as the first one at a slightly larger row pitch.
+    Starting with a shifted row is never better, as a shifted row never
+    holds more circles than a full one.  Returns ``(count, offset, pitch,
+    rows, full_cols, shifted_cols)``, zero counts where nothing fits.
+    """
+
+    eff_w, eff_h = np.broadcast_arrays(
+        np.asarray(eff_w, dtype=float), np.asarray(eff_h, dtype=float)
+    )
+    fits = (eff_w >= diam) & (eff_h >= diam)
+    full_cols = np.where(fits, np.floor((eff_w - diam) / diam) + 1, 0)
+    slack = np.maximum(eff_w - diam - (full_cols - 1) * diam, 0.0)
+    best = None
+    for offset in (np.full(eff_w.shape, diam / 2), np.minimum(slack, diam / 2)):
+        pitch = np.sqrt(diam * diam - offset * offset)
+        rows = np.where(fits, np.floor((eff_h - diam) / pitch) + 1, 0)
+        room = eff_w - diam - offset
+        shifted_cols = np.where(fits & (room >= 0), np.floor(room / diam) + 1, 0)
+        count = np.ceil(rows / 2) * full_cols + np.floor(rows / 2) * shifted_cols
+        plan = (count, offset, pitch, rows, full_cols, shifted_cols)
+        if best is None:
+            best = plan
+        else:
+            better = count > best[0]
+            best = tuple(np.where(better, a, b) for a, b in zip(plan, best))
+    return best
+
+
+def count_circle_layouts(widths, lengths, diam, margin=0):
+    """Circle counts of the grid, hex and transposed hex layouts per carton.
+
+    ``widths`` and ``lengths`` are array-likes of carton sizes; the result is
+    ``(grid, hex, hex_rev)`` integer arrays matching the lengths of
+    :func:`pack_circles_grid_bottomleft`, :func:`pack_hex_top_down` and
+    :func:`pack_hex_bottom_up` (which lays the hex out in an ``L x W``
+    carton), without building any centres.
+    """
+
+    eff_w = np.asarray(widths, dtype=float) - margin
+    eff_l = np.asarray(lengths, dtype=float) - margin
+    if diam <= 0:
+        zeros = np.zeros(np.broadcast(eff_w, eff_l).shape, dtype=int)
+        return zeros, zeros.copy(), zeros.copy()
+    fits = (eff_w >= diam) & (eff_l >= diam)
+    grid = np.where(
+        fits, np.floor_divide(eff_w, diam) * np.floor_divide(eff_l, diam), 0
+    )
+    hex_count = _hex_plan(eff_w, eff_l, diam)[0]
+    hex_rev = _hex_plan(eff_l, eff_w, diam)[0]
+    return grid.astype(int), hex_count.astype(int), hex_rev.astype(int)
+
+
 def pack_hex_top_down(W, H, diam, margin=0):
+    """Centres of offset hex rows, filled from the bottom left.
+
+    The row offset is the better of the classic half-diameter shift and the
+    shift that keeps every row full; :func:`count_circle_layouts` gives the
+    same count without building the centres.
+    """
+
     eff_W = W - margin
     eff_H = H - margin
-    if eff_W < diam or eff_H < diam:
+    if diam <= 0 or eff_W < diam or eff_H < diam:
         return []
+    _, offset, pitch, rows, full_cols, shifted_cols = (
+        value.item() for value in _hex_plan(eff_W, eff_H, diam)
+    )
     r = diam / 2
-    dy = math.sqrt(3) * r
     centers = []
-    y = r
-    row_idx = 0
-    while y + r <= eff_H:
+    for row_idx in range(int(rows)):
         if row_idx % 2 == 0:
-            x_start = r
+            x_start, cols = r, int(full_cols)
         else:
-            x_start = r + diam / 2
-        x = x_start
-        row = []
-        while x + r <= eff_W:
-            row.append((x, y))
-            x += diam
-        centers.extend(row)
-        y += dy
-        row_idx += 1
+            x_start, cols = r + offset, int(shifted_cols)
+        y = r + row_idx * pitch
+        centers.extend((x_start + col * diam, y) for col in range(cols))
     return centers
 
 
 def pack_hex_bottom_up(W, H, diam, margin=0):
-    eff_W = W - margin
-    eff_H = H - margin
-    if eff_W < diam or eff_H < diam:
-        return []
-    r = diam / 2
-    dy = math.sqrt(3) * r
-    centers = []
-    y = r
-    row_idx = 0
-    while y + r <= eff_H:
-        if row_idx % 2 == 0:
-            x_start = r
-        else:
-            x_start = r + diam / 2
-        x = x_start
-        row = []
-        while x + r <= eff_W:
-            row.append((x, y))
-            x += diam
-        centers.extend(row)
-        y += dy
-        row_idx += 1
-    return centers
+    """Same rows as :func:`pack_hex_top_down`; callers pass the carton
+    transposed for the "Hex(rev)" layout."""
+
+    return pack_hex_top_down(W, H, diam, margin)
 
 
 DEFAULT_MAX_RECTS = 600
 DEEP_MAX_RECTS = 1200
 
 
-def pack_rectangles_dynamic(width, height, wprod, lprod, margin=0, max_rects=DEFAULT_MAX_RECTS):
+def _expired(deadline):
+    return deadline is not None and time.monotonic() > deadline
+
+
+def pack_rectangles_dynamic(
+    width,
+    height,
+    wprod,
+    lprod,
+    margin=0,
+    max_rects=DEFAULT_MAX_RECTS,
+    strategy=BEST_SHORT_SIDE_FIT,
+    deadline=None,
+):
     """Pack rectangles using a dynamic optimisation strategy.
 
-    The routine relies on ``rectpack`` to explore many packing permutations with
-    automatic rectangle rotation. The number of cartons is not predetermined;
-    instead an upper bound is estimated from the available area and every box is
-    submitted to the packer. The resulting list contains only the cartons that
-    successfully fit inside the pallet area without overlapping. When
-    ``rectpack`` is not installed the function falls back to the bounded mixed
-    search used by :func:`maximize_mixed_layout`.
+    Cartons are placed one by one with the MaxRects engine from
+    :mod:`.maxrects`, which picks the free rectangle and orientation of each
+    carton according to ``strategy``.  The number of cartons is not
+    predetermined; instead an upper bound is estimated from the available
+    area (capped by ``max_rects``) and packing stops as soon as a carton no
+    longer fits.  With the default strategy the layout matches what
+    ``rectpack``'s default packer produces.  Past ``deadline`` (a
+    :func:`time.monotonic` value) no further cartons are inserted.
     """
 
-    try:
-        from rectpack import newPacker
-    except ImportError:
-        count, positions = maximize_mixed_layout(width, height, wprod, lprod, margin, [])
-        return count, positions
-
     eff_w = width - margin
     eff_h = height - margin
 
-    if eff_w <= 0 or eff_h <= 0:
+    if eff_w <= 0 or eff_h <= 0 or wprod <= 0 or lprod <= 0:
         return 0, []
 
-    packer = newPacker(rotation=True)
-
     estimate = int((eff_w * eff_h) // (wprod * lprod)) + 5
     if max_rects is not None:
         estimate = min(estimate, max_rects)
-    for i in range(estimate):
-        packer.add_rect(wprod, lprod, i)
-
-    packer.add_bin(eff_w, eff_h)
-    packer.pack()
-
-    positions = [(x, y, w, h) for (_, x, y, w, h, _) in packer.rect_list()]
+    positions = pack_identical(
+        eff_w,
+        eff_h,
+        wprod,
+        lprod,
+        strategy=strategy,
+        max_items=estimate,
+        deadline=deadline,
+    )
 
     return len(positions), positions
 
@@ -356,8 +479,15 @@ def pack_rectangles_dynamic_variants(
     *,
     max_rects=DEFAULT_MAX_RECTS,
     full_variants: bool = False,
+    deadline=None,
 ):
-    """Generate deterministic dynamic variants using rectpack strategies."""
+    """Generate deterministic dynamic variants using MaxRects strategies.
+
+    With ``full_variants`` the bottom-left and contact-point strategies are
+    added, but only when they place at least as many cartons as the default
+    strategy, which therefore stays the floor of every variant.  Variants
+    not started by ``deadline`` (a :func:`time.monotonic` value) are skipped.
+    """
     width = pallet.width
     height = pallet.length
     wprod = carton.width
@@ -365,43 +495,30 @@ def pack_rectangles_dynamic_variants(
 
     variants = {}
     _, base = pack_rectangles_dynamic(
-        width, height, wprod, lprod, max_rects=max_rects
+        width, height, wprod, lprod, max_rects=max_rects, deadline=deadline
     )
     variants["dynamic_default"] = base
-    if abs(wprod - lprod) > 1e-6:
+    if abs(wprod - lprod) > 1e-6 and not _expired(deadline):
         _, rotated = pack_rectangles_dynamic(
-            width, height, lprod, wprod, max_rects=max_rects
+            width, height, lprod, wprod, max_rects=max_rects, deadline=deadline
         )
         variants["dynamic_rotated"] = rotated
     if not full_variants:
         return variants
 
-    try:
-        from rectpack import newPacker
-        from rectpack import SORT_AREA, SORT_LSIDE, SORT_PERI, SORT_SSIDE
-    except ImportError:
-        return variants
-
-    sort_algos = {
-        "dynamic_area": SORT_AREA,
-        "dynamic_perimeter": SORT_PERI,
-        "dynamic_short_side": SORT_SSIDE,
-        "dynamic_long_side": SORT_LSIDE,
-    }
-    for name, sort_algo in sort_algos.items():
-        packer = newPacker(rotation=True, sort_algo=sort_algo)
-        eff_w = width
-        eff_h = height
-        if eff_w <= 0 or eff_h <= 0:
-            continue
-        estimate = int((eff_w * eff_h) // (wprod * lprod)) + 5
-        if max_rects is not None:
-            estimate = min(estimate, max_rects)
-        for i in range(estimate):
-            packer.add_rect(wprod, lprod, i)
-        packer.add_bin(eff_w, eff_h)
-        packer.pack()
-        positions = [(x, y, w, h) for (_, x, y, w, h, _) in packer.rect_list()]
-        variants[name] = positions
+    for strategy in (BOTTOM_LEFT, CONTACT_POINT):
+        if _expired(deadline):
+            break
+        _, positions = pack_rectangles_dynamic(
+            width,
+            height,
+            wprod,
+            lprod,
+            max_rects=max_rects,
+            strategy=strategy,
+            deadline=deadline,
+        )
+        if len(positions) >= len(base):
+            variants[f"dynamic_{strategy}"] = positions
 
     return variants
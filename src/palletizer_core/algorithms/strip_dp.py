@@ -1,36 +1,167 @@
+"""Strip layouts from an unbounded knapsack over the pallet width.
+
+A strip is a full-length column of the pallet filled from ``y = 0``.  Strip
+types are generated for every carton orientation as strip width, and a
+strip as wide as the long carton side may also stack cartons of the other
+orientation on top (e.g. rotated cartons topped with upright ones).  The
+k best strip combinations per reachable width are kept by a DP over the
+types in a fixed order, so every combination is produced exactly once and
+no enumeration of all count pairs is needed.
+"""
+
 from __future__ import annotations
 
+import heapq
+import time
+from itertools import islice
 from typing import Dict, List, Tuple
 
 from palletizer_core.signature import layout_signature
 
+from .capacity import CapacityTable, capacity_table
+
 LayerLayout = List[Tuple[float, float, float, float]]
+# Cartons of one strip, bottom to top: (width, length, count) runs.
+Fill = Tuple[Tuple[float, float, int], ...]
+# Strip type: (strip width, fill, cartons in the strip).
+StripType = Tuple[float, Fill, int]
+# DP entry: (carton count, strip type indices in non-decreasing order).
+_Entry = Tuple[int, Tuple[int, ...]]
+
+_EPS = 1e-6
+
+
+def _entry_order(entry: _Entry) -> Tuple[int, Tuple[int, ...]]:
+    return (-entry[0], entry[1])
 
 
-def _build_strip_sequence(count_a: int, count_b: int, prefer_a: bool) -> List[str]:
-    sequence: List[str] = []
-    remaining = {"A": count_a, "B": count_b}
-    order = ["A", "B"] if prefer_a else ["B", "A"]
-    while remaining["A"] > 0 or remaining["B"] > 0:
+def _width_key(width: float) -> float:
+    return round(width, 6)
+
+
+def _strip_types(
+    pallet_l: float, box_w: float, box_l: float, table: CapacityTable
+) -> List[StripType]:
+    orientations = [(box_w, box_l)]
+    if abs(box_w - box_l) > _EPS:
+        orientations.append((box_l, box_w))
+
+    types: List[StripType] = []
+    for strip_w, _ in sorted(orientations):
+        fitting = sorted(
+            (o for o in orientations if o[0] <= strip_w + _EPS), key=lambda o: o[1]
+        )
+        base = fitting[0]
+        if len(fitting) == 1:
+            count = table.fit(pallet_l, base[1])
+            if count > 0:
+                types.append((strip_w, ((*base, count),), count))
+            continue
+        # The base orientation is as wide as the strip; any number of the
+        # other orientation goes on top of it.
+        top = fitting[1]
+        seen = set()
+        for n_top in range(table.fit(pallet_l, top[1]) + 1):
+            n_base = table.fit(pallet_l - n_top * top[1], base[1])
+            fill = tuple(
+                (w, length, n)
+                for (w, length), n in ((base, n_base), (top, n_top))
+                if n > 0
+            )
+            if fill and fill not in seen:
+                seen.add(fill)
+                types.append((strip_w, fill, n_base + n_top))
+    return types
+
+
+def _k_best_combinations(
+    pallet_w: float,
+    types: List[StripType],
+    k: int,
+    deadline: float | None = None,
+) -> List[Tuple[int, float, Tuple[int, ...]]]:
+    """Return ``(count, width, strips)`` of the best strip multisets.
+
+    ``best[w]`` holds the ``k`` highest counts of multisets of total width
+    ``w``.  Types are added one at a time and widths are visited in
+    increasing order, so a type can be repeated while a multiset is only
+    ever built in one order.  Cost is ``O(len(types) * widths * k)``.
+    Types not reached by ``deadline`` are left out.
+    """
+
+    widths = {_width_key(0.0): 0.0}
+    frontier = [0.0]
+    strip_widths = sorted({strip_w for strip_w, _, _ in types})
+    while frontier:
+        grown = []
+        for width in frontier:
+            for strip_w in strip_widths:
+                total = width + strip_w
+                key = _width_key(total)
+                if total <= pallet_w + _EPS and key not in widths:
+                    widths[key] = total
+                    grown.append(total)
+        frontier = grown
+    order = sorted(widths, key=widths.__getitem__)
+
+    best: Dict[float, List[_Entry]] = {key: [] for key in order}
+    best[_width_key(0.0)] = [(0, ())]
+    for index, (strip_w, _, count) in enumerate(types):
+        if index and deadline is not None and time.monotonic() > deadline:
+            break
         for key in order:
-            if remaining[key] > 0:
-                sequence.append(key)
-                remaining[key] -= 1
+            entries = best[key]
+            if not entries:
+                continue
+            target = _width_key(widths[key] + strip_w)
+            if target not in best:
+                continue
+            extended = [
+                (value + count, strips + (index,)) for value, strips in entries
+            ]
+            best[target] = list(
+                islice(heapq.merge(best[target], extended, key=_entry_order), k)
+            )
+
+    found = [
+        (value, widths[key], strips)
+        for key in order
+        for value, strips in best[key]
+        if strips
+    ]
+    found.sort(key=lambda item: (-item[0], -item[1], item[2]))
+    return found
+
+
+def _strip_sequence(strips: Tuple[int, ...], reverse: bool) -> List[int]:
+    """Interleave the strips, most frequent type first (or last)."""
+
+    remaining: Dict[int, int] = {}
+    for index in strips:
+        remaining[index] = remaining.get(index, 0) + 1
+    order = sorted(remaining, key=lambda index: (-remaining[index], index))
+    if reverse:
+        order.reverse()
+    sequence: List[int] = []
+    while len(sequence) < len(strips):
+        for index in order:
+            if remaining[index] > 0:
+                sequence.append(index)
+                remaining[index] -= 1
     return sequence
 
 
-def _build_strip_layout(
-    strip_sequence: List[str],
-    strip_specs: Dict[str, Tuple[float, float, float, int]],
-) -> LayerLayout:
+def _build_strip_layout(sequence: List[int], types: List[StripType]) -> LayerLayout:
     layout: LayerLayout = []
     cursor_x = 0.0
-    for key in strip_sequence:
-        strip_width, box_w, box_l, boxes_per_strip = strip_specs[key]
-        for idx in range(boxes_per_strip):
-            y = idx * box_l
-            layout.append((cursor_x, y, box_w, box_l))
-        cursor_x += strip_width
+    for index in sequence:
+        strip_w, fill, _ = types[index]
+        cursor_y = 0.0
+        for box_w, box_l, count in fill:
+            for _ in range(count):
+                layout.append((cursor_x, cursor_y, box_w, box_l))
+                cursor_y += box_l
+        cursor_x += strip_w
     return layout
 
 
@@ -40,67 +171,38 @@ def _strip_variants(
     box_w: float,
     box_l: float,
     max_variants: int,
+    deadline: float | None = None,
 ) -> List[LayerLayout]:
-    if pallet_w <= 0 or pallet_l <= 0 or box_w <= 0 or box_l <= 0:
+    if (
+        pallet_w <= 0
+        or pallet_l <= 0
+        or box_w <= 0
+        or box_l <= 0
+        or max_variants <= 0
+    ):
         return []
 
-    strip_specs: Dict[str, Tuple[float, float, float, int]] = {}
-    boxes_a = int(pallet_l // box_l) if box_l > 0 else 0
-    if boxes_a > 0:
-        strip_specs["A"] = (box_w, box_w, box_l, boxes_a)
-
-    boxes_b = int(pallet_l // box_w) if box_w > 0 else 0
-    if abs(box_w - box_l) > 1e-6 and boxes_b > 0:
-        strip_specs["B"] = (box_l, box_l, box_w, boxes_b)
-
-    if not strip_specs:
+    table = capacity_table(box_w, box_l, pallet_w, pallet_l)
+    types = _strip_types(pallet_l, box_w, box_l, table)
+    if not types:
         return []
 
-    max_a = int(pallet_w // strip_specs["A"][0]) if "A" in strip_specs else 0
-    max_b = int(pallet_w // strip_specs["B"][0]) if "B" in strip_specs else 0
-
-    combos: List[Tuple[int, float, int, int]] = []
-    for count_a in range(max_a + 1):
-        for count_b in range(max_b + 1):
-            if count_a == 0 and count_b == 0:
-                continue
-            width = 0.0
-            count = 0
-            if count_a:
-                strip_width, _, _, per_strip = strip_specs["A"]
-                width += count_a * strip_width
-                count += count_a * per_strip
-            if count_b:
-                strip_width, _, _, per_strip = strip_specs["B"]
-                width += count_b * strip_width
-                count += count_b * per_strip
-            if width <= pallet_w + 1e-6 and count > 0:
-                combos.append((count, width, count_a, count_b))
-
-    combos.sort(key=lambda item: (-item[0], -item[1], -item[2], -item[3]))
-
+    # A reversed strip sequence is the mirrored layout; other symmetric
+    # duplicates are removed by signature in generate_strip_layouts.
     layouts: List[LayerLayout] = []
     seen = set()
-    for count, _, count_a, count_b in combos:
-        if count <= 0:
-            continue
-        prefer_a = count_a >= count_b
-        sequence = _build_strip_sequence(count_a, count_b, prefer_a)
-        layout = _build_strip_layout(sequence, strip_specs)
-        signature = layout_signature(layout)
-        if signature not in seen:
-            layouts.append(layout)
-            seen.add(signature)
-        if count_a > 0 and count_b > 0 and len(layouts) < max_variants:
-            alternate = _build_strip_sequence(count_a, count_b, not prefer_a)
-            alt_layout = _build_strip_layout(alternate, strip_specs)
-            alt_signature = layout_signature(alt_layout)
-            if alt_signature not in seen:
-                layouts.append(alt_layout)
-                seen.add(alt_signature)
-        if len(layouts) >= max_variants:
-            break
-
+    combinations = _k_best_combinations(pallet_w, types, max_variants, deadline)
+    for _, _, strips in combinations:
+        orders = [False, True] if len(set(strips)) > 1 else [False]
+        for reverse in orders:
+            sequence = _strip_sequence(strips, reverse)
+            key = min(tuple(sequence), tuple(reversed(sequence)))
+            if key in seen:
+                continue
+            seen.add(key)
+            layouts.append(_build_strip_layout(sequence, types))
+            if len(layouts) >= max_variants:
+                return layouts
     return layouts
 
 
@@ -111,16 +213,31 @@ def generate_strip_layouts(
     box_l: float,
     *,
     max_variants: int = 20,
+    deadline: float | None = None,
 ) -> List[LayerLayout]:
-    layouts = _strip_variants(pallet_w, pallet_l, box_w, box_l, max_variants)
-    swapped = _strip_variants(pallet_l, pallet_w, box_l, box_w, max_variants)
-    for layout in swapped:
-        layouts.append([(y, x, length, w) for x, y, w, length in layout])
+    """Return up to ``max_variants`` distinct strip layouts, densest first.
+
+    Strips run along the pallet length and, transposed, along its width;
+    both lists are merged by carton count.  Past ``deadline`` (a
+    :func:`time.monotonic` value) only the strip types combined so far are
+    used.
+    """
+
+    layouts = _strip_variants(
+        pallet_w, pallet_l, box_w, box_l, max_variants, deadline
+    )
+    swapped = _strip_variants(
+        pallet_l, pallet_w, box_l, box_w, max_variants, deadline
+    )
+    layouts.extend(
+        [(y, x, length, w) for x, y, w, length in layout] for layout in swapped
+    )
+    layouts.sort(key=len, reverse=True)
 
     deduped: List[LayerLayout] = []
     seen = set()
     for layout in layouts:
-        signature = layout_signature(layout)
+        signature = layout_signature(layout, symmetric=True)
         if signature in seen:
             continue
         deduped.append(layout)
@@ -1,3 +1,6 @@
+from .free_space import FreeSpace
+
+
 def check_collision(cushion_pos, product_positions):
     cx, cy, cw, ch = cushion_pos
     for pos in product_positions:
@@ -8,7 +11,7 @@ def check_collision(cushion_pos, product_positions):
 
 
 def place_air_cushions(w_c, l_c, occupied_positions, cushion_w=37, cushion_l=175, cushion_h=110, min_gap=5, offset_x=0, offset_y=0):
-    positions = []
+    candidates = []
     left_x = offset_x
     right_x = w_c - cushion_w - offset_x
     top_y = l_c - cushion_w - offset_y
@@ -16,28 +19,38 @@ def place_air_cushions(w_c, l_c, occupied_positions, cushion_w=37, cushion_l=175
     count_left = int((l_c - 2 * offset_y) // (cushion_l + min_gap))
     for i in range(count_left):
         y = offset_y + i * (cushion_l + min_gap)
-        pos = (left_x, y, cushion_w, cushion_l)
-        if y + cushion_l <= l_c and not check_collision(pos, occupied_positions):
-            positions.append(pos)
+        if y + cushion_l <= l_c:
+            candidates.append((left_x, y, cushion_w, cushion_l))
     count_right = int((l_c - 2 * offset_y) // (cushion_l + min_gap))
     for i in range(count_right):
         y = offset_y + i * (cushion_l + min_gap)
-        pos = (right_x, y, cushion_w, cushion_l)
-        if y + cushion_l <= l_c and not check_collision(pos, occupied_positions):
-            positions.append(pos)
+        if y + cushion_l <= l_c:
+            candidates.append((right_x, y, cushion_w, cushion_l))
     count_top = int((w_c - 2 * offset_x) // (cushion_l + min_gap))
     for i in range(count_top):
         x = offset_x + i * (cushion_l + min_gap)
-        pos = (x, top_y, cushion_l, cushion_w)
-        if x + cushion_l <= w_c and not check_collision(pos, occupied_positions):
-            positions.append(pos)
+        if x + cushion_l <= w_c:
+            candidates.append((x, top_y, cushion_l, cushion_w))
     count_bottom = int((w_c - 2 * offset_x) // (cushion_l + min_gap))
     for i in range(count_bottom):
         x = offset_x + i * (cushion_l + min_gap)
-        pos = (x, bottom_y, cushion_l, cushion_w)
-        if x + cushion_l <= w_c and not check_collision(pos, occupied_positions):
-            positions.append(pos)
-    return positions
+        if x + cushion_l <= w_c:
+            candidates.append((x, bottom_y, cushion_l, cushion_w))
+    if not candidates:
+        return []
+
+    # A cushion is collision-free exactly when it lies in one maximal free
+    # rectangle.  The bin is padded around the carton and every candidate so
+    # its own edges never decide a cushion near the border.
+    rects = candidates + list(occupied_positions) + [(0, 0, w_c, l_c)]
+    x0 = min(x for x, _, _, _ in rects) - 1
+    y0 = min(y for _, y, _, _ in rects) - 1
+    x1 = max(x + w for x, _, w, _ in rects) + 1
+    y1 = max(y + h for _, y, _, h in rects) + 1
+    space = FreeSpace(x1 - x0, y1 - y0, x=x0, y=y0, cell=max(cushion_l, 1))
+    for x, y, w, h in occupied_positions:
+        space.occupy(x, y, w, h)
+    return [pos for pos in candidates if space.is_free(*pos)]
 
 
 def maximize_mixed_layout(w_c, l_c, w_p, l_p, margin, initial_positions):
@@ -45,84 +58,28 @@ def maximize_mixed_layout(w_c, l_c, w_p, l_p, margin, initial_positions):
     eff_l = l_c - margin
     if not ((w_p <= eff_w and l_p <= eff_l) or (l_p <= eff_w and w_p <= eff_l)):
         return 0, []
-    free_areas = [(0, 0, eff_w, eff_l)]
-    occupied_positions = initial_positions.copy()
-    count = len(occupied_positions)
 
-    for pos in initial_positions:
-        x, y, w, h = pos
-        new_free = []
-        for fx, fy, fw, fh in free_areas:
-            if x + w <= fx or x >= fx + fw or y + h <= fy or y >= fy + fh:
-                new_free.append((fx, fy, fw, fh))
-            else:
-                if x > fx:
-                    new_free.append((fx, fy, x - fx, fh))
-                if x + w < fx + fw:
-                    new_free.append((x + w, fy, fx + fw - (x + w), fh))
-                if y > fy:
-                    new_free.append((fx, fy, fw, y - fy))
-                if y + h < fy + fh:
-                    new_free.append((fx, y + h, fw, fy + fh - (y + h)))
-        free_areas = new_free
+    def fits(w, h):
+        return (w_p <= w and l_p <= h) or (l_p <= w and w_p <= h)
 
-    while free_areas:
-        free_areas.sort(key=lambda x: x[2] * x[3], reverse=True)
-        fx, fy, fw, fh = free_areas.pop(0)
-        placed = False
+    space = FreeSpace(eff_w, eff_l, usable=fits, cell=max(w_p, l_p))
+    for x, y, w, h in initial_positions:
+        space.occupy(x, y, w, h)
+    occupied_positions = list(initial_positions)
 
+    # Fill the largest free rectangle first; free rectangles that cannot
+    # take a carton are never kept, so each one yields a placement.
+    while True:
+        largest = space.largest()
+        if largest is None:
+            break
+        fx, fy, fw, fh = largest
         if fw >= w_p and fh >= l_p:
-            occupied_positions.append((fx, fy, w_p, l_p))
-            count += 1
-            new_free = []
-            for afx, afy, afw, afh in free_areas:
-                if fx + w_p <= afx or fx >= afx + afw or fy + l_p <= afy or fy >= afy + afh:
-                    new_free.append((afx, afy, afw, afh))
-                else:
-                    if fx > afx:
-                        new_free.append((afx, afy, fx - afx, afh))
-                    if fx + w_p < afx + afw:
-                        new_free.append((fx + w_p, afy, afx + afw - (fx + w_p), afh))
-                    if fy > afy:
-                        new_free.append((afx, afy, afw, fy - afy))
-                    if fy + l_p < afy + afh:
-                        new_free.append((afx, fy + l_p, afw, afy + afh - (fy + l_p)))
-            free_areas = new_free
-            remaining_w = fw - w_p
-            remaining_h = fh - l_p
-            if remaining_w > 0:
-                free_areas.append((fx + w_p, fy, remaining_w, fh))
-            if remaining_h > 0:
-                free_areas.append((fx, fy + l_p, w_p, remaining_h))
-            placed = True
-
-        if not placed and fw >= l_p and fh >= w_p:
-            occupied_positions.append((fx, fy, l_p, w_p))
-            count += 1
-            new_free = []
-            for afx, afy, afw, afh in free_areas:
-                if fx + l_p <= afx or fx >= afx + afw or fy + w_p <= afy or fy >= afy + afh:
-                    new_free.append((afx, afy, afw, afh))
-                else:
-                    if fx > afx:
-                        new_free.append((afx, afy, fx - afx, afh))
-                    if fx + l_p < afx + afw:
-                        new_free.append((fx + l_p, afy, afx + afw - (fx + l_p), afh))
-                    if fy > afy:
-                        new_free.append((afx, afy, afw, fy - afy))
-                    if fy + w_p < afy + afh:
-                        new_free.append((afx, fy + w_p, afw, afy + afh - (fy + w_p)))
-            free_areas = new_free
-            remaining_w = fw - l_p
-            remaining_h = fh - w_p
-            if remaining_w > 0:
-                free_areas.append((fx + l_p, fy, remaining_w, fh))
-            if remaining_h > 0:
-                free_areas.append((fx, fy + w_p, l_p, remaining_h))
-            placed = True
-
-        if not placed:
-            continue
+            pos = (fx, fy, w_p, l_p)
+        else:
+            pos = (fx, fy, l_p, w_p)
+        occupied_positions.append(pos)
+        space.occupy(*pos)
 
     unique_positions = []
     seen = set()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# Pattern is list of rectangles (x, y, w, l)
+Pattern = List[Tuple[float, float, float, float]]
+
+# Upper bound on the pairwise edge-contact scratch array (elements), which
+# keeps memory flat when a chunk holds many large layouts.
+_PAIR_BUDGET = 1_000_000
+
+
+def pack_layouts(patterns: Sequence[Pattern]) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack layouts into a ``(N, max_boxes, 4)`` array and a boolean mask.
+
+    Row ``i`` holds the rectangles of ``patterns[i]`` in order, padded with
+    zeros; ``mask[i, j]`` is ``True`` for the real rectangles.
+    """
+
+    count = len(patterns)
+    max_boxes = max((len(pattern) for pattern in patterns), default=0)
+    boxes = np.zeros((count, max_boxes, 4), dtype=float)
+    mask = np.zeros((count, max_boxes), dtype=bool)
+    for idx, pattern in enumerate(patterns):
+        if pattern:
+            boxes[idx, : len(pattern)] = pattern
+            mask[idx, : len(pattern)] = True
+    return boxes, mask
+
+
+@dataclass
+class BatchMetrics:
+    """Per-layout metric arrays, one entry per input layout."""
+
+    counts: np.ndarray
+    com_x: np.ndarray
+    com_y: np.ndarray
+    total_inside: np.ndarray
+    min_support: np.ndarray
+    weakest_index: np.ndarray
+    edge_contact: np.ndarray
+    edge_buffer: np.ndarray
+    min_edge_clearance: np.ndarray
+    orientation_mix: np.ndarray
+
+
+def _running_total(values: np.ndarray) -> np.ndarray:
+    # cumsum adds left to right like the scalar ``+=`` loops it replaces, so
+    # the totals match them bit for bit (padding contributes exact zeros).
+    if values.shape[-1] == 0:
+        return np.zeros(values.shape[:-1])
+    return np.cumsum(values, axis=-1)[..., -1]
+
+
+def _edge_contact(
+    boxes: np.ndarray, mask: np.ndarray, eps: float
+) -> np.ndarray:
+    x, y, w, length = (boxes[..., k] for k in range(4))
+    right = x + w
+    top = y + length
+    n = boxes.shape[1]
+    upper = np.triu(np.ones((n, n), dtype=bool), k=1)
+    pair_mask = mask[:, :, None] & mask[:, None, :] & upper
+
+    x_touch = (np.abs(right[:, :, None] - x[:, None, :]) < eps) | (
+        np.abs(right[:, None, :] - x[:, :, None]) < eps
+    )
+    y_overlap = np.maximum(
+        0.0,
+        np.minimum(top[:, :, None], top[:, None, :])
+        - np.maximum(y[:, :, None], y[:, None, :]),
+    )
+    y_touch = (np.abs(top[:, :, None] - y[:, None, :]) < eps) | (
+        np.abs(top[:, None, :] - y[:, :, None]) < eps
+    )
+    x_overlap = np.maximum(
+        0.0,
+        np.minimum(right[:, :, None], right[:, None, :])
+        - np.maximum(x[:, :, None], x[:, None, :]),
+    )
+    contributions = np.stack(
+        (
+            np.where(pair_mask & x_touch, y_overlap, 0.0),
+            np.where(pair_mask & y_touch, x_overlap, 0.0),
+        ),
+        axis=-1,
+    )
+    contact = _running_total(contributions.reshape(boxes.shape[0], -1))
+    perimeter = _running_total(np.where(mask, 2.0 * (w + length), 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(perimeter <= eps, 0.0, contact / perimeter)
+    return np.clip(value, 0.0, 1.0)
+
+
+def compute_batch_metrics(
+    boxes: np.ndarray,
+    mask: np.ndarray,
+    *,
+    pallet_w: float,
+    pallet_l: float,
+    box_area: float,
+    buffer_norm: float,
+    default_orientation: bool,
+    eps: float = 1e-6,
+) -> BatchMetrics:
+    """Compute the per-layout inputs of :meth:`PatternSelector.score`.
+
+    ``boxes``/``mask`` come from :func:`pack_layouts`.  Sums are accumulated
+    in rectangle order so the results equal the scalar metric functions.
+    """
+
+    counts = mask.sum(axis=1)
+    safe_counts = np.maximum(counts, 1)
+    x, y, w, length = (boxes[..., k] for k in range(4))
+
+    com_x = _running_total(np.where(mask, x + w / 2, 0.0)) / safe_counts
+    com_y = _running_total(np.where(mask, y + length / 2, 0.0)) / safe_counts
+
+    overlap_w = np.maximum(0.0, np.minimum(x + w, pallet_w) - np.maximum(x, 0.0))
+    overlap_l = np.maximum(0.0, np.minimum(y + length, pallet_l) - np.maximum(y, 0.0))
+    supported = np.where(mask, overlap_w * overlap_l, 0.0)
+    total_inside = _running_total(supported)
+    if box_area > 0:
+        ratios = supported / box_area
+    else:
+        ratios = np.zeros_like(supported)
+    ratios = np.where(mask, ratios, np.inf)
+    if ratios.shape[1]:
+        weakest_index = np.argmin(ratios, axis=1)
+        lowest = ratios[np.arange(len(ratios)), weakest_index]
+    else:
+        weakest_index = np.zeros(len(ratios), dtype=int)
+        lowest = np.full(len(ratios), np.inf)
+    # Only a ratio strictly below 1.0 marks a weakest carton; otherwise the
+    # first carton is reported with full support, as in the scalar loop.
+    below = lowest < 1.0
+    min_support = np.where(below, lowest, 1.0)
+    weakest_index = np.where(below, weakest_index, 0)
+
+    clearance = np.minimum(
+        np.minimum(x, y), np.minimum(pallet_w - (x + w), pallet_l - (y + length))
+    )
+    min_clearance = np.where(mask, clearance, np.inf).min(axis=1, initial=np.inf)
+    min_clearance = np.where(np.isinf(min_clearance), 0.0, min_clearance)
+    buffer_terms = np.where(mask, np.clip(clearance / buffer_norm, 0.0, 1.0), 0.0)
+    edge_buffer = _running_total(buffer_terms) / safe_counts
+
+    rotated = mask & ((w >= length) != default_orientation)
+    orientation_mix = rotated.sum(axis=1) / safe_counts
+
+    edge_contact = np.zeros(len(boxes))
+    order = np.argsort(counts, kind="stable")
+    start = 0
+    while start < len(order):
+        width = max(int(counts[order[start]]), 1)
+        stop = start + 1
+        while stop < len(order):
+            candidate = max(int(counts[order[stop]]), 1)
+            if (stop - start + 1) * candidate * candidate * 2 > _PAIR_BUDGET:
+                break
+            width = candidate
+            stop += 1
+        chunk = order[start:stop]
+        edge_contact[chunk] = _edge_contact(
+            boxes[chunk, :width], mask[chunk, :width], eps
+        )
+        start = stop
+
+    return BatchMetrics(
+        counts=counts,
+        com_x=com_x,
+        com_y=com_y,
+        total_inside=total_inside,
+        min_support=min_support,
+        weakest_index=weakest_index,
+        edge_contact=edge_contact,
+        edge_buffer=edge_buffer,
+        min_edge_clearance=min_clearance,
+        orientation_mix=orientation_mix,
+    )
@@ -0,0 +1,519 @@
+"""Headless batch computation of layer layouts (``palletizer`` command).
+
+Every pallet x carton pair from a pallets and a cartons XML catalogue (or
+from a CSV of pairs) is run through
+:func:`~palletizer_core.engine.build_layouts` on a process pool, and one
+record per pair is streamed to a JSON Lines or CSV file as soon as its chunk
+finishes::
+
+    palletizer --cartons cartons.xml --pallets pallets.xml \\
+        --output layouts.jsonl --workers 8 --chunk-size 4
+    palletizer --pairs pairs.csv --format csv --output layouts.csv --resume
+
+Each record carries a ``key`` derived from the inputs and options.  With
+``--resume`` keys already present in the output (without an error) are
+skipped and new records are appended, so a crashed run picks up where it
+stopped.
+
+The catalogues default to the ``PALLETIZER_CARTONS`` and
+``PALLETIZER_PALLETS`` environment variables; the installed ``palletizer``
+command (:mod:`packing_app.batch`) then falls back to the catalogues that
+ship with the application.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Sequence, Set
+
+from .engine import PalletInputs, build_layouts
+from .parallel import create_executor
+from .stacking import compute_num_layers
+
+FORMATS = ("jsonl", "csv")
+
+DEFAULT_MAX_STACK = 1600.0
+
+# Columns written to CSV; JSON Lines records carry the same fields plus the
+# optional layer layouts and the generators a time budget cut short.
+FIELDS = [
+    "key",
+    "name",
+    "pallet",
+    "carton",
+    "pallet_w",
+    "pallet_l",
+    "pallet_h",
+    "box_w",
+    "box_l",
+    "box_h",
+    "num_layers",
+    "best_layout",
+    "cartons_even",
+    "cartons_odd",
+    "solutions",
+    "layer_eff",
+    "cube_eff",
+    "stability",
+    "support_fraction",
+    "min_support",
+    "edge_contact",
+    "seconds",
+    "error",
+]
+_METRIC_FIELDS = (
+    "layer_eff",
+    "cube_eff",
+    "stability",
+    "support_fraction",
+    "min_support",
+    "edge_contact",
+)
+
+_CSV_INPUT_FIELDS = ("thickness", "spacing", "slip_count", "num_layers", "max_stack")
+
+
+@dataclass(frozen=True)
+class BatchTask:
+    """One pallet x carton pair to compute."""
+
+    pallet: str
+    carton: str
+    inputs: PalletInputs
+
+    @property
+    def name(self) -> str:
+        return f"{self.pallet}/{self.carton}"
+
+
+@dataclass(frozen=True)
+class BatchDefaults:
+    """Carton wall, spacing and stacking values applied to every pair."""
+
+    thickness: float = 0.0
+    spacing: float = 0.0
+    slip_count: int = 0
+    max_stack: float = DEFAULT_MAX_STACK
+    include_pallet_height: bool = False
+    num_layers: int | None = None
+
+    def inputs(
+        self, pallet: Sequence[float], carton: Sequence[float], **overrides
+    ) -> PalletInputs:
+        values = {
+            "thickness": self.thickness,
+            "spacing": self.spacing,
+            "slip_count": self.slip_count,
+            "max_stack": self.max_stack,
+            "num_layers": self.num_layers,
+        }
+        values.update({k: v for k, v in overrides.items() if v is not None})
+        pallet_w, pallet_l, pallet_h = (float(v) for v in pallet)
+        box_w, box_l, box_h = (float(v) for v in carton)
+        num_layers = values["num_layers"]
+        if num_layers is None:
+            num_layers = compute_num_layers(
+                float(values["max_stack"]),
+                box_h,
+                float(values["thickness"]),
+                int(values["slip_count"]),
+                self.include_pallet_height,
+                pallet_h,
+            )
+        return PalletInputs(
+            pallet_w=pallet_w,
+            pallet_l=pallet_l,
+            pallet_h=pallet_h,
+            box_w=box_w,
+            box_l=box_l,
+            box_h=box_h,
+            thickness=float(values["thickness"]),
+            spacing=float(values["spacing"]),
+            slip_count=int(values["slip_count"]),
+            num_layers=max(int(num_layers), 1),
+            max_stack=float(values["max_stack"]),
+            include_pallet_height=self.include_pallet_height,
+        )
+
+
+def _xml_items(path: Path, tag: str, name_attr: str) -> List[tuple]:
+    try:
+        root = ET.parse(path).getroot()
+    except ET.ParseError as exc:
+        raise ValueError(f"Invalid XML in {path}: {exc}") from exc
+    items = []
+    for node in root.findall(tag):
+        try:
+            dims = tuple(float(node.get(attr)) for attr in ("w", "l", "h"))
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid {tag} entry {node.attrib} in {path}") from exc
+        items.append((node.get(name_attr), dims))
+    return items
+
+
+def read_catalog_tasks(
+    cartons_xml: Path, pallets_xml: Path, defaults: BatchDefaults = BatchDefaults()
+) -> List[BatchTask]:
+    """Return every pallet x carton pair from the XML catalogues."""
+
+    cartons = _xml_items(cartons_xml, "carton", "code")
+    pallets = _xml_items(pallets_xml, "pallet", "name")
+    return [
+        BatchTask(pallet_name, code, defaults.inputs(pallet_dims, carton_dims))
+        for pallet_name, pallet_dims in pallets
+        for code, carton_dims in cartons
+    ]
+
+
+def read_pairs_csv(
+    path: Path, defaults: BatchDefaults = BatchDefaults()
+) -> List[BatchTask]:
+    """Read pairs from a CSV with ``pallet_w,pallet_l,pallet_h,box_w,box_l,box_h``.
+
+    Optional ``pallet``/``carton`` columns name the pair and ``thickness``,
+    ``spacing``, ``slip_count``, ``num_layers`` and ``max_stack`` columns
+    override the defaults for that row.
+    """
+
+    tasks = []
+    with open(path, newline="", encoding="utf-8") as handle:
+        for line, row in enumerate(csv.DictReader(handle), start=2):
+            try:
+                pallet = [row[k] for k in ("pallet_w", "pallet_l", "pallet_h")]
+                carton = [row[k] for k in ("box_w", "box_l", "box_h")]
+                overrides = {
+                    k: float(row[k]) for k in _CSV_INPUT_FIELDS if row.get(k)
+                }
+                inputs = defaults.inputs(pallet, carton, **overrides)
+            except (KeyError, TypeError, ValueError) as exc:
+                raise ValueError(f"{path}:{line}: invalid pair row: {exc}") from exc
+            pallet_name = row.get("pallet") or "x".join(pallet)
+            carton_name = row.get("carton") or "x".join(carton)
+            tasks.append(BatchTask(pallet_name, carton_name, inputs))
+    return tasks
+
+
+def task_key(task: BatchTask, options: Dict[str, object]) -> str:
+    """Stable digest of a task's inputs and the computation options."""
+
+    payload = json.dumps(
+        {"inputs": asdict(task.inputs), "options": options}, sort_keys=True
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def compute_task(
+    task: BatchTask, options: Dict[str, object], layouts: bool = False
+) -> Dict[str, object]:
+    """Run the pipeline for ``task`` and return its output record.
+
+    Exceptions are reported in the ``error`` field so one bad pair does not
+    stop the batch.
+    """
+
+    inputs = task.inputs
+    record: Dict[str, object] = {
+        "key": task_key(task, options),
+        "name": task.name,
+        "pallet": task.pallet,
+        "carton": task.carton,
+        "pallet_w": inputs.pallet_w,
+        "pallet_l": inputs.pallet_l,
+        "pallet_h": inputs.pallet_h,
+        "box_w": inputs.box_w,
+        "box_l": inputs.box_l,
+        "box_h": inputs.box_h,
+        "num_layers": inputs.num_layers,
+    }
+    start = time.perf_counter()
+    try:
+        result = build_layouts(inputs, **options)
+    except Exception as exc:
+        record["error"] = f"{type(exc).__name__}: {exc}"
+        record["seconds"] = time.perf_counter() - start
+        return record
+    record["seconds"] = time.perf_counter() - start
+
+    best = result.solution_catalog.by_key.get(result.best_layout_key)
+    metrics = best.metrics if best is not None else {}
+    record.update(
+        {
+            "best_layout": result.best_layout_key,
+            "cartons_even": len(result.best_even),
+            "cartons_odd": len(result.best_odd),
+            "solutions": len(result.solution_catalog.solutions),
+        }
+    )
+    for name in _METRIC_FIELDS:
+        record[name] = metrics.get(name)
+    record["error"] = None
+    if result.truncated_generators:
+        record["truncated"] = list(result.truncated_generators)
+    if layouts:
+        record["even"] = [list(box) for box in result.best_even]
+        record["odd"] = [list(box) for box in result.best_odd]
+    return record
+
+
+def compute_chunk(
+    tasks: Sequence[BatchTask], options: Dict[str, object], layouts: bool = False
+) -> List[Dict[str, object]]:
+    return [compute_task(task, options, layouts) for task in tasks]
+
+
+def finished_keys(path: Path, fmt: str) -> Set[str]:
+    """Keys of error-free records already written to ``path``."""
+
+    if not path.exists():
+        return set()
+    keys = set()
+    with open(path, newline="", encoding="utf-8") as handle:
+        if fmt == "csv":
+            rows: Iterable[Dict[str, object]] = csv.DictReader(handle)
+        else:
+            rows = (_json_line(line) for line in handle)
+        for row in rows:
+            if row and row.get("key") and not row.get("error"):
+                keys.add(str(row["key"]))
+    return keys
+
+
+def _json_line(line: str) -> Dict[str, object] | None:
+    try:
+        return json.loads(line)
+    except ValueError:
+        # A run killed mid-write leaves a truncated last line.
+        return None
+
+
+class RecordWriter:
+    """Append records to a JSON Lines or CSV file, flushing every batch."""
+
+    def __init__(self, path: Path, fmt: str, *, append: bool) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format: {fmt!r}")
+        self.fmt = fmt
+        exists = append and path.exists() and path.stat().st_size > 0
+        if fmt == "jsonl" and exists:
+            with open(path, "rb") as handle:
+                handle.seek(-1, 2)
+                needs_newline = handle.read(1) != b"\n"
+        else:
+            needs_newline = False
+        self._handle = open(
+            path, "a" if append else "w", newline="", encoding="utf-8"
+        )
+        if needs_newline:
+            self._handle.write("\n")
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.DictWriter(
+                self._handle, fieldnames=FIELDS, extrasaction="ignore"
+            )
+            if not exists:
+                self._csv.writeheader()
+
+    def write(self, records: Iterable[Dict[str, object]]) -> None:
+        for record in records:
+            if self._csv is not None:
+                self._csv.writerow(record)
+            else:
+                self._handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def __enter__(self) -> RecordWriter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def run_batch(
+    tasks: Sequence[BatchTask],
+    options: Dict[str, object],
+    writer: RecordWriter,
+    *,
+    workers: int | None = None,
+    chunk_size: int = 1,
+    skip: Set[str] = frozenset(),
+    layouts: bool = False,
+    progress: Callable[[int, int], None] | None = None,
+) -> int:
+    """Compute ``tasks`` not in ``skip`` and stream them to ``writer``.
+
+    Tasks are grouped into chunks of ``chunk_size`` per worker call; records
+    are written as chunks complete, so output order follows completion.
+    Returns the number of records written.
+    """
+
+    pending = [task for task in tasks if task_key(task, options) not in skip]
+    chunk_size = max(1, int(chunk_size))
+    chunks = [pending[i : i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    written = 0
+    with create_executor(workers) as executor:
+        futures = [
+            executor.submit(compute_chunk, chunk, options, layouts) for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            records = future.result()
+            writer.write(records)
+            written += len(records)
+            if progress is not None:
+                progress(written, len(pending))
+    return written
+
+
+CARTONS_ENV = "PALLETIZER_CARTONS"
+PALLETS_ENV = "PALLETIZER_PALLETS"
+
+
+def _env_path(name: str) -> Path | None:
+    value = os.environ.get(name)
+    return Path(value) if value else None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="palletizer", description=__doc__.splitlines()[0]
+    )
+    source = parser.add_argument_group("input")
+    source.add_argument("--cartons", type=Path, help="cartons XML catalogue")
+    source.add_argument("--pallets", type=Path, help="pallets XML catalogue")
+    source.add_argument("--pairs", type=Path, help="CSV of pallet x carton pairs")
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--output", "-o", type=Path, required=True)
+    output.add_argument("--format", choices=FORMATS, help="default: from suffix")
+    output.add_argument(
+        "--resume", action="store_true", help="skip keys already in the output"
+    )
+    output.add_argument(
+        "--layouts", action="store_true", help="include layer layouts (JSON Lines)"
+    )
+
+    run = parser.add_argument_group("execution")
+    run.add_argument("--workers", type=int, default=None, help="process pool size")
+    run.add_argument("--chunk-size", type=int, default=1, help="pairs per task")
+
+    inputs = parser.add_argument_group("carton and stacking defaults")
+    inputs.add_argument("--thickness", type=float, default=0.0)
+    inputs.add_argument("--spacing", type=float, default=0.0)
+    inputs.add_argument("--slip-count", type=int, default=0)
+    inputs.add_argument("--max-stack", type=float, default=DEFAULT_MAX_STACK)
+    inputs.add_argument("--num-layers", type=int, default=None)
+    inputs.add_argument("--include-pallet-height", action="store_true")
+
+    compute = parser.add_argument_group("computation options")
+    compute.add_argument("--maximize-mixed", action="store_true")
+    compute.add_argument("--no-center", action="store_true")
+    compute.add_argument("--center-mode", default="Cała warstwa")
+    compute.add_argument("--shift-even", action="store_true")
+    compute.add_argument("--extended-library", action="store_true")
+    compute.add_argument("--dynamic-variants", action="store_true")
+    compute.add_argument("--deep-search", action="store_true")
+    compute.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="seconds of pattern generation per pair",
+    )
+    compute.add_argument("--filter-sanity", action="store_true")
+    compute.add_argument("--result-limit", type=int, default=None)
+    compute.add_argument("--allow-offsets", action="store_true")
+    compute.add_argument("--min-support", type=float, default=0.80)
+    compute.add_argument("--assume-full-support", action="store_true")
+    return parser
+
+
+def _options(args: argparse.Namespace) -> Dict[str, object]:
+    options: Dict[str, object] = {
+        "maximize_mixed": args.maximize_mixed,
+        "center_enabled": not args.no_center,
+        "center_mode": args.center_mode,
+        "shift_even": args.shift_even,
+        "extended_library": args.extended_library,
+        "dynamic_variants": args.dynamic_variants,
+        "deep_search": args.deep_search,
+        "filter_sanity": args.filter_sanity,
+        "result_limit": args.result_limit,
+        "allow_offsets": args.allow_offsets,
+        "min_support": args.min_support,
+        "assume_full_support": args.assume_full_support,
+    }
+    # Only set when given, so keys of earlier outputs still match on resume.
+    if args.time_budget is not None:
+        options["time_budget_s"] = args.time_budget
+    return options
+
+
+def main(
+    argv: Sequence[str] | None = None,
+    *,
+    default_cartons: Path | None = None,
+    default_pallets: Path | None = None,
+) -> int:
+    """Run the batch; ``default_*`` catalogues apply after the environment."""
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.output.suffix.lower() == ".csv" else "jsonl")
+    defaults = BatchDefaults(
+        thickness=args.thickness,
+        spacing=args.spacing,
+        slip_count=args.slip_count,
+        max_stack=args.max_stack,
+        include_pallet_height=args.include_pallet_height,
+        num_layers=args.num_layers,
+    )
+    try:
+        if args.pairs is not None:
+            tasks = read_pairs_csv(args.pairs, defaults)
+        else:
+            cartons = args.cartons or _env_path(CARTONS_ENV) or default_cartons
+            pallets = args.pallets or _env_path(PALLETS_ENV) or default_pallets
+            if cartons is None or pallets is None:
+                parser.error("--cartons and --pallets (or --pairs) are required")
+            tasks = read_catalog_tasks(cartons, pallets, defaults)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+
+    options = _options(args)
+    skip = finished_keys(args.output, fmt) if args.resume else set()
+
+    def progress(done: int, total: int) -> None:
+        print(f"\r{done}/{total}", end="", file=sys.stderr, flush=True)
+
+    with RecordWriter(args.output, fmt, append=args.resume) as writer:
+        written = run_batch(
+            tasks,
+            options,
+            writer,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            skip=skip,
+            layouts=args.layouts,
+            progress=progress,
+        )
+    print(
+        f"\n{written} computed, {len(tasks) - written} skipped -> {args.output}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import copy
+import logging
 import math
-from dataclasses import dataclass, field
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field, replace
 from typing import Callable, Dict, List, Optional, Tuple
 
+from .layer_array import AnyLayout, LayerArray, as_layer_array, like_input
+from .layout_cache import LayoutCache, layout_cache_key
 from .models import Carton, Pallet
+from .profiling import ProfileReport, Profiler
 from .sanity import DEFAULT_SANITY_POLICY, connected_components, is_sane
 from .signature import layout_signature
+from .symmetry import find_symmetry, transform_rect
+from .spatial import OVERLAP, connected_groups, count_components
 from .solutions import (
     STANDARD_ORDER,
     Solution,
@@ -20,17 +29,14 @@ from .selector import PatternScore, PatternSelector
 from .sequencer import EvenOddSequencer
 from .metrics import compute_cube_efficiency
 
+logger = logging.getLogger(__name__)
+
 LayerLayout = List[Tuple[float, float, float, float]]
 
 
-def apply_spacing(pattern: LayerLayout, spacing: float) -> LayerLayout:
+def apply_spacing(pattern: AnyLayout, spacing: float) -> AnyLayout:
     """Center boxes within spaced slots."""
-    adjusted = []
-    for x, y, w, h in pattern:
-        new_w = w - spacing
-        new_h = h - spacing
-        adjusted.append((x + spacing / 2, y + spacing / 2, new_w, new_h))
-    return adjusted
+    return like_input(pattern, as_layer_array(pattern).inset(spacing))
 
 
 @dataclass
@@ -73,78 +79,58 @@ class LayoutComputation:
     row_by_row_horizontal: int = 0
     raw_layout_entries: List[Tuple[int, LayerLayout, str]] = field(default_factory=list)
     filtered_layout_entries: List[Tuple[int, LayerLayout, str]] = field(default_factory=list)
+    profile: ProfileReport | None = None
+    completed_generators: List[str] = field(default_factory=list)
+    truncated_generators: List[str] = field(default_factory=list)
 
 
 def group_cartons(positions: LayerLayout) -> List[LayerLayout]:
-    """Group cartons that touch or overlap using AABB collision detection."""
-
-    def collide(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> bool:
-        ax, ay, aw, ah = a
-        bx, by, bw, bh = b
-        return not (ax + aw <= bx or bx + bw <= ax or ay + ah <= by or by + bh <= ay)
-
-    groups = []
-    used = set()
-    for i in range(len(positions)):
-        if i in used:
-            continue
-        stack = [i]
-        used.add(i)
-        current_group = []
-        while stack:
-            idx = stack.pop()
-            current_group.append(positions[idx])
-            for j in range(len(positions)):
-                if j in used:
-                    continue
-                if collide(positions[idx], positions[j]):
-                    used.add(j)
-                    stack.append(j)
-        groups.append(current_group)
-    return groups
+    """Group cartons that overlap using AABB collision detection.
+
+    Cartons that merely share an edge stay in separate groups.  Groups and
+    the cartons inside them keep the order of ``positions``.
+    """
+
+    return [
+        [positions[idx] for idx in group]
+        for group in connected_groups(positions, mode=OVERLAP)
+    ]
+
+
+def _centered(positions: AnyLayout, pallet_w: float, pallet_l: float) -> LayerArray:
+    layer = as_layer_array(positions)
+    x_min, y_min, x_max, y_max = layer.bounds()
+    offset_x = (pallet_w - (x_max - x_min)) / 2 - x_min
+    offset_y = (pallet_l - (y_max - y_min)) / 2 - y_min
+    return layer.translate(offset_x, offset_y)
 
 
 def center_layout(
-    positions: LayerLayout,
+    positions: AnyLayout,
     pallet_w: float,
     pallet_l: float,
     center_enabled: bool,
     center_mode: str,
-) -> LayerLayout:
-    if not positions or not center_enabled:
+) -> AnyLayout:
+    if not len(positions) or not center_enabled:
         return positions
     if center_mode == "Cała warstwa":
-        x_min = min(x for x, y, w, h in positions)
-        x_max = max(x + w for x, y, w, h in positions)
-        y_min = min(y for x, y, w, h in positions)
-        y_max = max(y + h for x, y, w, h in positions)
-        offset_x = (pallet_w - (x_max - x_min)) / 2 - x_min
-        offset_y = (pallet_l - (y_max - y_min)) / 2 - y_min
-        return [(x + offset_x, y + offset_y, w, h) for x, y, w, h in positions]
-
-    groups = group_cartons(positions)
+        return like_input(positions, _centered(positions, pallet_w, pallet_l))
+
+    layout = (
+        positions.to_layout() if isinstance(positions, LayerArray) else positions
+    )
+    groups = group_cartons(layout)
     centered_positions: LayerLayout = []
     for group in groups:
-        x_min = min(x for x, y, w, h in group)
-        x_max = max(x + w for x, y, w, h in group)
-        y_min = min(y for x, y, w, h in group)
-        y_max = max(y + h for x, y, w, h in group)
-        offset_x = (pallet_w - (x_max - x_min)) / 2 - x_min
-        offset_y = (pallet_l - (y_max - y_min)) / 2 - y_min
-        centered_positions.extend(
-            [(x + offset_x, y + offset_y, w, h) for x, y, w, h in group]
-        )
+        centered_positions.extend(_centered(group, pallet_w, pallet_l).to_layout())
 
     # If centering individual groups makes them collide, fall back to
     # centering the entire layer instead of merging the groups.
-    if len(group_cartons(centered_positions)) != len(groups):
-        x_min = min(x for x, y, w, h in positions)
-        x_max = max(x + w for x, y, w, h in positions)
-        y_min = min(y for x, y, w, h in positions)
-        y_max = max(y + h for x, y, w, h in positions)
-        offset_x = (pallet_w - (x_max - x_min)) / 2 - x_min
-        offset_y = (pallet_l - (y_max - y_min)) / 2 - y_min
-        return [(x + offset_x, y + offset_y, w, h) for x, y, w, h in positions]
+    if count_components(centered_positions, mode=OVERLAP) != len(groups):
+        return like_input(positions, _centered(positions, pallet_w, pallet_l))
+    if isinstance(positions, LayerArray):
+        return LayerArray.from_layout(centered_positions)
     return centered_positions
 
 
@@ -324,7 +310,73 @@ def build_layouts(
     allow_offsets: bool = False,
     min_support: float = 0.80,
     assume_full_support: bool = False,
+    executor: Executor | None = None,
+    cache: LayoutCache | None = None,
+    cache_token: object = None,
+    profiler: Profiler | None = None,
+    lazy: bool = False,
+    time_budget_s: float | None = None,
 ) -> LayoutComputation:
+    """Generate, score and rank layer layouts for ``inputs``.
+
+    ``executor`` is forwarded to :meth:`PatternSelector.generate_all`; pass a
+    long-lived pool (see :func:`palletizer_core.parallel.create_executor`) to
+    run the generators in parallel without re-creating workers per call.
+
+    With a :class:`~palletizer_core.layout_cache.LayoutCache` the result is
+    looked up by inputs and options before computing and stored afterwards.
+    A ``row_by_row_customizer`` cannot be hashed, so such calls are only cached
+    when ``cache_token`` describes everything the customizer depends on.
+
+    Stage and generator timings are collected in ``profiler`` (a fresh
+    :class:`~palletizer_core.profiling.Profiler` when omitted) and returned as
+    ``LayoutComputation.profile``; the report is also logged at DEBUG level.
+
+    With ``lazy=True`` and a ``result_limit``, candidates are first ranked by
+    carton count and deduplicated by signature; scoring, island counts and
+    sanity checks then run only for layouts that can still reach the top
+    ``result_limit``.  The returned solutions and best layers are identical to
+    the full evaluation, but ``scores`` only holds the evaluated patterns.
+
+    ``time_budget_s`` bounds the pattern generation in seconds: cheap
+    generators run first, the expensive ones are skipped or return their
+    best layouts so far once it is spent.  ``completed_generators`` and
+    ``truncated_generators`` list which generators ran to the end; results
+    with truncated generators are not cached.
+    """
+    prof = profiler if profiler is not None else Profiler()
+    deadline = None if time_budget_s is None else time.monotonic() + time_budget_s
+    cache_key = None
+    if cache is not None and (row_by_row_customizer is None or cache_token is not None):
+        cache_key = layout_cache_key(
+            inputs,
+            {
+                "maximize_mixed": maximize_mixed,
+                "center_enabled": center_enabled,
+                "center_mode": center_mode,
+                "shift_even": shift_even,
+                "extended_library": extended_library,
+                "dynamic_variants": dynamic_variants,
+                "deep_search": deep_search,
+                "filter_sanity": filter_sanity,
+                "result_limit": result_limit,
+                "allow_offsets": allow_offsets,
+                "min_support": min_support,
+                "assume_full_support": assume_full_support,
+                "lazy": lazy,
+                "time_budget_s": time_budget_s,
+                "row_by_row": cache_token,
+            },
+        )
+        with prof.stage("cache_lookup"):
+            cached = cache.get(cache_key)
+        if cached is not None:
+            prof.cache_hit = True
+            if cached.profile is not None:
+                prof.candidates = cached.profile.candidates
+                prof.unique = cached.profile.unique
+            return replace(cached, profile=_finish_profile(prof))
+
     pallet = Pallet(inputs.pallet_w, inputs.pallet_l, inputs.pallet_h)
     calc_carton = Carton(
         inputs.box_w_ext + inputs.spacing,
@@ -332,12 +384,20 @@ def build_layouts(
         inputs.box_h,
     )
     selector = PatternSelector(calc_carton, pallet)
-    patterns = selector.generate_all(
-        maximize_mixed=maximize_mixed,
-        extended_library=extended_library,
-        dynamic_variants=dynamic_variants or extended_library,
-        deep_search=deep_search,
-    )
+    with prof.stage("generate"):
+        patterns = selector.generate_all(
+            maximize_mixed=maximize_mixed,
+            extended_library=extended_library,
+            dynamic_variants=dynamic_variants or extended_library,
+            deep_search=deep_search,
+            executor=executor,
+            profiler=prof,
+            deadline=deadline,
+        )
+    prof.candidates = len(patterns)
+    generator_runs = prof.report().generators
+    completed_generators = [run.name for run in generator_runs if run.complete]
+    truncated_generators = [run.name for run in generator_runs if not run.complete]
 
     row_by_row_vertical = 0
     row_by_row_horizontal = 0
@@ -360,78 +420,143 @@ def build_layouts(
     entries: List[Dict[str, object]] = []
 
     for name, pattern in patterns.items():
-        score = selector.score(pattern)
-        score.name = name
         key = normalize_pattern_key(name)
         display = display_for_key(key)
-        score.display_name = display
-        scores[key] = score
         display_map[key] = display
-
-    for name, pattern in patterns.items():
-        key = normalize_pattern_key(name)
-        display = display_for_key(key)
-        kind = "standard" if key in STANDARD_ORDER else "extra"
-        adjusted = apply_spacing(pattern, inputs.spacing)
-        centered = center_layout(
-            adjusted, inputs.pallet_w, inputs.pallet_l, center_enabled, center_mode
-        )
-        score = scores[key]
-        weakest_carton = score.weakest_carton or (0.0, 0.0, 0.0, 0.0)
+        with prof.stage("center_layout", len(pattern)):
+            adjusted = apply_spacing(pattern, inputs.spacing)
+            centered = center_layout(
+                adjusted, inputs.pallet_w, inputs.pallet_l, center_enabled, center_mode
+            )
         area_ratio = (
             sum(w * length for _, _, w, length in centered)
             / (inputs.pallet_w * inputs.pallet_l)
             if inputs.pallet_w > 0 and inputs.pallet_l > 0
             else 0.0
         )
-        islands = connected_components(centered, touch_eps=DEFAULT_SANITY_POLICY.touch_eps)
-        signature = layout_signature(centered)
-        cube_eff = compute_cube_efficiency(
-            cartons_per_layer=len(centered),
-            layers=inputs.num_layers,
-            box_w_ext=inputs.box_w_ext,
-            box_l_ext=inputs.box_l_ext,
-            box_h_ext=inputs.box_h + 2 * inputs.thickness,
-            pallet_w=inputs.pallet_w,
-            pallet_l=inputs.pallet_l,
-            max_stack=inputs.max_stack,
-            pallet_h=inputs.pallet_h,
-            include_pallet_height=inputs.include_pallet_height,
-        )
-        metrics = {
-            "cartons": float(len(centered)),
-            "stability": float(score.stability),
-            "layer_eff": float(score.layer_eff),
-            "cube_eff": float(cube_eff),
-            "support_fraction": float(score.support_fraction),
-            "min_support": float(score.min_support),
-            "edge_contact": float(score.edge_contact),
-            "min_edge_clearance": float(score.min_edge_clearance),
-            "grip_changes": float(score.grip_changes),
-            "orientation_mix": float(score.orientation_mix),
-            "com_offset": float(score.com_offset),
-            "instability_risk": 1.0 if score.instability_risk else 0.0,
-            "weakest_support": float(score.weakest_support),
-            "weakest_carton_x": float(weakest_carton[0]),
-            "weakest_carton_y": float(weakest_carton[1]),
-        }
+        with prof.stage("layout_signature", len(centered)):
+            signature = layout_signature(centered, symmetric=True)
         entries.append(
             {
                 "name": name,
                 "key": key,
-                "kind": kind,
+                "kind": "standard" if key in STANDARD_ORDER else "extra",
                 "pattern": pattern,
                 "layout": centered,
                 "display": display,
                 "count": len(centered),
-                "score": score,
                 "area_ratio": area_ratio,
-                "islands": islands,
                 "signature": signature,
-                "metrics": metrics,
             }
         )
 
+    # Patterns that are mirror images of an earlier one on the pallet score
+    # the same, so only the first of each symmetry class is scored.
+    with prof.stage("symmetry", len(entries)):
+        by_signature: Dict[object, List[Dict[str, object]]] = {}
+        for entry in entries:
+            for twin in by_signature.setdefault(entry["signature"], []):
+                transform = find_symmetry(
+                    twin["pattern"],
+                    entry["pattern"],
+                    inputs.pallet_w,
+                    inputs.pallet_l,
+                )
+                if transform is not None:
+                    entry["twin"] = (twin, transform)
+                    break
+            else:
+                by_signature[entry["signature"]].append(entry)
+
+    def _twin_score(entry: Dict[str, object]) -> PatternScore:
+        twin, transform = entry["twin"]
+        base = twin["base_score"]
+        weakest = base.weakest_carton
+        if weakest is not None:
+            weakest = transform_rect(
+                weakest, transform, inputs.pallet_w, inputs.pallet_l
+            )
+        score = copy.copy(base)
+        score.name = entry["name"]
+        score.display_name = entry["display"]
+        score.warnings = list(base.warnings)
+        score.weakest_carton = weakest
+        return score
+
+    def _evaluate(batch: List[Dict[str, object]]) -> None:
+        """Attach score, island count and metrics to entries lacking them."""
+
+        pending = [entry for entry in batch if "metrics" not in entry]
+        if not pending:
+            return
+        sources: List[Dict[str, object]] = []
+        for entry in pending:
+            source = entry["twin"][0] if "twin" in entry else entry
+            if "base_score" not in source and all(
+                source is not other for other in sources
+            ):
+                sources.append(source)
+        if sources:
+            with prof.stage("score", len(sources)):
+                pattern_scores = selector.score_many(
+                    [source["pattern"] for source in sources]
+                )
+            for source, score in zip(sources, pattern_scores, strict=True):
+                source["base_score"] = score
+        for entry in pending:
+            if "twin" in entry:
+                score = _twin_score(entry)
+            else:
+                score = entry["base_score"]
+                score.name = entry["name"]
+                score.display_name = entry["display"]
+            scores[entry["key"]] = score
+            centered = entry["layout"]
+            weakest_carton = score.weakest_carton or (0.0, 0.0, 0.0, 0.0)
+            with prof.stage("islands", len(centered)):
+                islands = connected_components(
+                    centered, touch_eps=DEFAULT_SANITY_POLICY.touch_eps
+                )
+            cube_eff = compute_cube_efficiency(
+                cartons_per_layer=len(centered),
+                layers=inputs.num_layers,
+                box_w_ext=inputs.box_w_ext,
+                box_l_ext=inputs.box_l_ext,
+                box_h_ext=inputs.box_h + 2 * inputs.thickness,
+                pallet_w=inputs.pallet_w,
+                pallet_l=inputs.pallet_l,
+                max_stack=inputs.max_stack,
+                pallet_h=inputs.pallet_h,
+                include_pallet_height=inputs.include_pallet_height,
+            )
+            entry["score"] = score
+            entry["islands"] = islands
+            entry["metrics"] = {
+                "cartons": float(len(centered)),
+                "stability": float(score.stability),
+                "layer_eff": float(score.layer_eff),
+                "cube_eff": float(cube_eff),
+                "support_fraction": float(score.support_fraction),
+                "min_support": float(score.min_support),
+                "edge_contact": float(score.edge_contact),
+                "min_edge_clearance": float(score.min_edge_clearance),
+                "grip_changes": float(score.grip_changes),
+                "orientation_mix": float(score.orientation_mix),
+                "com_offset": float(score.com_offset),
+                "instability_risk": 1.0 if score.instability_risk else 0.0,
+                "weakest_support": float(score.weakest_support),
+                "weakest_carton_x": float(weakest_carton[0]),
+                "weakest_carton_y": float(weakest_carton[1]),
+            }
+
+    def _sane(entry: Dict[str, object]) -> bool:
+        if "sane" not in entry:
+            with prof.stage("is_sane", len(entry["layout"])):
+                entry["sane"] = is_sane(
+                    entry["layout"], calc_carton, pallet, DEFAULT_SANITY_POLICY
+                )
+        return entry["sane"]
+
     raw_layout_entries = [
         (entry["count"], entry["layout"], entry["display"]) for entry in entries
     ]
@@ -450,28 +575,84 @@ def build_layouts(
             str(entry["display"]),
         )
 
-    best_raw_entry = None
-    if entries:
-        best_raw_entry = max(entries, key=_entry_metric)
-
-    filtered_entries = list(entries)
-    if filter_sanity:
-        filtered_entries = [
-            entry
-            for entry in filtered_entries
-            if is_sane(entry["layout"], calc_carton, pallet, DEFAULT_SANITY_POLICY)
+    def _best_raw_entry() -> Dict[str, object] | None:
+        # Only entries with the top (count, area ratio) can win, so only those
+        # need the full evaluation; ``max`` keeps the first of equal entries.
+        if not entries:
+            return None
+        top = max((entry["count"], entry["area_ratio"]) for entry in entries)
+        contenders = [
+            entry for entry in entries if (entry["count"], entry["area_ratio"]) == top
         ]
-        if filtered_entries:
-            best_area = max(entry["area_ratio"] for entry in filtered_entries)
-            min_area = DEFAULT_SANITY_POLICY.min_area_ratio
-            if best_area >= min_area:
-                filtered_entries = [
-                    entry
-                    for entry in filtered_entries
-                    if entry["area_ratio"] >= min_area
+        _evaluate(contenders)
+        return max(contenders, key=_entry_metric)
+
+    min_area = DEFAULT_SANITY_POLICY.min_area_ratio
+    top_k = result_limit if result_limit is not None and result_limit > 0 else None
+    # Lazy ranking relies on keys and display names being unique, which the
+    # generators guarantee; otherwise the full evaluation decides.
+    lazy_ranking = (
+        lazy
+        and top_k is not None
+        and len({entry["key"] for entry in entries}) == len(entries)
+        and len({entry["display"] for entry in entries}) == len(entries)
+    )
+
+    best_raw_entry = None
+    if not lazy_ranking:
+        _evaluate(entries)
+        best_raw_entry = max(entries, key=_entry_metric) if entries else None
+        filtered_entries = list(entries)
+        if filter_sanity:
+            filtered_entries = [entry for entry in filtered_entries if _sane(entry)]
+            if filtered_entries:
+                best_area = max(entry["area_ratio"] for entry in filtered_entries)
+                if best_area >= min_area:
+                    filtered_entries = [
+                        entry
+                        for entry in filtered_entries
+                        if entry["area_ratio"] >= min_area
+                    ]
+            if not filtered_entries and best_raw_entry is not None:
+                filtered_entries = [best_raw_entry]
+    else:
+        # The catalog ranks by carton count first and layouts sharing a
+        # signature have the same count, so walking count levels from the top
+        # until ``top_k`` signatures are collected yields every solution that
+        # can reach the top-k; lower levels are never scored.
+        eligible = entries
+        fallback = False
+        if filter_sanity:
+            by_area = sorted(
+                entries, key=lambda entry: entry["area_ratio"], reverse=True
+            )
+            best_area = next(
+                (entry["area_ratio"] for entry in by_area if _sane(entry)), None
+            )
+            if best_area is None:
+                fallback = True
+            elif best_area >= min_area:
+                eligible = [
+                    entry for entry in entries if entry["area_ratio"] >= min_area
                 ]
-        if not filtered_entries and best_raw_entry is not None:
+        levels: Dict[int, List[Dict[str, object]]] = {}
+        for entry in eligible:
+            levels.setdefault(entry["count"], []).append(entry)
+        survivors = set()
+        signatures = set()
+        if not fallback:
+            for count in sorted(levels, reverse=True):
+                for entry in levels[count]:
+                    if not filter_sanity or _sane(entry):
+                        survivors.add(id(entry))
+                        signatures.add(entry["signature"])
+                if len(signatures) >= top_k:
+                    break
+        filtered_entries = [entry for entry in entries if id(entry) in survivors]
+        if fallback:
+            best_raw_entry = _best_raw_entry()
             filtered_entries = [best_raw_entry]
+        _evaluate(filtered_entries)
 
     candidates = [
         Solution(
@@ -484,13 +665,15 @@ def build_layouts(
         )
         for entry in filtered_entries
     ]
-    solution_catalog = build_solution_catalog(candidates)
-    if result_limit is not None and result_limit > 0:
+    with prof.stage("catalog", len(candidates)):
+        solution_catalog = build_solution_catalog(candidates)
+    prof.unique = len(solution_catalog.solutions)
+    if top_k is not None:
         solution_catalog = SolutionCatalog(
-            solutions=solution_catalog.solutions[:result_limit],
+            solutions=solution_catalog.solutions[:top_k],
             by_key={
                 solution.key: solution
-                for solution in solution_catalog.solutions[:result_limit]
+                for solution in solution_catalog.solutions[:top_k]
             },
             standard_order=solution_catalog.standard_order,
         )
@@ -506,7 +689,9 @@ def build_layouts(
             if entry["key"] == best_solution.key:
                 best_entry = entry
                 break
-    if best_entry is None and best_raw_entry is not None:
+    if best_entry is None:
+        if best_raw_entry is None:
+            best_raw_entry = _best_raw_entry()
         best_entry = best_raw_entry
 
     best_key = best_entry["key"] if best_entry else ""
@@ -520,7 +705,8 @@ def build_layouts(
         min_support=min_support,
         assume_full_support=assume_full_support,
     )
-    even_base, odd_shifted = seq.best_shift()
+    with prof.stage("sequencer", len(best_pattern)):
+        even_base, odd_shifted = seq.best_shift()
     even_centered = center_layout(
         even_base, inputs.pallet_w, inputs.pallet_l, center_enabled, center_mode
     )
@@ -547,7 +733,7 @@ def build_layouts(
         )
     best_count_layout_name = best_layout_name
 
-    return LayoutComputation(
+    result = LayoutComputation(
         layouts=layout_entries,
         layout_map=layout_map,
         best_layout_name=best_layout_name,
@@ -562,4 +748,22 @@ def build_layouts(
         row_by_row_horizontal=row_by_row_horizontal,
         raw_layout_entries=raw_layout_entries,
         filtered_layout_entries=layout_entries,
+        completed_generators=completed_generators,
+        truncated_generators=truncated_generators,
     )
+    if cache_key is not None and not truncated_generators:
+        # Stored with the profile so far; cache hits reuse its candidate counts.
+        result.profile = prof.report()
+        with prof.stage("cache_store"):
+            cache.put(cache_key, result)
+    result.profile = _finish_profile(prof)
+    return result
+
+
+def _finish_profile(prof: Profiler) -> ProfileReport:
+    report = prof.report()
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Layout computation profile:\n%s", "\n".join(report.format_lines())
+        )
+    return report
@@ -0,0 +1,120 @@
+"""Array-backed layer layouts.
+
+A layout is passed around as a list of ``(x, y, w, l)`` tuples, and every
+shift or mirror of it builds a new list.  :class:`LayerArray` keeps the same
+cartons in one contiguous ``(n, 4)`` float64 buffer with a ``uint8``
+orientation column, so slices are views and translating or mirroring works
+in place on whole columns.  :meth:`LayerArray.from_layout` and
+:meth:`LayerArray.to_layout` convert from and to the tuple lists, so callers
+can migrate one function at a time; :func:`as_layer_array` and
+:func:`like_input` let a function accept either form and answer in kind.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+
+LayerLayout = List[Tuple[float, float, float, float]]
+
+
+class LayerArray:
+    """Cartons of one layer as rows ``(x, y, w, l)`` of a float64 array.
+
+    ``orientation`` is ``1`` for cartons lying with their longer side along
+    ``y`` and ``0`` otherwise.  Indexing with a slice returns a view sharing
+    the buffer; the transforms modify the array in place and return it.
+    """
+
+    __slots__ = ("data", "orientation")
+
+    def __init__(self, data: np.ndarray, orientation: np.ndarray | None = None):
+        self.data = data
+        if orientation is None:
+            orientation = (data[:, 3] > data[:, 2]).astype(np.uint8)
+        self.orientation = orientation
+
+    @classmethod
+    def from_layout(cls, layout: Sequence[Sequence[float]]) -> "LayerArray":
+        """Copy a tuple-list layout (or another :class:`LayerArray`)."""
+
+        if isinstance(layout, LayerArray):
+            return layout.copy()
+        data = np.array(layout, dtype=np.float64).reshape(-1, 4)
+        return cls(data)
+
+    def to_layout(self) -> LayerLayout:
+        return [tuple(row) for row in self.data.tolist()]
+
+    def copy(self) -> "LayerArray":
+        return LayerArray(self.data.copy(), self.orientation.copy())
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self) -> Iterator[Tuple[float, float, float, float]]:
+        return iter(self.to_layout())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LayerArray(self.data[index], self.orientation[index])
+        return tuple(self.data[index].tolist())
+
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """``(x_min, y_min, x_max, y_max)`` of the cartons."""
+
+        data = self.data
+        return (
+            float(data[:, 0].min()),
+            float(data[:, 1].min()),
+            float((data[:, 0] + data[:, 2]).max()),
+            float((data[:, 1] + data[:, 3]).max()),
+        )
+
+    def translate(self, dx: float, dy: float) -> "LayerArray":
+        self.data[:, 0] += dx
+        self.data[:, 1] += dy
+        return self
+
+    def inset(self, spacing: float) -> "LayerArray":
+        """Shrink every carton by ``spacing`` around its slot centre."""
+
+        self.translate(spacing / 2, spacing / 2)
+        self.data[:, 2:] -= spacing
+        return self
+
+    def mirror(self, flip_x: bool, flip_y: bool, pallet_w: float, pallet_l: float):
+        """Mirror across the pallet's vertical and/or horizontal centre line."""
+
+        data = self.data
+        if flip_x:
+            data[:, 0] = pallet_w - data[:, 0] - data[:, 2]
+        if flip_y:
+            data[:, 1] = pallet_l - data[:, 1] - data[:, 3]
+        return self
+
+    def digest(self) -> bytes:
+        """128-bit digest of the exact coordinates, for cheap hashing."""
+
+        buffer = np.ascontiguousarray(self.data).tobytes()
+        return hashlib.blake2b(buffer, digest_size=16).digest()
+
+
+AnyLayout = Union[LayerLayout, LayerArray]
+
+
+def as_layer_array(layout: AnyLayout) -> LayerArray:
+    """Working copy of ``layout`` as a :class:`LayerArray`."""
+
+    return LayerArray.from_layout(layout)
+
+
+def like_input(original: AnyLayout, result: LayerArray) -> AnyLayout:
+    """``result`` in the form ``original`` came in."""
+
+    return result if isinstance(original, LayerArray) else result.to_layout()
+
+
+__all__ = ["AnyLayout", "LayerArray", "as_layer_array", "like_input"]
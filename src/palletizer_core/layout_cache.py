@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Mapping
+
+from .selector import load_weights
+
+if TYPE_CHECKING:  # pragma: no cover - imported for annotations only
+    from .engine import LayoutComputation, PalletInputs
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored payload layout changes in an incompatible way.
+CACHE_FORMAT = 1
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS layouts (
+    key TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access INTEGER NOT NULL
+)
+"""
+
+
+def get_cache_dir() -> str:
+    env_dir = os.getenv("PALLETIZER_CACHE_DIR")
+    if env_dir:
+        return str(Path(env_dir).expanduser().resolve())
+    argv_path = Path(sys.argv[0]) if sys.argv[0] else None
+    # ``python -m packing_app`` reports the package's ``__main__.py``; the
+    # cache must not end up inside the source tree then.
+    if argv_path and argv_path.is_file() and argv_path.name != "__main__.py":
+        base_dir = argv_path.parent
+    else:
+        base_dir = Path.cwd()
+    default_dir = base_dir / "data" / "layout_cache"
+    return str(default_dir.resolve())
+
+
+@lru_cache(maxsize=None)
+def algorithm_version() -> str:
+    """Return a digest of the ``palletizer_core`` sources.
+
+    Any edit to the layout code changes the digest, so cached results from an
+    older version are never served.
+    """
+
+    root = Path(__file__).resolve().parent
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob("*.py")):
+        digest.update(path.relative_to(root).as_posix().encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return repr(round(float(value), 6))
+    if isinstance(value, Mapping):
+        return {str(key): _normalize(val) for key, val in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return repr(value)
+
+
+def layout_cache_key(inputs: PalletInputs, options: Mapping[str, Any]) -> str:
+    """Return the content address for ``inputs`` computed with ``options``.
+
+    The key covers the normalized pallet/carton inputs, every option flag, the
+    scoring weights from ``settings.yaml`` and :func:`algorithm_version`.
+    """
+
+    payload = {
+        "format": CACHE_FORMAT,
+        "version": algorithm_version(),
+        "inputs": _normalize({f.name: getattr(inputs, f.name) for f in fields(inputs)}),
+        "options": _normalize(dict(options)),
+        "weights": _normalize(load_weights()),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LayoutCache:
+    """Size-bounded on-disk LRU cache of :class:`LayoutComputation` results.
+
+    Entries live in a single SQLite file and are stored as compressed pickles.
+    The cache never raises on I/O problems: a broken or unwritable database
+    simply behaves like a permanent miss.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str] | None = None,
+        *,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        if path is None:
+            path = Path(get_cache_dir()) / "layouts.sqlite3"
+        self.path = Path(path)
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+        self._clock = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**asdict(self._stats))
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=5.0)
+        try:
+            conn.execute(_SCHEMA)
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _tick(self) -> int:
+        # Strictly increasing access stamp; wall time alone can tie.
+        self._clock = max(self._clock + 1, time.time_ns())
+        return self._clock
+
+    def get(self, key: str) -> LayoutComputation | None:
+        payload = None
+        with self._lock:
+            try:
+                with self._connect() as conn:
+                    row = conn.execute(
+                        "SELECT payload FROM layouts WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        payload = row[0]
+                        conn.execute(
+                            "UPDATE layouts SET last_access = ? WHERE key = ?",
+                            (self._tick(), key),
+                        )
+            except (OSError, sqlite3.Error):
+                logger.warning("Layout cache unavailable at %s", self.path, exc_info=True)
+            result = None
+            if payload is not None:
+                try:
+                    result = pickle.loads(zlib.decompress(payload))
+                except Exception:
+                    logger.warning("Dropping unreadable layout cache entry %s", key)
+                    self._discard(key)
+            if result is None:
+                self._stats.misses += 1
+            else:
+                self._stats.hits += 1
+            return result
+
+    def put(self, key: str, computation: LayoutComputation) -> None:
+        payload = zlib.compress(
+            pickle.dumps(computation, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+        with self._lock:
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO layouts (key, payload, size, last_access)"
+                        " VALUES (?, ?, ?, ?)",
+                        (key, payload, len(payload), self._tick()),
+                    )
+                    self._stats.stores += 1
+                    self._stats.evictions += self._evict(conn)
+            except (OSError, sqlite3.Error):
+                logger.warning("Layout cache unavailable at %s", self.path, exc_info=True)
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM layouts"
+        ).fetchone()
+        evicted = 0
+        rows = conn.execute("SELECT key, size FROM layouts ORDER BY last_access ASC")
+        victims = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            # Keep at least the newest entry even if it alone exceeds the budget.
+            if count <= 1:
+                break
+            victims.append((key,))
+            count -= 1
+            total -= size
+            evicted += 1
+        if victims:
+            conn.executemany("DELETE FROM layouts WHERE key = ?", victims)
+        return evicted
+
+    def _discard(self, key: str) -> None:
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM layouts WHERE key = ?", (key,))
+        except (OSError, sqlite3.Error):
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            try:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM layouts")
+            except (OSError, sqlite3.Error):
+                logger.warning("Layout cache unavailable at %s", self.path, exc_info=True)
+
+    def __len__(self) -> int:
+        try:
+            with self._connect() as conn:
+                return int(conn.execute("SELECT COUNT(*) FROM layouts").fetchone()[0])
+        except (OSError, sqlite3.Error):
+            return 0
+
+
+__all__ = [
+    "CacheStats",
+    "LayoutCache",
+    "algorithm_version",
+    "get_cache_dir",
+    "layout_cache_key",
+]
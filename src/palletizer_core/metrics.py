@@ -1,22 +1,70 @@
 from __future__ import annotations
 
 import math
-from typing import List, Tuple
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Set, Tuple
 
 # Pattern is list of rectangles (x, y, w, l)
 Pattern = List[Tuple[float, float, float, float]]
 
+# Relative slack applied to the interval window below; far larger than the
+# rounding of ``start + length`` yet small enough to keep the candidate lists short.
+_WINDOW_SLACK = 1e-9
 
-def compute_edge_contact_fraction(
-    pattern: Pattern, *, eps: float = 1e-6, clamp: bool = True
-) -> float:
-    if not pattern:
-        return 0.0
-    perimeter = 0.0
+
+def _touching_pairs(
+    lows: List[float],
+    highs: List[float],
+    starts: List[float],
+    ends: List[float],
+    eps: float,
+) -> Set[Tuple[int, int]]:
+    """Return index pairs ``(i, j)``, ``i < j``, with coincident edges.
+
+    A pair touches when the high edge of one rectangle is within ``eps`` of
+    the low edge of the other (``lows``/``highs``) and their spans on the
+    other axis (``starts``/``ends``) overlap.  Low edges are bucketed on a
+    grid of ``2*eps`` cells and sorted by span start, so a high edge only
+    scans the neighbouring buckets over the window its span can reach.
+    """
+
+    cell = 2.0 * eps
+    buckets: Dict[int, List[int]] = {}
+    for idx, low in enumerate(lows):
+        buckets.setdefault(math.floor(low / cell), []).append(idx)
+    index: Dict[int, Tuple[List[float], List[int], float]] = {}
+    for key, members in buckets.items():
+        members.sort(key=starts.__getitem__)
+        reach = max(max(ends[j] - starts[j] for j in members), 0.0)
+        index[key] = ([starts[j] for j in members], members, reach)
+
+    pairs: Set[Tuple[int, int]] = set()
+    for i, high in enumerate(highs):
+        start, end = starts[i], ends[i]
+        if not end > start:
+            continue
+        key = math.floor(high / cell)
+        for bucket in (key - 1, key, key + 1):
+            entry = index.get(bucket)
+            if entry is None:
+                continue
+            keys, members, reach = entry
+            slack = _WINDOW_SLACK * (abs(start) + abs(end) + reach)
+            lo = bisect_left(keys, start - reach - slack)
+            hi = bisect_right(keys, end + slack)
+            for j in members[lo:hi]:
+                if (
+                    j != i
+                    and abs(high - lows[j]) < eps
+                    and min(end, ends[j]) - max(start, starts[j]) > 0.0
+                ):
+                    pairs.add((i, j) if i < j else (j, i))
+    return pairs
+
+
+def _pairwise_contact(pattern: Pattern, eps: float) -> float:
     contact = 0.0
     n = len(pattern)
-    for _, _, w, length in pattern:
-        perimeter += 2.0 * (w + length)
     for i in range(n):
         x1, y1, w1, l1 = pattern[i]
         for j in range(i + 1, n):
@@ -27,6 +75,54 @@ def compute_edge_contact_fraction(
             if abs((y1 + l1) - y2) < eps or abs((y2 + l2) - y1) < eps:
                 overlap = max(0.0, min(x1 + w1, x2 + w2) - max(x1, x2))
                 contact += overlap
+    return contact
+
+
+def _indexed_contact(pattern: Pattern, eps: float) -> float:
+    xs = [x for x, _, _, _ in pattern]
+    ys = [y for _, y, _, _ in pattern]
+    rights = [x + w for x, _, w, _ in pattern]
+    tops = [y + length for _, y, _, length in pattern]
+    x_pairs = _touching_pairs(xs, rights, ys, tops, eps)
+    y_pairs = _touching_pairs(ys, tops, xs, rights, eps)
+    # Accumulate in the (i, j, x-then-y) order of the all-pairs loop so the
+    # floating-point sum is the same; skipped pairs would only add zeros.
+    contact = 0.0
+    for i, j in sorted(x_pairs | y_pairs):
+        x1, y1, w1, l1 = pattern[i]
+        x2, y2, w2, l2 = pattern[j]
+        if (i, j) in x_pairs:
+            overlap = max(0.0, min(y1 + l1, y2 + l2) - max(y1, y2))
+            contact += overlap
+        if (i, j) in y_pairs:
+            overlap = max(0.0, min(x1 + w1, x2 + w2) - max(x1, x2))
+            contact += overlap
+    return contact
+
+
+def compute_edge_contact_fraction(
+    pattern: Pattern, *, eps: float = 1e-6, clamp: bool = True
+) -> float:
+    """Return the shared edge length divided by the total carton perimeter.
+
+    Edges are matched through a spatial hash on their coordinates, so the cost
+    grows with the number of touching pairs rather than with ``n**2``.  The
+    result is identical to comparing every pair of rectangles.
+    """
+
+    if not pattern:
+        return 0.0
+    perimeter = 0.0
+    for _, _, w, length in pattern:
+        perimeter += 2.0 * (w + length)
+    if eps <= 0:
+        contact = 0.0
+    else:
+        try:
+            contact = _indexed_contact(pattern, eps)
+        except (OverflowError, ValueError):
+            # Non-finite coordinates cannot be bucketed.
+            contact = _pairwise_contact(pattern, eps)
     if perimeter <= eps:
         return 0.0
     value = contact / perimeter
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import BrokenExecutor, Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A job is ``(name, function, args)``; ``function(*args)`` must be picklable
+# (defined at module level) so it can be shipped to a worker process.
+Job = Tuple[str, Callable[..., Any], tuple]
+
+
+class InlineExecutor(Executor):
+    """Executor running every submitted callable synchronously.
+
+    Used as the fallback when a process pool is unavailable or not wanted, so
+    callers can always talk to the :class:`~concurrent.futures.Executor` API.
+    """
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:  # pragma: no cover - re-raised via result()
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+        return future
+
+
+def create_executor(max_workers: int | None = None) -> Executor:
+    """Return a process pool, or an :class:`InlineExecutor` as fallback.
+
+    ``max_workers`` of ``1`` or less requests inline execution explicitly.
+    The caller owns the returned executor and should ``shutdown()`` it (or use
+    it as a context manager) when done.
+    """
+
+    if max_workers is not None and max_workers <= 1:
+        return InlineExecutor()
+    try:
+        return ProcessPoolExecutor(max_workers=max_workers)
+    except (ImportError, NotImplementedError, OSError, ValueError):
+        logger.warning("Process pool unavailable, running generators inline")
+        return InlineExecutor()
+
+
+def run_jobs(jobs: Sequence[Job], executor: Executor | None = None) -> List[Any]:
+    """Run ``jobs`` and return their results in job order.
+
+    Without an executor the jobs run one after another in the caller.  With an
+    executor all jobs are submitted up front and collected in submission
+    order, so the merged output does not depend on completion order.  Jobs
+    whose worker pool broke (or that could not be submitted) are re-run
+    inline; ordinary exceptions raised by a job propagate unchanged.
+    """
+
+    if executor is None:
+        return [fn(*args) for _, fn, args in jobs]
+
+    futures: List[Future | None] = []
+    for name, fn, args in jobs:
+        try:
+            futures.append(executor.submit(fn, *args))
+        except (BrokenExecutor, RuntimeError):
+            logger.warning("Could not submit generator %s, running inline", name)
+            futures.append(None)
+
+    results: List[Any] = []
+    for (name, fn, args), future in zip(jobs, futures, strict=True):
+        if future is None:
+            results.append(fn(*args))
+            continue
+        try:
+            results.append(future.result())
+        except BrokenExecutor:
+            logger.warning("Worker pool broke during %s, running inline", name)
+            results.append(fn(*args))
+    return results
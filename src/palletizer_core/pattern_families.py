@@ -1,266 +1,407 @@
+"""Block-based layer pattern families.
+
+Every family splits the pallet into a few blocks and fills each block with a
+uniform grid of cartons (``A`` upright, ``B`` rotated) or an interlocked
+sub-layout (``I``).  The ``iter_*`` generators yield a
+:class:`PatternDescriptor` per split: the block list and its exact carton
+count, worked out from the :class:`~palletizer_core.algorithms.CapacityTable`
+without building coordinates.  :func:`select_descriptors` keeps the
+``MAX_VARIANTS`` best counts, drops descriptors that would build the same
+cartons or their mirror image and only then materialises the survivors.
+"""
+
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+import heapq
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from palletizer_core import algorithms
+from palletizer_core.algorithms.capacity import CapacityTable, capacity_table
 from .models import Carton, Pallet
+from .symmetry import PALLET_SYMMETRIES, transform_rect
 
 LayerLayout = List[Tuple[float, float, float, float]]
+# Block of a pattern: (x0, y0, width, length, kind) with kind "A", "B" or "I".
+Block = Tuple[float, float, float, float, str]
 
 MAX_VARIANTS = 50
 
 
-def _fill_block(
-    x0: float,
-    y0: float,
-    block_w: float,
-    block_l: float,
-    box_w: float,
-    box_l: float,
-) -> LayerLayout:
-    cols = int(block_w // box_w) if box_w > 0 else 0
-    rows = int(block_l // box_l) if box_l > 0 else 0
-    if cols <= 0 or rows <= 0:
-        return []
-    pattern: LayerLayout = []
-    for r in range(rows):
-        for c in range(cols):
-            pattern.append((x0 + c * box_w, y0 + r * box_l, box_w, box_l))
-    return pattern
-
-
-def _fill_interlock(
-    x0: float,
-    y0: float,
-    block_w: float,
-    block_l: float,
-    box_w: float,
-    box_l: float,
-) -> LayerLayout:
+@lru_cache(maxsize=256)
+def _interlock_block(
+    block_w: float, block_l: float, box_w: float, box_l: float
+) -> Tuple[Tuple[float, float, float, float], ...]:
     try:
         _, _, layers = algorithms.compute_interlocked_layout(
             block_w, block_l, box_w, box_l, num_layers=1
         )
     except Exception:
-        return []
+        return ()
     if not layers:
-        return []
-    return [(x + x0, y + y0, w, length) for x, y, w, length in layers[0]]
+        return ()
+    return tuple(layers[0])
+
+
+@dataclass(frozen=True)
+class PatternDescriptor:
+    """A pattern of one family before its coordinates are built."""
+
+    name: str
+    count: int
+    blocks: Tuple[Block, ...]
+    table: CapacityTable = field(compare=False, repr=False)
+
+    def key(self) -> tuple:
+        """Identity of the cartons the pattern places, for deduplication.
+
+        Like ``layout_signature(..., symmetric=True)``, grid patterns that
+        are shifted or mirrored copies of each other on the pallet share a
+        key; interlocked blocks are compared in place.
+        """
+
+        table = self.table
+        grids = []
+        interlocked = []
+        for x0, y0, block_w, block_l, kind in self.blocks:
+            if kind == "I":
+                interlocked.append((x0, y0, block_w, block_l))
+                continue
+            rotated = kind == "B"
+            cols, rows = table.grid(block_w, block_l, rotated)
+            if cols > 0 and rows > 0:
+                box_w, box_l = table.size(rotated)
+                grids.append(((x0, y0, cols * box_w, rows * box_l), cols, rows))
+        if interlocked:
+            return tuple(sorted(grids)), tuple(sorted(interlocked))
+        pallet_w, pallet_l = table.pallet_w, table.pallet_l
+        images = (
+            [
+                (transform_rect(rect, transform, pallet_w, pallet_l), *counts)
+                for rect, *counts in grids
+            ]
+            for transform in PALLET_SYMMETRIES
+        )
+        return min(_anchored(image) for image in images), ()
+
+    def materialize(self) -> LayerLayout:
+        table = self.table
+        layout: LayerLayout = []
+        for x0, y0, block_w, block_l, kind in self.blocks:
+            if kind == "I":
+                layout.extend(
+                    (x + x0, y + y0, w, length)
+                    for x, y, w, length in _interlock_block(
+                        block_w, block_l, table.box_w, table.box_l
+                    )
+                )
+            else:
+                layout.extend(table.block(x0, y0, block_w, block_l, kind == "B"))
+        return layout
+
+
+def _anchored(grids: List[tuple]) -> tuple:
+    """Sorted grid parts shifted so that the lowest and leftmost touch zero."""
+
+    if not grids:
+        return ()
+    min_x = min(rect[0] for rect, *_ in grids)
+    min_y = min(rect[1] for rect, *_ in grids)
+    return tuple(
+        sorted(
+            (round(x - min_x, 6), round(y - min_y, 6), round(w, 6), round(l_, 6))
+            + tuple(counts)
+            for (x, y, w, l_), *counts in grids
+        )
+    )
+
+
+def memo_info() -> Dict[str, Tuple[int, int]]:
+    """``(hits, misses)`` so far of the memoised helpers used by the families.
+
+    Interlocked blocks and capacity tables are shared by every family and
+    hybrid ratio of a carton; the counters are those of this process.
+    """
+
+    stats = {}
+    for name, cached in (
+        ("interlock_block", _interlock_block),
+        ("capacity_table", capacity_table),
+    ):
+        info = cached.cache_info()
+        stats[name] = (info.hits, info.misses)
+    return stats
+
+
+def _describe(
+    table: CapacityTable,
+    name: str,
+    blocks: Tuple[Block, ...],
+    *,
+    complete: bool = True,
+) -> Optional[PatternDescriptor]:
+    """Descriptor for ``blocks``; ``None`` if empty or, when ``complete``, if
+    any block holds no carton."""
+
+    total = 0
+    for _, _, block_w, block_l, kind in blocks:
+        if kind == "I":
+            count = len(
+                _interlock_block(block_w, block_l, table.box_w, table.box_l)
+            )
+        else:
+            count = table.count(block_w, block_l, kind == "B")
+        if not count and complete:
+            return None
+        total += count
+    if total == 0:
+        return None
+    return PatternDescriptor(name, total, blocks, table)
+
+
+def select_descriptors(
+    descriptors: Iterable[PatternDescriptor], limit: int = MAX_VARIANTS
+) -> Dict[str, LayerLayout]:
+    """Materialise the ``limit`` highest-count distinct descriptors.
+
+    A descriptor that cannot beat the current ``limit``-th count is dropped
+    before anything else is done with it; of equal counts and of descriptors
+    placing the same cartons, or their mirror image, the first one wins.
+    Survivors are returned in generation order.
+    """
+
+    if limit <= 0:
+        return {}
+    heap: List[Tuple[int, int, PatternDescriptor]] = []
+    seen = set()
+    for index, descriptor in enumerate(descriptors):
+        if len(heap) >= limit and descriptor.count <= heap[0][0]:
+            continue
+        key = descriptor.key()
+        if key in seen:
+            continue
+        seen.add(key)
+        item = (descriptor.count, -index, descriptor)
+        if len(heap) < limit:
+            heapq.heappush(heap, item)
+        else:
+            heapq.heapreplace(heap, item)
+    survivors = sorted(heap, key=lambda item: -item[1])
+    return {
+        descriptor.name: descriptor.materialize() for _, _, descriptor in survivors
+    }
+
+
+def _family_table(carton: Carton, pallet: Pallet) -> CapacityTable:
+    return capacity_table(carton.width, carton.length, pallet.width, pallet.length)
 
 
-def generate_block2(carton: Carton, pallet: Pallet) -> Dict[str, LayerLayout]:
-    patterns: Dict[str, LayerLayout] = {}
+def iter_block2(carton: Carton, pallet: Pallet) -> Iterator[PatternDescriptor]:
+    table = _family_table(carton, pallet)
     box_w, box_l = carton.width, carton.length
     pallet_w, pallet_l = pallet.width, pallet.length
-    max_cols_a = int(pallet_w // box_w) if box_w > 0 else 0
-    max_rows_a = int(pallet_l // box_l) if box_l > 0 else 0
 
     # Split along X
-    for split_cols in range(1, max_cols_a):
-        if len(patterns) >= MAX_VARIANTS:
-            break
+    for split_cols in range(1, table.fit(pallet_w, box_w)):
         left_w = split_cols * box_w
         right_w = pallet_w - left_w
         if right_w < box_l:
             continue
-        left = _fill_block(0.0, 0.0, left_w, pallet_l, box_w, box_l)
-        right = _fill_block(left_w, 0.0, right_w, pallet_l, box_l, box_w)
-        if left and right:
-            patterns[f"block2_x_split_{split_cols}"] = left + right
-            if len(patterns) >= MAX_VARIANTS:
-                break
-            patterns[f"block2_x_split_{split_cols}_swap"] = (
-                _fill_block(0.0, 0.0, left_w, pallet_l, box_l, box_w)
-                + _fill_block(left_w, 0.0, right_w, pallet_l, box_w, box_l)
-            )
+        name = f"block2_x_split_{split_cols}"
+        main = _describe(
+            table,
+            name,
+            ((0.0, 0.0, left_w, pallet_l, "A"), (left_w, 0.0, right_w, pallet_l, "B")),
+        )
+        if main is None:
+            continue
+        yield main
+        swap = _describe(
+            table,
+            f"{name}_swap",
+            ((0.0, 0.0, left_w, pallet_l, "B"), (left_w, 0.0, right_w, pallet_l, "A")),
+            complete=False,
+        )
+        if swap is not None:
+            yield swap
 
     # Split along Y
-    for split_rows in range(1, max_rows_a):
-        if len(patterns) >= MAX_VARIANTS:
-            break
+    for split_rows in range(1, table.fit(pallet_l, box_l)):
         bottom_l = split_rows * box_l
         top_l = pallet_l - bottom_l
         if top_l < box_w:
             continue
-        bottom = _fill_block(0.0, 0.0, pallet_w, bottom_l, box_w, box_l)
-        top = _fill_block(0.0, bottom_l, pallet_w, top_l, box_l, box_w)
-        if bottom and top:
-            patterns[f"block2_y_split_{split_rows}"] = bottom + top
-            if len(patterns) >= MAX_VARIANTS:
-                break
-            patterns[f"block2_y_split_{split_rows}_swap"] = (
-                _fill_block(0.0, 0.0, pallet_w, bottom_l, box_l, box_w)
-                + _fill_block(0.0, bottom_l, pallet_w, top_l, box_w, box_l)
-            )
+        name = f"block2_y_split_{split_rows}"
+        main = _describe(
+            table,
+            name,
+            (
+                (0.0, 0.0, pallet_w, bottom_l, "A"),
+                (0.0, bottom_l, pallet_w, top_l, "B"),
+            ),
+        )
+        if main is None:
+            continue
+        yield main
+        swap = _describe(
+            table,
+            f"{name}_swap",
+            (
+                (0.0, 0.0, pallet_w, bottom_l, "B"),
+                (0.0, bottom_l, pallet_w, top_l, "A"),
+            ),
+            complete=False,
+        )
+        if swap is not None:
+            yield swap
 
-    return patterns
 
+_SEQUENCES = ("ABA", "BAB")
 
-def generate_block3(carton: Carton, pallet: Pallet) -> Dict[str, LayerLayout]:
-    patterns: Dict[str, LayerLayout] = {}
+
+def iter_block3(carton: Carton, pallet: Pallet) -> Iterator[PatternDescriptor]:
+    table = _family_table(carton, pallet)
     box_w, box_l = carton.width, carton.length
     pallet_w, pallet_l = pallet.width, pallet.length
-    max_cols_a = int(pallet_w // box_w) if box_w > 0 else 0
-    max_rows_a = int(pallet_l // box_l) if box_l > 0 else 0
-
-    sequences = [
-        ("A", "B", "A"),
-        ("B", "A", "B"),
-    ]
+    max_cols_a = table.fit(pallet_w, box_w)
+    max_rows_a = table.fit(pallet_l, box_l)
 
     for split_cols in range(1, max_cols_a - 1):
         for mid_cols in range(1, max_cols_a - split_cols):
-            if len(patterns) >= MAX_VARIANTS:
-                break
             left_w = split_cols * box_w
             mid_w = mid_cols * box_w
             right_w = pallet_w - left_w - mid_w
             if right_w <= 0:
                 continue
-            for seq in sequences:
-                blocks = []
-                x0 = 0.0
-                widths = [left_w, mid_w, right_w]
-                for block_w, orient in zip(widths, seq, strict=True):
-                    if orient == "A":
-                        block = _fill_block(x0, 0.0, block_w, pallet_l, box_w, box_l)
-                    else:
-                        block = _fill_block(x0, 0.0, block_w, pallet_l, box_l, box_w)
-                    if not block:
-                        blocks = []
-                        break
-                    blocks.extend(block)
-                    x0 += block_w
-                if blocks:
-                    key = f"block3_x_splits_{split_cols}_{mid_cols}_{''.join(seq)}"
-                    patterns[key] = blocks
-                    if len(patterns) >= MAX_VARIANTS:
-                        break
-        if len(patterns) >= MAX_VARIANTS:
-            break
+            for seq in _SEQUENCES:
+                descriptor = _describe(
+                    table,
+                    f"block3_x_splits_{split_cols}_{mid_cols}_{seq}",
+                    (
+                        (0.0, 0.0, left_w, pallet_l, seq[0]),
+                        (left_w, 0.0, mid_w, pallet_l, seq[1]),
+                        (left_w + mid_w, 0.0, right_w, pallet_l, seq[2]),
+                    ),
+                )
+                if descriptor is not None:
+                    yield descriptor
 
     for split_rows in range(1, max_rows_a - 1):
         for mid_rows in range(1, max_rows_a - split_rows):
-            if len(patterns) >= MAX_VARIANTS:
-                break
             bottom_l = split_rows * box_l
             mid_l = mid_rows * box_l
             top_l = pallet_l - bottom_l - mid_l
             if top_l <= 0:
                 continue
-            for seq in sequences:
-                blocks = []
-                y0 = 0.0
-                lengths = [bottom_l, mid_l, top_l]
-                for block_l, orient in zip(lengths, seq, strict=True):
-                    if orient == "A":
-                        block = _fill_block(0.0, y0, pallet_w, block_l, box_w, box_l)
-                    else:
-                        block = _fill_block(0.0, y0, pallet_w, block_l, box_l, box_w)
-                    if not block:
-                        blocks = []
-                        break
-                    blocks.extend(block)
-                    y0 += block_l
-                if blocks:
-                    key = f"block3_y_splits_{split_rows}_{mid_rows}_{''.join(seq)}"
-                    patterns[key] = blocks
-                    if len(patterns) >= MAX_VARIANTS:
-                        break
-        if len(patterns) >= MAX_VARIANTS:
-            break
-
-    return patterns
-
-
-def generate_block4(carton: Carton, pallet: Pallet) -> Dict[str, LayerLayout]:
-    patterns: Dict[str, LayerLayout] = {}
+            for seq in _SEQUENCES:
+                descriptor = _describe(
+                    table,
+                    f"block3_y_splits_{split_rows}_{mid_rows}_{seq}",
+                    (
+                        (0.0, 0.0, pallet_w, bottom_l, seq[0]),
+                        (0.0, bottom_l, pallet_w, mid_l, seq[1]),
+                        (0.0, bottom_l + mid_l, pallet_w, top_l, seq[2]),
+                    ),
+                )
+                if descriptor is not None:
+                    yield descriptor
+
+
+_BLOCK4_VARIANTS = {
+    "checker": (("A", "B"), ("B", "A")),
+    "pinwheel": (("A", "B"), ("A", "B")),
+}
+
+
+def iter_block4(carton: Carton, pallet: Pallet) -> Iterator[PatternDescriptor]:
+    table = _family_table(carton, pallet)
     box_w, box_l = carton.width, carton.length
     pallet_w, pallet_l = pallet.width, pallet.length
-    max_cols_a = int(pallet_w // box_w) if box_w > 0 else 0
-    max_rows_a = int(pallet_l // box_l) if box_l > 0 else 0
-
-    variants = {
-        "checker": [["A", "B"], ["B", "A"]],
-        "pinwheel": [["A", "B"], ["A", "B"]],
-    }
 
-    for split_cols in range(1, max_cols_a):
-        for split_rows in range(1, max_rows_a):
-            if len(patterns) >= MAX_VARIANTS:
-                break
+    for split_cols in range(1, table.fit(pallet_w, box_w)):
+        for split_rows in range(1, table.fit(pallet_l, box_l)):
             left_w = split_cols * box_w
             right_w = pallet_w - left_w
             bottom_l = split_rows * box_l
             top_l = pallet_l - bottom_l
             if right_w <= 0 or top_l <= 0:
                 continue
-            for name, grid in variants.items():
-                blocks: LayerLayout = []
-                coords = [
-                    (0.0, 0.0, left_w, bottom_l, grid[0][0]),
-                    (left_w, 0.0, right_w, bottom_l, grid[0][1]),
-                    (0.0, bottom_l, left_w, top_l, grid[1][0]),
-                    (left_w, bottom_l, right_w, top_l, grid[1][1]),
-                ]
-                for x0, y0, bw, bl, orient in coords:
-                    if orient == "A":
-                        block = _fill_block(x0, y0, bw, bl, box_w, box_l)
-                    else:
-                        block = _fill_block(x0, y0, bw, bl, box_l, box_w)
-                    if not block:
-                        blocks = []
-                        break
-                    blocks.extend(block)
-                if blocks:
-                    patterns[f"block4_{name}_split_{split_cols}_{split_rows}"] = blocks
-                    if len(patterns) >= MAX_VARIANTS:
-                        break
-        if len(patterns) >= MAX_VARIANTS:
-            break
-
-    return patterns
-
-
-def generate_hybrid(carton: Carton, pallet: Pallet) -> Dict[str, LayerLayout]:
-    patterns: Dict[str, LayerLayout] = {}
+            for name, grid in _BLOCK4_VARIANTS.items():
+                descriptor = _describe(
+                    table,
+                    f"block4_{name}_split_{split_cols}_{split_rows}",
+                    (
+                        (0.0, 0.0, left_w, bottom_l, grid[0][0]),
+                        (left_w, 0.0, right_w, bottom_l, grid[0][1]),
+                        (0.0, bottom_l, left_w, top_l, grid[1][0]),
+                        (left_w, bottom_l, right_w, top_l, grid[1][1]),
+                    ),
+                )
+                if descriptor is not None:
+                    yield descriptor
+
+
+_HYBRID_RATIOS = (0.6, 0.7, 0.5, 0.4, 0.3)
+
+
+def iter_hybrid(carton: Carton, pallet: Pallet) -> Iterator[PatternDescriptor]:
+    table = _family_table(carton, pallet)
     box_w, box_l = carton.width, carton.length
     pallet_w, pallet_l = pallet.width, pallet.length
 
-    ratios = [0.6, 0.7, 0.5, 0.4, 0.3]
-    for ratio in ratios:
-        if len(patterns) >= MAX_VARIANTS:
-            break
-        split_w = pallet_w * ratio
-        split_cols = int(split_w // box_w) if box_w > 0 else 0
-        left_w = split_cols * box_w
+    for ratio in _HYBRID_RATIOS:
+        percent = int(ratio * 100)
+        left_w = table.fit(pallet_w * ratio, box_w) * box_w
         right_w = pallet_w - left_w
         if left_w > 0 and right_w > 0:
-            left = _fill_block(0.0, 0.0, left_w, pallet_l, box_w, box_l)
-            right = _fill_interlock(left_w, 0.0, right_w, pallet_l, box_w, box_l)
-            if left and right:
-                patterns[f"hybrid_x_{int(ratio*100)}_col_interlock"] = left + right
-            if len(patterns) >= MAX_VARIANTS:
-                break
-            left_i = _fill_interlock(0.0, 0.0, left_w, pallet_l, box_w, box_l)
-            right_c = _fill_block(left_w, 0.0, right_w, pallet_l, box_w, box_l)
-            if left_i and right_c:
-                patterns[f"hybrid_x_{int(ratio*100)}_interlock_col"] = left_i + right_c
-
-        split_l = pallet_l * ratio
-        split_rows = int(split_l // box_l) if box_l > 0 else 0
-        bottom_l = split_rows * box_l
+            for suffix, kinds in (("col_interlock", "AI"), ("interlock_col", "IA")):
+                descriptor = _describe(
+                    table,
+                    f"hybrid_x_{percent}_{suffix}",
+                    (
+                        (0.0, 0.0, left_w, pallet_l, kinds[0]),
+                        (left_w, 0.0, right_w, pallet_l, kinds[1]),
+                    ),
+                )
+                if descriptor is not None:
+                    yield descriptor
+
+        bottom_l = table.fit(pallet_l * ratio, box_l) * box_l
         top_l = pallet_l - bottom_l
         if bottom_l > 0 and top_l > 0:
-            bottom = _fill_block(0.0, 0.0, pallet_w, bottom_l, box_w, box_l)
-            top = _fill_interlock(0.0, bottom_l, pallet_w, top_l, box_w, box_l)
-            if bottom and top:
-                patterns[f"hybrid_y_{int(ratio*100)}_col_interlock"] = bottom + top
-            if len(patterns) >= MAX_VARIANTS:
-                break
-            bottom_i = _fill_interlock(0.0, 0.0, pallet_w, bottom_l, box_w, box_l)
-            top_c = _fill_block(0.0, bottom_l, pallet_w, top_l, box_w, box_l)
-            if bottom_i and top_c:
-                patterns[f"hybrid_y_{int(ratio*100)}_interlock_col"] = bottom_i + top_c
-
-    return patterns
+            for suffix, kinds in (("col_interlock", "AI"), ("interlock_col", "IA")):
+                descriptor = _describe(
+                    table,
+                    f"hybrid_y_{percent}_{suffix}",
+                    (
+                        (0.0, 0.0, pallet_w, bottom_l, kinds[0]),
+                        (0.0, bottom_l, pallet_w, top_l, kinds[1]),
+                    ),
+                )
+                if descriptor is not None:
+                    yield descriptor
+
+
+def generate_block2(
+    carton: Carton, pallet: Pallet, limit: int = MAX_VARIANTS
+) -> Dict[str, LayerLayout]:
+    return select_descriptors(iter_block2(carton, pallet), limit)
+
+
+def generate_block3(
+    carton: Carton, pallet: Pallet, limit: int = MAX_VARIANTS
+) -> Dict[str, LayerLayout]:
+    return select_descriptors(iter_block3(carton, pallet), limit)
+
+
+def generate_block4(
+    carton: Carton, pallet: Pallet, limit: int = MAX_VARIANTS
+) -> Dict[str, LayerLayout]:
+    return select_descriptors(iter_block4(carton, pallet), limit)
+
+
+def generate_hybrid(
+    carton: Carton, pallet: Pallet, limit: int = MAX_VARIANTS
+) -> Dict[str, LayerLayout]:
+    return select_descriptors(iter_hybrid(carton, pallet), limit)
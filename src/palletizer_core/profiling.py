@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# Called with ``(stage, seconds)`` each time a stage finishes.
+ProfileCallback = Callable[[str, float], None]
+
+
+@dataclass
+class StageTiming:
+    """Accumulated wall time of one named stage.
+
+    ``complete`` is ``False`` once a run of the stage stopped early (e.g. a
+    solver hitting its time limit); ``note`` holds the last run's summary.
+    """
+
+    name: str
+    seconds: float = 0.0
+    calls: int = 0
+    items: int = 0
+    complete: bool = True
+    note: str = ""
+
+
+@dataclass
+class ProfileReport:
+    """Per-stage and per-generator timings of one :func:`build_layouts` call.
+
+    ``candidates`` is the number of generated patterns and ``unique`` the
+    number left after signature dedupe, so ``dedupe_ratio`` is the share of
+    candidates that duplicated another layout.  ``memo`` maps each memoised
+    helper to the ``(hits, misses)`` it saw during the call.
+    """
+
+    stages: List[StageTiming] = field(default_factory=list)
+    generators: List[StageTiming] = field(default_factory=list)
+    total_seconds: float = 0.0
+    candidates: int = 0
+    unique: int = 0
+    cache_hit: bool = False
+    memo: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+    @property
+    def dedupe_ratio(self) -> float:
+        if self.candidates <= 0:
+            return 0.0
+        return 1.0 - self.unique / self.candidates
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "total_seconds": self.total_seconds,
+            "candidates": self.candidates,
+            "unique": self.unique,
+            "dedupe_ratio": self.dedupe_ratio,
+            "cache_hit": self.cache_hit,
+            "stages": {s.name: _timing_dict(s) for s in self.stages},
+            "generators": {g.name: _timing_dict(g) for g in self.generators},
+            "memo": {
+                name: {"hits": hits, "misses": misses}
+                for name, (hits, misses) in self.memo.items()
+            },
+        }
+
+    def format_lines(self) -> List[str]:
+        """Human-readable summary, slowest stages first within each group."""
+
+        lines = [
+            f"total {self.total_seconds * 1000:.1f} ms"
+            + (" (cache)" if self.cache_hit else ""),
+            f"candidates {self.candidates}, unique {self.unique}"
+            f" (dedupe {self.dedupe_ratio:.0%})",
+        ]
+        groups = (("stages", self.stages), ("generators", self.generators))
+        for title, timings in groups:
+            if timings:
+                lines.append(f"{title}:")
+            for timing in sorted(timings, key=lambda t: t.seconds, reverse=True):
+                line = (
+                    f"  {timing.name:<18} {timing.seconds * 1000:9.1f} ms"
+                    f"  x{timing.calls}  items={timing.items}"
+                )
+                if not timing.complete:
+                    line += "  truncated"
+                if timing.note:
+                    line += f"  ({timing.note})"
+                lines.append(line)
+        if self.memo:
+            lines.append("memo:")
+        for name, (hits, misses) in self.memo.items():
+            lines.append(f"  {name:<18} hits={hits}  misses={misses}")
+        return lines
+
+
+def _timing_dict(timing: StageTiming) -> Dict[str, object]:
+    return {
+        "seconds": timing.seconds,
+        "calls": timing.calls,
+        "items": timing.items,
+        "complete": timing.complete,
+        "note": timing.note,
+    }
+
+
+class Profiler:
+    """Collect stage timings; pass one to :func:`build_layouts` to inspect it.
+
+    Stages are accumulated by name in first-seen order, so a stage run once
+    per candidate layout reports its total time and call count.  The optional
+    ``callback`` receives every finished stage as it happens.
+    """
+
+    def __init__(self, callback: ProfileCallback | None = None) -> None:
+        self.callback = callback
+        self.candidates = 0
+        self.unique = 0
+        self.cache_hit = False
+        self._stages: Dict[str, StageTiming] = {}
+        self._generators: Dict[str, StageTiming] = {}
+        self._memo: Dict[str, Tuple[int, int]] = {}
+        self._start = time.perf_counter()
+
+    @staticmethod
+    def _add(
+        table: Dict[str, StageTiming], name: str, seconds: float, items: int
+    ) -> None:
+        timing = table.get(name)
+        if timing is None:
+            timing = table[name] = StageTiming(name)
+        timing.seconds += seconds
+        timing.calls += 1
+        timing.items += items
+
+    def add(self, name: str, seconds: float, items: int = 0) -> None:
+        self._add(self._stages, name, seconds, items)
+        if self.callback is not None:
+            self.callback(name, seconds)
+
+    def add_generator(
+        self,
+        name: str,
+        seconds: float,
+        items: int = 0,
+        *,
+        complete: bool = True,
+        note: str = "",
+    ) -> None:
+        self._add(self._generators, name, seconds, items)
+        timing = self._generators[name]
+        timing.complete = timing.complete and complete
+        if note:
+            timing.note = note
+        if self.callback is not None:
+            self.callback(f"generator:{name}", seconds)
+
+    def add_memo(self, name: str, hits: int, misses: int) -> None:
+        """Count ``hits`` and ``misses`` of the memoised helper ``name``."""
+
+        old_hits, old_misses = self._memo.get(name, (0, 0))
+        self._memo[name] = (old_hits + hits, old_misses + misses)
+
+    @contextmanager
+    def stage(self, name: str, items: int = 0) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, items)
+
+    def report(self) -> ProfileReport:
+        return ProfileReport(
+            stages=[StageTiming(**vars(t)) for t in self._stages.values()],
+            generators=[StageTiming(**vars(t)) for t in self._generators.values()],
+            total_seconds=time.perf_counter() - self._start,
+            candidates=self.candidates,
+            unique=self.unique,
+            cache_hit=self.cache_hit,
+            memo=dict(self._memo),
+        )
+
+
+def timed_call(fn: Callable, *args) -> Tuple[object, float]:
+    """Return ``(fn(*args), seconds)``; picklable for process pools."""
+
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+__all__ = ["ProfileCallback", "ProfileReport", "Profiler", "StageTiming", "timed_call"]
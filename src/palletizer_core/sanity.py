@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from typing import Dict, List, Tuple
 
 from .models import Carton, Pallet
+from .spatial import TOUCH, count_components
 
 LayerLayout = List[Tuple[float, float, float, float]]
 
@@ -72,41 +73,10 @@ def is_single_carton_row(
     return single_rows / max(len(counts), 1) >= 0.6
 
 
-def _touches(
-    a: Tuple[float, float, float, float],
-    b: Tuple[float, float, float, float],
-    eps: float,
-) -> bool:
-    ax, ay, aw, ah = a
-    bx, by, bw, bh = b
-    return not (
-        ax + aw < bx - eps
-        or bx + bw < ax - eps
-        or ay + ah < by - eps
-        or by + bh < ay - eps
-    )
-
-
 def connected_components(layout: LayerLayout, touch_eps: float = 1e-6) -> int:
     if not layout:
         return 0
-    visited = set()
-    components = 0
-    for i in range(len(layout)):
-        if i in visited:
-            continue
-        components += 1
-        stack = [i]
-        visited.add(i)
-        while stack:
-            idx = stack.pop()
-            for j in range(len(layout)):
-                if j in visited:
-                    continue
-                if _touches(layout[idx], layout[j], touch_eps):
-                    visited.add(j)
-                    stack.append(j)
-    return components
+    return count_components(layout, mode=TOUCH, eps=touch_eps)
 
 
 def sanity_flags(
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Sequence, Tuple
 
 import logging
 import math
 import os
 import sys
+import time
+
+import numpy as np
 
 try:  # pragma: no cover - exercised via tests when yaml is available
     import yaml  # type: ignore
@@ -16,6 +20,7 @@ except ModuleNotFoundError:  # pragma: no cover - handled in load_weights
     yaml = None  # type: ignore
 
 from palletizer_core import algorithms
+from .batch_scoring import BatchMetrics, compute_batch_metrics, pack_layouts
 from .metrics import (
     compute_edge_buffer_metrics,
     compute_edge_buffer_score,
@@ -23,11 +28,14 @@ from .metrics import (
     compute_orientation_mix,
 )
 from .models import Carton, Pallet
+from .parallel import Job, run_jobs
+from .profiling import Profiler, timed_call
 from .pattern_families import (
     generate_block2,
     generate_block3,
     generate_block4,
     generate_hybrid,
+    memo_info,
 )
 
 logger = logging.getLogger(__name__)
@@ -47,6 +55,40 @@ RISK_STABILITY_THRESHOLD = 0.45
 RISK_SUPPORT_THRESHOLD = 0.5
 RISK_CONTACT_THRESHOLD = 0.25
 
+# Wall-clock cap (seconds) of the exact pallet-loading solver in deep search;
+# its node limit alone can take seconds on awkward carton sizes.
+PALLET_LOADING_TIME_LIMIT = 1.0
+
+# Independent annealing chains run on the best generated layout in deep
+# search; chain ``i`` uses seed ``ANNEALING_SEED + i``.
+ANNEALING_CHAINS = 2
+ANNEALING_SEED = 0
+
+# Generators that a time budget may skip or cut short, in the order they run
+# once every other (cheap) generator has been started.
+BUDGETED_GENERATORS = (
+    "dynamic",
+    "dynamic_variants",
+    "block2",
+    "block3",
+    "block4",
+    "hybrid",
+    "strip_dp",
+    "guillotine",
+    "pallet_loading",
+    "annealed",
+)
+# Generators that take the deadline and return their best result so far.
+_DEADLINE_AWARE = {
+    "pinwheel",
+    "dynamic",
+    "dynamic_variants",
+    "strip_dp",
+    "guillotine",
+    "pallet_loading",
+    "annealed",
+}
+
 
 def _fallback_parse_settings(stream) -> Dict[str, float]:
     """Parse simple ``key: value`` pairs without requiring PyYAML."""
@@ -161,6 +203,282 @@ class PatternScore:
         )
 
 
+def _generate_columns(
+    pallet_w: float, pallet_l: float, box_w: float, box_l: float
+) -> Dict[str, Pattern]:
+    patterns: Dict[str, Pattern] = {}
+    # column layout
+    _, patt = algorithms.pack_rectangles_2d(pallet_w, pallet_l, box_w, box_l)
+    patterns["column"] = patt
+
+    # rotated column layout
+    if abs(box_w - box_l) > 1e-6:
+        _, rotated = algorithms.pack_rectangles_2d(pallet_w, pallet_l, box_l, box_w)
+        patterns["column_rotated"] = rotated
+    return patterns
+
+
+def _generate_row_by_row(
+    pallet_w: float, pallet_l: float, box_w: float, box_l: float
+) -> Dict[str, Pattern]:
+    _, row_patt = algorithms.pack_rectangles_row_by_row(
+        pallet_w, pallet_l, box_w, box_l
+    )
+    return {"row_by_row": row_patt}
+
+
+def _generate_pinwheel(
+    pallet_w: float,
+    pallet_l: float,
+    box_w: float,
+    box_l: float,
+    deadline: float | None = None,
+) -> Dict[str, Pattern]:
+    _, pinwheel_patt = algorithms.pack_pinwheel(
+        pallet_w, pallet_l, box_w, box_l, deadline=deadline
+    )
+    return {"pinwheel": pinwheel_patt}
+
+
+def _generate_interlock(
+    pallet_w: float, pallet_l: float, box_w: float, box_l: float
+) -> Dict[str, Pattern]:
+    # interlock layout - use first layer of result
+    try:
+        _, _, inter = algorithms.compute_interlocked_layout(
+            pallet_w, pallet_l, box_w, box_l, num_layers=1
+        )
+        return {"interlock": inter[0] if inter else []}
+    except Exception:
+        # Gracefully handle invalid dimensions and still expose an entry
+        return {"interlock": []}
+
+
+def _generate_mixed(
+    pallet_w: float,
+    pallet_l: float,
+    box_w: float,
+    box_l: float,
+    maximize_mixed: bool,
+) -> Dict[str, Pattern]:
+    _, mixed = algorithms.pack_rectangles_mixed_greedy(
+        pallet_w, pallet_l, box_w, box_l
+    )
+    patterns: Dict[str, Pattern] = {"mixed": mixed}
+
+    # optionally maximize the mixed layout for higher density
+    if maximize_mixed:
+        _, dense = algorithms.maximize_mixed_layout(
+            pallet_w, pallet_l, box_w, box_l, 0, mixed
+        )
+        patterns["mixed_max"] = dense
+    return patterns
+
+
+def _generate_dynamic(
+    pallet_w: float,
+    pallet_l: float,
+    box_w: float,
+    box_l: float,
+    max_rects: int,
+    deadline: float | None = None,
+) -> Dict[str, Pattern]:
+    # dynamic layout using a full search
+    _, dynamic = algorithms.pack_rectangles_dynamic(
+        pallet_w, pallet_l, box_w, box_l, max_rects=max_rects, deadline=deadline
+    )
+    return {"dynamic": dynamic}
+
+
+def _generate_dynamic_variants(
+    carton: Carton,
+    pallet: Pallet,
+    max_rects: int,
+    full_variants: bool,
+    deadline: float | None = None,
+) -> Dict[str, Pattern]:
+    return algorithms.pack_rectangles_dynamic_variants(
+        carton,
+        pallet,
+        max_rects=max_rects,
+        full_variants=full_variants,
+        deadline=deadline,
+    )
+
+
+def _generate_strip_dp(
+    pallet_w: float,
+    pallet_l: float,
+    box_w: float,
+    box_l: float,
+    deadline: float | None = None,
+) -> Dict[str, Pattern]:
+    strip_layouts = algorithms.generate_strip_layouts(
+        pallet_w, pallet_l, box_w, box_l, max_variants=20, deadline=deadline
+    )
+    return {
+        f"strip_dp_{idx}": layout for idx, layout in enumerate(strip_layouts, start=1)
+    }
+
+
+def _generate_guillotine(
+    pallet_w: float,
+    pallet_l: float,
+    box_w: float,
+    box_l: float,
+    deadline: float | None = None,
+) -> Dict[str, Pattern]:
+    guillotine_layouts = algorithms.generate_guillotine_layouts(
+        pallet_w, pallet_l, box_w, box_l, max_variants=30, deadline=deadline
+    )
+    return {
+        f"guillotine_{idx}": layout
+        for idx, layout in enumerate(guillotine_layouts, start=1)
+    }
+
+
+@dataclass
+class GeneratorOutput:
+    """Patterns of a generator that can stop early, and how it ended.
+
+    Generator jobs return either a plain ``{name: pattern}`` dict or this;
+    ``note`` is a short human-readable summary such as the remaining gap.
+    """
+
+    patterns: Dict[str, Pattern]
+    complete: bool = True
+    note: str = ""
+
+
+def _unpack_output(result) -> GeneratorOutput:
+    if isinstance(result, GeneratorOutput):
+        return result
+    return GeneratorOutput(result)
+
+
+def _generate_pallet_loading(
+    pallet_w: float,
+    pallet_l: float,
+    box_w: float,
+    box_l: float,
+    time_limit: float | None = PALLET_LOADING_TIME_LIMIT,
+    deadline: float | None = None,
+) -> GeneratorOutput:
+    if deadline is not None:
+        remaining = max(0.0, deadline - time.monotonic())
+        time_limit = remaining if time_limit is None else min(time_limit, remaining)
+    result = algorithms.solve_pallet_loading(
+        pallet_w, pallet_l, box_w, box_l, time_limit=time_limit
+    )
+    note = (
+        f"count {result.count}, bound {result.upper_bound}, gap {result.gap},"
+        f" nodes {result.nodes}"
+    )
+    if not result.complete:
+        logger.info("pallet_loading stopped early: %s", note)
+    patterns = {"pallet_loading": result.layout} if result.layout else {}
+    return GeneratorOutput(patterns, result.complete, note)
+
+
+def _generate_annealed(
+    pallet_w: float,
+    pallet_l: float,
+    box_w: float,
+    box_l: float,
+    layout: Pattern,
+    seed: int,
+    deadline: float | None = None,
+) -> GeneratorOutput:
+    result = algorithms.anneal_layout(
+        pallet_w, pallet_l, box_w, box_l, layout, seed=seed, deadline=deadline
+    )
+    note = f"count {len(layout)} -> {result.count}, moves {result.iterations}"
+    return GeneratorOutput({"annealed": result.layout}, result.complete, note)
+
+
+def _run_budgeted(
+    fn, deadline: float, skippable: bool, aware: bool, *args
+) -> GeneratorOutput:
+    """Run a generator job under the ``deadline`` of a time budget.
+
+    A ``skippable`` job not started by the deadline is skipped.  An ``aware``
+    job receives the deadline as its last argument, returns what it found
+    when the deadline passes and is then reported as incomplete.
+    """
+
+    if skippable and time.monotonic() > deadline:
+        return GeneratorOutput({}, complete=False, note="skipped: time budget spent")
+    if not aware:
+        return _unpack_output(fn(*args))
+    output = _unpack_output(fn(*args, deadline))
+    if output.complete and time.monotonic() > deadline:
+        output.complete = False
+        output.note = output.note or "stopped: time budget spent"
+    return output
+
+
+def _memo_timed_call(fn, *args) -> Tuple[object, float, Dict[str, Tuple[int, int]]]:
+    """:func:`timed_call` plus the memo hits and misses seen during the call.
+
+    Counted in the process running ``fn``, so worker processes report their
+    own memo reuse.
+    """
+
+    before = memo_info()
+    result, seconds = timed_call(fn, *args)
+    memo = {
+        name: (hits - before[name][0], misses - before[name][1])
+        for name, (hits, misses) in memo_info().items()
+    }
+    return result, seconds, memo
+
+
+def _run_rank(name: str) -> int:
+    if name in BUDGETED_GENERATORS:
+        return BUDGETED_GENERATORS.index(name)
+    return -1
+
+
+def _run_outputs(
+    jobs: Sequence[Job], executor: Executor | None, profiler: Profiler | None
+) -> List[GeneratorOutput]:
+    """Run ``jobs`` cheapest first and return their outputs in job order.
+
+    Every job's wall time, pattern count and completion go to ``profiler``,
+    and so do the memo hits it saw in the process that ran it.  Jobs sharing
+    a thread pool would see each other's hits, so those are not counted.
+    """
+
+    if profiler is not None:
+        wrapper = (
+            timed_call if isinstance(executor, ThreadPoolExecutor) else _memo_timed_call
+        )
+        jobs = [(name, wrapper, (fn, *args)) for name, fn, args in jobs]
+    order = sorted(range(len(jobs)), key=lambda index: _run_rank(jobs[index][0]))
+    results: List[object] = [None] * len(jobs)
+    for index, result in zip(
+        order, run_jobs([jobs[index] for index in order], executor), strict=True
+    ):
+        results[index] = result
+    if profiler is None:
+        return [_unpack_output(result) for result in results]
+
+    outputs = []
+    for (name, _, _), (result, seconds, *memo) in zip(jobs, results, strict=True):
+        for helper, (hits, misses) in (memo[0] if memo else {}).items():
+            profiler.add_memo(helper, hits, misses)
+        output = _unpack_output(result)
+        profiler.add_generator(
+            name,
+            seconds,
+            len(output.patterns),
+            complete=output.complete,
+            note=output.note,
+        )
+        outputs.append(output)
+    return outputs
+
+
 class PatternSelector:
     """Generate → score → rank pallet patterns."""
 
@@ -211,6 +529,10 @@ class PatternSelector:
         extended_library: bool = False,
         dynamic_variants: bool = False,
         deep_search: bool = False,
+        executor: Executor | None = None,
+        profiler: Profiler | None = None,
+        solver_time_limit: float | None = PALLET_LOADING_TIME_LIMIT,
+        deadline: float | None = None,
     ) -> Dict[str, Pattern]:
         """Return raw patterns keyed by algorithm name.
 
@@ -219,101 +541,226 @@ class PatternSelector:
         maximize_mixed : bool, optional
             If ``True``, apply :func:`maximize_mixed_layout` after the greedy
             mixed layout to obtain a denser variant.
+        deep_search : bool, optional
+            Also run the strip DP, guillotine enumeration and the bounded
+            exact pallet-loading solver (``pallet_loading``), then anneal the
+            densest pattern in :data:`ANNEALING_CHAINS` seeded chains
+            (``annealed``, see :meth:`annealing_jobs`).
+        executor : concurrent.futures.Executor, optional
+            When given, the independent generators are submitted to this
+            executor (e.g. one from :func:`palletizer_core.parallel.create_executor`)
+            instead of running one after another.  The result is merged in the
+            same key order as the serial run.  The executor is not shut down.
+        profiler : Profiler, optional
+            Receives the wall time and pattern count of every generator job,
+            measured where the job runs, and whether the job completed; the
+            pallet-loading job also reports its count, bound and gap.
+        solver_time_limit : float, optional
+            Wall-clock limit in seconds of the pallet-loading solver in deep
+            search; ``None`` leaves only its node limit.
+        deadline : float, optional
+            :func:`time.monotonic` value ending the time budget.  Cheap
+            generators always run and go first; the ones in
+            :data:`BUDGETED_GENERATORS` follow in that order, are skipped once
+            the deadline has passed and the long searches among them return
+            their best result so far.  Skipped and stopped generators are
+            reported to ``profiler`` as incomplete.
         """
-        pallet_w, pallet_l, box_w, box_l = self._eff_dims()
-        patterns: Dict[str, Pattern] = {}
-
-        # column layout
-        _, patt = algorithms.pack_rectangles_2d(pallet_w, pallet_l, box_w, box_l)
-        patterns["column"] = patt
-
-        # rotated column layout
-        if abs(box_w - box_l) > 1e-6:
-            _, rotated = algorithms.pack_rectangles_2d(
-                pallet_w, pallet_l, box_l, box_w
-            )
-            patterns["column_rotated"] = rotated
-
-        # row-by-row layout
-        _, row_patt = algorithms.pack_rectangles_row_by_row(
-            pallet_w, pallet_l, box_w, box_l
+        jobs = self.generator_jobs(
+            maximize_mixed=maximize_mixed,
+            extended_library=extended_library,
+            dynamic_variants=dynamic_variants,
+            deep_search=deep_search,
+            solver_time_limit=solver_time_limit,
+            deadline=deadline,
         )
-        patterns["row_by_row"] = row_patt
-
-        # pinwheel layout
-        _, pinwheel_patt = algorithms.pack_pinwheel(
-            pallet_w, pallet_l, box_w, box_l
-        )
-        patterns["pinwheel"] = pinwheel_patt
+        patterns: Dict[str, Pattern] = {}
+        for output in _run_outputs(jobs, executor, profiler):
+            patterns.update(output.patterns)
 
-        # interlock layout - use first layer of result
-        try:
-            _, _, inter = algorithms.compute_interlocked_layout(
-                pallet_w, pallet_l, box_w, box_l, num_layers=1
+        if deep_search and patterns:
+            # Chains are merged by carton count, the lowest seed winning ties.
+            chains = _run_outputs(
+                self.annealing_jobs(patterns, deadline=deadline), executor, profiler
             )
-            patterns["interlock"] = inter[0] if inter else []
-        except Exception:
-            # Gracefully handle invalid dimensions and still expose an entry
-            patterns["interlock"] = []
+            annealed = [
+                output.patterns["annealed"]
+                for output in chains
+                if output.patterns.get("annealed")
+            ]
+            if annealed:
+                patterns["annealed"] = max(annealed, key=len)
+        return patterns
 
-        # mixed greedy
-        _, mixed = algorithms.pack_rectangles_mixed_greedy(
-            pallet_w, pallet_l, box_w, box_l
-        )
-        patterns["mixed"] = mixed
+    def annealing_jobs(
+        self,
+        patterns: Dict[str, Pattern],
+        *,
+        chains: int = ANNEALING_CHAINS,
+        deadline: float | None = None,
+    ) -> List[Job]:
+        """Return the annealing chains started from the densest of ``patterns``.
 
-        # optionally maximize the mixed layout for higher density
-        if maximize_mixed:
-            _, dense = algorithms.maximize_mixed_layout(
-                pallet_w, pallet_l, box_w, box_l, 0, mixed
+        Of equally dense patterns the first one is the seed layout, so the
+        chains, and with them the ``annealed`` pattern, are deterministic.
+        """
+        seed_layout = max(patterns.values(), key=len)
+        dims = self._eff_dims()
+        jobs: List[Job] = [
+            (
+                "annealed",
+                _generate_annealed,
+                (*dims, seed_layout, ANNEALING_SEED + chain),
             )
-            patterns["mixed_max"] = dense
-
+            for chain in range(chains)
+        ]
+        if deadline is not None:
+            jobs = [
+                (name, _run_budgeted, (fn, deadline, True, True, *args))
+                for name, fn, args in jobs
+            ]
+        return jobs
+
+    def generator_jobs(
+        self,
+        *,
+        maximize_mixed: bool = False,
+        extended_library: bool = False,
+        dynamic_variants: bool = False,
+        deep_search: bool = False,
+        solver_time_limit: float | None = PALLET_LOADING_TIME_LIMIT,
+        deadline: float | None = None,
+    ) -> List[Job]:
+        """Return the independent generator jobs used by :meth:`generate_all`.
+
+        Each job returns a ``{name: pattern}`` dict or a
+        :class:`GeneratorOutput`; merging the patterns in list order yields
+        the deterministic key order of :meth:`generate_all`.  With a
+        ``deadline`` every job runs under :func:`_run_budgeted`.
+        """
+        dims = self._eff_dims()
+        carton = self.carton
+        pallet = self.pallet
         max_rects = (
             algorithms.DEEP_MAX_RECTS if deep_search else algorithms.DEFAULT_MAX_RECTS
         )
-        # dynamic layout using a full search
-        _, dynamic = algorithms.pack_rectangles_dynamic(
-            pallet_w, pallet_l, box_w, box_l, max_rects=max_rects
-        )
-        patterns["dynamic"] = dynamic
+
+        jobs: List[Job] = [
+            ("column", _generate_columns, dims),
+            ("row_by_row", _generate_row_by_row, dims),
+            ("pinwheel", _generate_pinwheel, dims),
+            ("interlock", _generate_interlock, dims),
+            ("mixed", _generate_mixed, (*dims, maximize_mixed)),
+            ("dynamic", _generate_dynamic, (*dims, max_rects)),
+        ]
 
         if dynamic_variants or extended_library:
-            patterns.update(
-                algorithms.pack_rectangles_dynamic_variants(
-                    self.carton,
-                    self.pallet,
-                    max_rects=max_rects,
-                    full_variants=deep_search,
+            jobs.append(
+                (
+                    "dynamic_variants",
+                    _generate_dynamic_variants,
+                    (carton, pallet, max_rects, deep_search),
                 )
             )
 
         if extended_library:
-            patterns.update(generate_block2(self.carton, self.pallet))
-            patterns.update(generate_block3(self.carton, self.pallet))
-            patterns.update(generate_block4(self.carton, self.pallet))
-            patterns.update(generate_hybrid(self.carton, self.pallet))
-
-        if deep_search:
-            strip_layouts = algorithms.generate_strip_layouts(
-                pallet_w, pallet_l, box_w, box_l, max_variants=20
+            jobs.extend(
+                [
+                    ("block2", generate_block2, (carton, pallet)),
+                    ("block3", generate_block3, (carton, pallet)),
+                    ("block4", generate_block4, (carton, pallet)),
+                    ("hybrid", generate_hybrid, (carton, pallet)),
+                ]
             )
-            for idx, layout in enumerate(strip_layouts, start=1):
-                patterns[f"strip_dp_{idx}"] = layout
 
-            guillotine_layouts = algorithms.generate_guillotine_layouts(
-                pallet_w, pallet_l, box_w, box_l, max_variants=30
+        if deep_search:
+            jobs.append(("strip_dp", _generate_strip_dp, dims))
+            jobs.append(("guillotine", _generate_guillotine, dims))
+            jobs.append(
+                (
+                    "pallet_loading",
+                    _generate_pallet_loading,
+                    (*dims, solver_time_limit),
+                )
             )
-            for idx, layout in enumerate(guillotine_layouts, start=1):
-                patterns[f"guillotine_{idx}"] = layout
 
-        return patterns
+        if deadline is not None:
+            jobs = [
+                (
+                    name,
+                    _run_budgeted,
+                    (
+                        fn,
+                        deadline,
+                        name in BUDGETED_GENERATORS,
+                        name in _DEADLINE_AWARE,
+                        *args,
+                    ),
+                )
+                for name, fn, args in jobs
+            ]
+        return jobs
 
     def score(self, pattern: Pattern) -> PatternScore:
         """Weighted score; weights configurable in settings.yaml."""
+        return self.score_many([pattern])[0]
+
+    def score_many(self, patterns: Sequence[Pattern]) -> List[PatternScore]:
+        """Score all ``patterns`` in one vectorized pass.
+
+        The layouts are stacked into a ``(N, max_boxes, 4)`` array (see
+        :func:`~palletizer_core.batch_scoring.pack_layouts`) so support, edge
+        contact, clearance and orientation metrics are computed for every
+        candidate at once; the result equals scoring them one by one.
+        """
+        if not patterns:
+            return []
+        boxes, mask = pack_layouts(patterns)
+        return self.score_batch(boxes, mask, patterns)
+
+    def score_batch(
+        self,
+        boxes: np.ndarray,
+        mask: np.ndarray,
+        patterns: Sequence[Pattern] | None = None,
+    ) -> List[PatternScore]:
+        """Score layouts given as a packed array and mask.
+
+        ``patterns`` is only used to report ``weakest_carton`` as the original
+        tuple; without it the tuple is rebuilt from ``boxes``.
+        """
+        box_area = self.carton.width * self.carton.length
+        metrics = compute_batch_metrics(
+            boxes,
+            mask,
+            pallet_w=self.pallet.width,
+            pallet_l=self.pallet.length,
+            box_area=box_area,
+            buffer_norm=max(1e-6, min(self.carton.width, self.carton.length) / 2.0),
+            default_orientation=self.carton.width >= self.carton.length,
+        )
+        scores: List[PatternScore] = []
+        for idx in range(len(boxes)):
+            count = int(metrics.counts[idx])
+            if patterns is not None:
+                weakest = patterns[idx][int(metrics.weakest_index[idx])] if count else None
+            elif count:
+                weakest = tuple(float(v) for v in boxes[idx, int(metrics.weakest_index[idx])])
+            else:
+                weakest = None
+            scores.append(self._finalize_score(count, metrics, idx, weakest))
+        return scores
+
+    def _finalize_score(
+        self,
+        count: int,
+        metrics: BatchMetrics,
+        idx: int,
+        weakest_carton: Tuple[float, float, float, float] | None,
+    ) -> PatternScore:
         pallet_area = self.pallet.width * self.pallet.length
         box_area = self.carton.width * self.carton.length
-        layer_eff = len(pattern) * box_area / pallet_area
+        layer_eff = count * box_area / pallet_area
         cube_eff = layer_eff  # simplified: same as area efficiency
 
         # Stability metric combines COM, support, contact and vertical factors
@@ -325,46 +772,23 @@ class PatternSelector:
         # considers how strongly cartons interlock (edge contact), how much
         # clearance remains to the pallet rim (edge buffer) and an estimated
         # vertical slenderness penalty derived from the carton height.
-        if pattern:
-            com_x = sum(x + w / 2 for x, _, w, _ in pattern) / len(pattern)
-            com_y = sum(y + length / 2 for _, y, _, length in pattern) / len(pattern)
+        if count:
+            com_x = float(metrics.com_x[idx])
+            com_y = float(metrics.com_y[idx])
             center_x = self.pallet.width / 2
             center_y = self.pallet.length / 2
             dist = ((com_x - center_x) ** 2 + (com_y - center_y) ** 2) ** 0.5
             max_dist = max(1e-6, min(self.pallet.width, self.pallet.length) / 2)
             com_factor = max(0.0, 1 - dist / max_dist)
 
-            total_inside = 0.0
-            min_support_ratio = 1.0
-            weakest_carton: Tuple[float, float, float, float] | None = None
-            support_ratios: List[float] = []
-            for x, y, w, length in pattern:
-                overlap_w = max(0.0, min(x + w, self.pallet.width) - max(x, 0.0))
-                overlap_l = max(0.0, min(y + length, self.pallet.length) - max(y, 0.0))
-                supported_area = overlap_w * overlap_l
-                total_inside += supported_area
-                ratio = supported_area / box_area if box_area > 0 else 0.0
-                support_ratios.append(ratio)
-                if ratio < min_support_ratio:
-                    min_support_ratio = ratio
-                    weakest_carton = (x, y, w, length)
-            if not support_ratios:
-                min_support_ratio = 0.0
-            if weakest_carton is None and pattern:
-                weakest_carton = pattern[0]
-            support_fraction = total_inside / (len(pattern) * box_area)
+            min_support_ratio = float(metrics.min_support[idx])
+            support_fraction = float(metrics.total_inside[idx]) / (count * box_area)
             weakest_support_ratio = min_support_ratio
 
-            contact_fraction = self._edge_contact_fraction(pattern)
-            buffer_score, min_clearance = self._edge_buffer_metrics(pattern)
-            mix_ratio = self._orientation_mix(pattern)
-
-            contact_factor = 0.4 + 0.6 * contact_fraction
-            edge_factor = 0.6 + 0.4 * buffer_score
-
-            contact_fraction = self._edge_contact_fraction(pattern)
-            buffer_score = self._edge_buffer_score(pattern)
-            mix_ratio = self._orientation_mix(pattern)
+            contact_fraction = float(metrics.edge_contact[idx])
+            buffer_score = float(metrics.edge_buffer[idx])
+            min_clearance = float(metrics.min_edge_clearance[idx])
+            mix_ratio = float(metrics.orientation_mix[idx])
 
             contact_factor = 0.4 + 0.6 * contact_fraction
             edge_factor = 0.6 + 0.4 * buffer_score
@@ -410,7 +834,7 @@ class PatternSelector:
             risk_reasons = []
         grip_changes = 0
         score = PatternScore("", layer_eff, cube_eff, stability, grip_changes)
-        score.carton_count = len(pattern)
+        score.carton_count = count
         score.support_fraction = support_fraction
         score.min_support = min_support_ratio
         score.edge_contact = contact_fraction
@@ -432,8 +856,10 @@ class PatternSelector:
         best_name = ""
         best_pattern: Pattern = []
         best_score: PatternScore | None = None
-        for name, patt in patterns.items():
-            score = self.score(patt)
+        names = list(patterns)
+        scores = self.score_many([patterns[name] for name in names])
+        for name, score in zip(names, scores, strict=True):
+            patt = patterns[name]
             score.name = name
             if best_score is None or score.penalty < best_score.penalty:
                 best_name = name
@@ -2,12 +2,16 @@ from __future__ import annotations
 
 from typing import Iterable, List, Tuple
 
+import numpy as np
+
 from .metrics import (
     compute_edge_buffer_score,
     compute_edge_contact_fraction,
     compute_orientation_mix,
 )
 from .models import Carton, Pallet
+from .spatial import candidate_pairs
+from .support import SupportIndex
 from .support import min_support_fraction as layer_min_support
 
 EPS = 1e-6
@@ -28,6 +32,7 @@ class EvenOddSequencer:
         allow_offsets: bool = False,
         min_support: float = 0.80,
         assume_full_support: bool = False,
+        incremental: bool = True,
     ) -> None:
         self.pattern = pattern
         self.carton = carton
@@ -35,6 +40,7 @@ class EvenOddSequencer:
         self.allow_offsets = allow_offsets
         self.min_support = min_support
         self.assume_full_support = assume_full_support
+        self.incremental = incremental
 
     def _shift_pattern(self, pattern: Pattern, dx: float, dy: float) -> Pattern:
         return [(x + dx, y + dy, width, length) for x, y, width, length in pattern]
@@ -92,15 +98,18 @@ class EvenOddSequencer:
                     return False
         return True
 
-    def _score_candidate(self, candidate: Pattern, dx: float, dy: float) -> float:
-        if not candidate:
-            return -1.0
+    def _interlock(self, dx: float, dy: float) -> float:
         interlock = 0.0
         if self.carton.width > 0:
             interlock += min(1.0, abs(dx) / self.carton.width)
         if self.carton.length > 0:
             interlock += min(1.0, abs(dy) / self.carton.length)
-        interlock /= 2.0
+        return interlock / 2.0
+
+    def _score_candidate(self, candidate: Pattern, dx: float, dy: float) -> float:
+        if not candidate:
+            return -1.0
+        interlock = self._interlock(dx, dy)
 
         contact_fraction = compute_edge_contact_fraction(
             candidate, eps=EPS, clamp=False
@@ -137,9 +146,17 @@ class EvenOddSequencer:
         >>> even, odd = seq.best_shift()
         >>> odd[0][:2]
         (10.0, 0.0)
+
+        With ``incremental=True`` (the default) the shifted layers are not
+        rebuilt and re-validated one by one; see
+        :meth:`_best_shift_incremental`.  ``incremental=False`` runs the
+        original brute-force search.
         """
-        even = self.pattern
+        if self.incremental:
+            return self._best_shift_incremental()
+        return self._best_shift_legacy()
 
+    def _shift_options(self) -> Tuple[List[float], List[float], List[Pattern]]:
         # Compute free space around the base pattern.
         min_x = min(x for x, _, _, _ in self.pattern)
         max_x = max(x + w for x, _, w, _ in self.pattern)
@@ -178,11 +195,16 @@ class EvenOddSequencer:
         dx_options = list(dict.fromkeys(dx_options))
         dy_options = list(dict.fromkeys(dy_options))
 
-        candidates: List[Pattern] = [even]
+        candidates: List[Pattern] = [self.pattern]
         rotated = self._rotate_pattern(self.pattern)
         if rotated != self.pattern:
             candidates.append(rotated)
 
+        return dx_options, dy_options, candidates
+
+    def _best_shift_legacy(self) -> Tuple[Pattern, Pattern]:
+        even = self.pattern
+        dx_options, dy_options, candidates = self._shift_options()
         best = even
         best_score = -1.0
         for base_pattern in candidates:
@@ -201,3 +223,138 @@ class EvenOddSequencer:
                         best = candidate
 
         return even, best
+
+    def _best_shift_incremental(self) -> Tuple[Pattern, Pattern]:
+        """Search the same offsets as :meth:`_best_shift_legacy`, faster.
+
+        A shifted copy of a layer keeps its pairwise overlaps, contact and
+        orientation mix, so those are evaluated once per base pattern.  Bounds
+        and edge clearances split into an ``x`` part that only depends on
+        ``dx`` and a ``y`` part that only depends on ``dy``, which are
+        precomputed per offset.  Support is checked through a
+        :class:`SupportIndex` that stops at the first weak carton.  Only the
+        winning layer is materialised.
+        """
+
+        even = self.pattern
+        dx_options, dy_options, candidates = self._shift_options()
+        support_index = (
+            SupportIndex(even)
+            if self.allow_offsets and not self.assume_full_support
+            else None
+        )
+        norm = max(1.0, min(self.carton.width, self.carton.length))
+        default_orientation = self.carton.width >= self.carton.length
+        offset_scale = max(abs(d) for d in (*dx_options, *dy_options))
+
+        best = even
+        best_score = -1.0
+        for base_pattern in candidates:
+            ambiguous = self._ambiguous_pairs(base_pattern, offset_scale)
+            if ambiguous is None:
+                continue
+            xs = np.array([x for x, _, _, _ in base_pattern], dtype=float)
+            ys = np.array([y for _, y, _, _ in base_pattern], dtype=float)
+            ws = np.array([w for _, _, w, _ in base_pattern], dtype=float)
+            ls = np.array([length for _, _, _, length in base_pattern], dtype=float)
+            x_clearance = {}
+            for dx in dx_options:
+                shifted = xs + dx
+                right = shifted + ws
+                if np.any(shifted < -EPS) or np.any(right > self.pallet.width + EPS):
+                    continue
+                x_clearance[dx] = np.minimum(shifted, self.pallet.width - right)
+            y_clearance = {}
+            for dy in dy_options:
+                shifted = ys + dy
+                top = shifted + ls
+                if np.any(shifted < -EPS) or np.any(top > self.pallet.length + EPS):
+                    continue
+                y_clearance[dy] = np.minimum(shifted, self.pallet.length - top)
+            if not x_clearance or not y_clearance:
+                continue
+
+            contact_fraction = compute_edge_contact_fraction(
+                base_pattern, eps=EPS, clamp=False
+            )
+            mix_ratio = compute_orientation_mix(
+                base_pattern, default_orientation=default_orientation
+            )
+            for dx in dx_options:
+                if dx not in x_clearance:
+                    continue
+                for dy in dy_options:
+                    if dy not in y_clearance:
+                        continue
+                    if ambiguous and not self._pairs_clear(
+                        base_pattern, ambiguous, dx, dy
+                    ):
+                        continue
+                    if support_index is not None and not support_index.meets_support(
+                        self._shift_pattern(base_pattern, dx, dy), self.min_support
+                    ):
+                        continue
+                    clearance = np.minimum(x_clearance[dx], y_clearance[dy])
+                    # Sequential running sum, as in compute_edge_buffer_metrics.
+                    acc = np.cumsum(np.clip(clearance / norm, 0.0, 1.0))[-1]
+                    edge_buffer = float(acc) / len(base_pattern)
+                    score = (
+                        0.4 * self._interlock(dx, dy)
+                        + 0.3 * contact_fraction
+                        + 0.2 * edge_buffer
+                        + 0.1 * mix_ratio
+                    )
+                    if score > best_score + EPS:
+                        best_score = score
+                        best = self._shift_pattern(base_pattern, dx, dy)
+
+        return even, best
+
+    @staticmethod
+    def _ambiguous_pairs(
+        pattern: Pattern, offset_scale: float
+    ) -> List[Tuple[int, int]] | None:
+        """Classify the pairwise overlap test of :meth:`_is_valid` for shifts.
+
+        Returns ``None`` when some pair overlaps for every shift, otherwise
+        the pairs whose separation lies so close to ``EPS`` that rounding of
+        the shifted coordinates could change the outcome; those are
+        re-checked per offset.
+        """
+
+        scale = 1.0 + offset_scale + max(
+            max(abs(x), abs(y), abs(x + w), abs(y + length))
+            for x, y, w, length in pattern
+        )
+        delta = 1e-9 * scale
+        ambiguous: List[Tuple[int, int]] = []
+        for i, j in candidate_pairs(pattern, margin=EPS):
+            ax, ay, aw, al = pattern[i]
+            bx, by, bw, bl = pattern[j]
+            separation = max(
+                bx - (ax + aw), ax - (bx + bw), by - (ay + al), ay - (by + bl)
+            )
+            if separation >= -EPS + delta:
+                continue
+            if separation < -EPS - delta:
+                return None
+            ambiguous.append((i, j))
+        return ambiguous
+
+    @staticmethod
+    def _pairs_clear(
+        pattern: Pattern, pairs: List[Tuple[int, int]], dx: float, dy: float
+    ) -> bool:
+        for i, j in pairs:
+            x, y, w, length = pattern[i]
+            ax, ay, aw, al = x + dx, y + dy, w, length
+            x, y, w, length = pattern[j]
+            bx, by, bw, bl = x + dx, y + dy, w, length
+            if not (
+                ax + aw <= bx + EPS
+                or bx + bw <= ax + EPS
+                or ay + al <= by + EPS
+                or by + bl <= ay + EPS
+            ):
+                return False
+        return True
@@ -1,27 +1,139 @@
 from __future__ import annotations
 
+import hashlib
+from array import array
+from functools import total_ordering
 from typing import List, Tuple
 
 LayerLayout = List[Tuple[float, float, float, float]]
 
+# Quantised carton: (x, y, w, length) in multiples of ``eps``.
+Cell = Tuple[int, int, int, int]
 
-def canonicalize(layout: LayerLayout, eps: float = 1e-6) -> LayerLayout:
-    if not layout:
-        return []
+
+def _sort_key(cell: Cell) -> Tuple[int, int, int, int]:
+    x, y, w, length = cell
+    return (y, x, length, w)
+
+
+def _quantize(layout: LayerLayout, eps: float) -> List[Cell]:
     min_x = min(x for x, _, _, _ in layout)
     min_y = min(y for _, y, _, _ in layout)
-    canonical = []
-    for x, y, w, length in layout:
-        canonical.append(
-            (
-                round((x - min_x) / eps) * eps,
-                round((y - min_y) / eps) * eps,
-                round(w / eps) * eps,
-                round(length / eps) * eps,
-            )
+    return [
+        (
+            round((x - min_x) / eps),
+            round((y - min_y) / eps),
+            round(w / eps),
+            round(length / eps),
         )
-    return sorted(canonical, key=lambda item: (item[1], item[0], item[3], item[2]))
+        for x, y, w, length in layout
+    ]
+
+
+def _mirrors(cells: List[Cell]) -> List[List[Cell]]:
+    """Return ``cells`` under the four pallet symmetries.
+
+    Mirroring about the pallet and re-anchoring at the layout's corner is the
+    same as mirroring about the layout's bounding box, so the pallet size is
+    not needed.
+    """
+
+    right = max(x + w for x, _, w, _ in cells)
+    top = max(y + length for _, y, _, length in cells)
+    flip_x = [(right - x - w, y, w, length) for x, y, w, length in cells]
+    flip_y = [(x, top - y - length, w, length) for x, y, w, length in cells]
+    rotated = [
+        (right - x - w, top - y - length, w, length) for x, y, w, length in cells
+    ]
+    return [cells, flip_x, flip_y, rotated]
+
+
+@total_ordering
+class Signature:
+    """Canonical, hashable form of a layer layout.
+
+    Coordinates are stored as integer multiples of ``eps`` relative to the
+    layout's lower-left corner, sorted by row.  A 128-bit digest is computed
+    once; equality checks the digest before the full data and the hash is
+    taken from the digest, so signatures are cheap dictionary keys.
+    ``str()`` gives the same text as the former tuple signatures, which
+    manual pick orders are stored under.
+    """
+
+    __slots__ = ("cells", "eps", "digest", "_hash")
+
+    def __init__(self, cells: Tuple[Cell, ...], eps: float) -> None:
+        self.cells = cells
+        self.eps = eps
+        flat = array("q", [value for cell in cells for value in cell])
+        self.digest = hashlib.blake2b(flat.tobytes(), digest_size=16).digest()
+        self._hash = int.from_bytes(self.digest[:8], "little", signed=True)
+
+    def __getstate__(self):
+        return (self.cells, self.eps)
+
+    def __setstate__(self, state) -> None:
+        self.__init__(*state)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Signature):
+            return NotImplemented
+        return (
+            self.digest == other.digest
+            and self.eps == other.eps
+            and self.cells == other.cells
+        )
+
+    def __lt__(self, other: object) -> bool:
+        if not isinstance(other, Signature):
+            return NotImplemented
+        return (self.cells, self.eps) < (other.cells, other.eps)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def as_tuple(self) -> tuple:
+        """The layout in canonical order with coordinates in millimetres."""
+
+        eps = self.eps
+        return tuple(
+            (x * eps, y * eps, w * eps, length * eps) for x, y, w, length in self.cells
+        )
+
+    def __str__(self) -> str:
+        return str(self.as_tuple())
+
+    def __repr__(self) -> str:
+        return f"Signature({len(self.cells)} cartons, {self.digest.hex()})"
+
+
+def canonicalize(layout: LayerLayout, eps: float = 1e-6) -> LayerLayout:
+    if not layout:
+        return []
+    return list(layout_signature(layout, eps=eps).as_tuple())
+
+
+def layout_signature(
+    layout: LayerLayout, eps: float = 1e-6, *, symmetric: bool = False
+) -> Signature:
+    """Return the :class:`Signature` of ``layout`` quantised to ``eps``.
+
+    With ``symmetric=True`` the smallest signature over the pallet mirrors
+    and the 180° rotation is returned, so mirrored copies of a layout share
+    one signature.
+    """
+
+    if not layout:
+        return Signature((), eps)
+    cells = _quantize(layout, eps)
+    if not symmetric:
+        return Signature(tuple(sorted(cells, key=_sort_key)), eps)
+    return Signature(
+        min(tuple(sorted(variant, key=_sort_key)) for variant in _mirrors(cells)), eps
+    )
 
 
-def layout_signature(layout: LayerLayout, eps: float = 1e-6) -> tuple:
-    return tuple(canonicalize(layout, eps=eps))
+__all__ = ["Signature", "canonicalize", "layout_signature"]
@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass, field, replace
 from typing import Iterable, Literal
 
+from .signature import Signature
+
 LayerLayout = list[tuple[float, float, float, float]]
 
 SolutionKind = Literal["standard", "extra"]
@@ -40,7 +42,7 @@ class Solution:
     kind: SolutionKind
     layout: LayerLayout
     metrics: dict[str, float]
-    signature: tuple
+    signature: Signature
 
 
 @dataclass
@@ -118,7 +120,7 @@ def build_solution_catalog(
 ) -> SolutionCatalog:
     order_list = list(standard_order)
     order_index = {key: idx for idx, key in enumerate(order_list)}
-    signature_groups: dict[tuple, list[Solution]] = {}
+    signature_groups: dict[Signature, list[Solution]] = {}
     for solution in candidates:
         signature_groups.setdefault(solution.signature, []).append(solution)
 
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterator, List, Tuple
+
+LayerLayout = List[Tuple[float, float, float, float]]
+Rect = Tuple[float, float, float, float]
+
+TOUCH = "touch"
+OVERLAP = "overlap"
+
+# Rectangles covering more grid cells than this are paired with every other
+# rectangle directly instead of being rasterised into the grid.
+_MAX_CELLS_PER_RECT = 64
+
+
+def boxes_touch(a: Rect, b: Rect, eps: float = 1e-6) -> bool:
+    """Return ``True`` when ``a`` and ``b`` overlap or lie within ``eps``."""
+
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return not (
+        ax + aw < bx - eps
+        or bx + bw < ax - eps
+        or ay + ah < by - eps
+        or by + bh < ay - eps
+    )
+
+
+def boxes_overlap(a: Rect, b: Rect) -> bool:
+    """Return ``True`` when the interiors of ``a`` and ``b`` intersect."""
+
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return not (ax + aw <= bx or bx + bw <= ax or ay + ah <= by or by + bh <= ay)
+
+
+class DisjointSet:
+    """Union-find over ``0..size-1`` with path halving and union by size."""
+
+    def __init__(self, size: int) -> None:
+        self.parent = list(range(size))
+        self.size = [1] * size
+        self.count = size
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> bool:
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        self.count -= 1
+        return True
+
+    def groups(self) -> List[List[int]]:
+        """Return the members of every set, ordered by their lowest index."""
+
+        by_root: Dict[int, List[int]] = {}
+        for item in range(len(self.parent)):
+            by_root.setdefault(self.find(item), []).append(item)
+        return list(by_root.values())
+
+
+def _cell_size(layout: LayerLayout, margin: float) -> float:
+    spans = sorted(
+        max(abs(w), abs(h))
+        for _, _, w, h in layout
+        if math.isfinite(w) and math.isfinite(h)
+    )
+    if not spans:
+        return 1.0
+    cell = spans[len(spans) // 2] + 2.0 * margin
+    return cell if cell > 0 else 1.0
+
+
+def candidate_pairs(
+    layout: LayerLayout, margin: float = 0.0
+) -> Iterator[Tuple[int, int]]:
+    """Yield each index pair ``(i, j)``, ``i < j``, that may lie within ``margin``.
+
+    Rectangles are grown by ``margin`` and binned into a uniform grid whose
+    cell is the median carton size, so every pair whose grown boxes meet is
+    reported exactly once while distant cartons are never compared.
+    """
+
+    margin = max(margin, 0.0)
+    cell = _cell_size(layout, margin)
+    grid: Dict[Tuple[int, int], List[int]] = {}
+    oversized: List[int] = []
+    for i, (x, y, w, h) in enumerate(layout):
+        try:
+            col0 = math.floor((x - margin) / cell)
+            col1 = math.floor(((x + w) + margin) / cell)
+            row0 = math.floor((y - margin) / cell)
+            row1 = math.floor(((y + h) + margin) / cell)
+        except (OverflowError, ValueError):
+            oversized.append(i)
+            continue
+        if (col1 - col0 + 1) * (row1 - row0 + 1) > _MAX_CELLS_PER_RECT:
+            oversized.append(i)
+            continue
+        seen = set()
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                bucket = grid.setdefault((col, row), [])
+                for j in bucket:
+                    if j not in seen:
+                        seen.add(j)
+                        yield j, i
+                bucket.append(i)
+    if oversized:
+        large = set(oversized)
+        for i in oversized:
+            for j in range(len(layout)):
+                if j != i and (j not in large or j < i):
+                    yield (i, j) if i < j else (j, i)
+
+
+def _linked(mode: str, eps: float):
+    if mode == TOUCH:
+        return (lambda a, b: boxes_touch(a, b, eps)), eps
+    if mode == OVERLAP:
+        return boxes_overlap, 0.0
+    raise ValueError(f"Unknown connectivity mode: {mode!r}")
+
+
+def connected_groups(
+    layout: LayerLayout, *, mode: str = TOUCH, eps: float = 1e-6
+) -> List[List[int]]:
+    """Return index groups of cartons connected through ``mode`` contacts.
+
+    ``mode`` is :data:`TOUCH` (overlapping or within ``eps``) or
+    :data:`OVERLAP` (interiors intersect; shared edges do not connect).
+    Groups and their members are listed in ascending index order.
+    """
+
+    linked, margin = _linked(mode, eps)
+    components = DisjointSet(len(layout))
+    for i, j in candidate_pairs(layout, margin):
+        if components.find(i) != components.find(j) and linked(layout[i], layout[j]):
+            components.union(i, j)
+    return components.groups()
+
+
+def count_components(
+    layout: LayerLayout, *, mode: str = TOUCH, eps: float = 1e-6
+) -> int:
+    """Return the number of groups :func:`connected_groups` would report."""
+
+    linked, margin = _linked(mode, eps)
+    components = DisjointSet(len(layout))
+    for i, j in candidate_pairs(layout, margin):
+        if components.count == 1:
+            break
+        if components.find(i) != components.find(j) and linked(layout[i], layout[j]):
+            components.union(i, j)
+    return components.count
+
+
+__all__ = [
+    "OVERLAP",
+    "TOUCH",
+    "DisjointSet",
+    "boxes_overlap",
+    "boxes_touch",
+    "candidate_pairs",
+    "connected_groups",
+    "count_components",
+]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
 from typing import List, Tuple
 
 LayerLayout = List[Tuple[float, float, float, float]]
@@ -42,3 +43,48 @@ def min_support_fraction(layer_above: LayerLayout, layer_below: LayerLayout) ->
 def avg_support_fraction(layer_above: LayerLayout, layer_below: LayerLayout) -> float:
     support_values = support_fraction_per_box(layer_above, layer_below)
     return sum(support_values) / len(support_values) if support_values else 0.0
+
+
+class SupportIndex:
+    """Layer below sorted by ``x`` for repeated support queries.
+
+    :meth:`support_fraction` only visits rectangles whose ``x`` extent can
+    reach the queried box, and sums their overlaps in the original layer
+    order, so it returns exactly what :func:`support_fraction_per_box`
+    computes for that box.
+    """
+
+    def __init__(self, layer_below: LayerLayout) -> None:
+        self.layer_below = layer_below
+        self._order = sorted(range(len(layer_below)), key=lambda j: layer_below[j][0])
+        self._xs = [layer_below[j][0] for j in self._order]
+        self._reach = max((max(0.0, w) for _, _, w, _ in layer_below), default=0.0)
+
+    def support_fraction(self, box: Tuple[float, float, float, float]) -> float:
+        area = rect_area(box)
+        if area <= 0:
+            return 0.0
+        x, _, w, _ = box
+        slack = 1e-9 * (abs(x) + abs(w) + self._reach + 1.0)
+        lo = bisect_left(self._xs, x - self._reach - slack)
+        hi = bisect_right(self._xs, x + w + slack)
+        below = self.layer_below
+        supported_area = sum(
+            rect_intersection_area(box, below[j]) for j in sorted(self._order[lo:hi])
+        )
+        return min(1.0, supported_area / area)
+
+    def min_support_fraction(self, layer_above: LayerLayout) -> float:
+        values = [self.support_fraction(box) for box in layer_above]
+        return min(values) if values else 0.0
+
+    def meets_support(self, layer_above: LayerLayout, threshold: float) -> bool:
+        """Return ``min_support_fraction(layer_above) >= threshold``, stopping
+        at the first box that falls short."""
+
+        if not layer_above:
+            return 0.0 >= threshold
+        for box in layer_above:
+            if self.support_fraction(box) < threshold:
+                return False
+        return True
@@ -0,0 +1,107 @@
+"""Symmetries of the pallet rectangle.
+
+The pallet has the four symmetries of the Klein group D2: the identity, the
+mirrors along the long and the short side and the 180° rotation.  They are
+named like the layer transformations of
+:func:`~palletizer_core.transformations.apply_transformation`, and a layout
+mirrored by any of them holds the same cartons with the same support, edge
+contact and clearances, so only one layout per symmetry class needs to be
+generated or scored.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+LayerLayout = List[Tuple[float, float, float, float]]
+Rect = Tuple[float, float, float, float]
+
+IDENTITY = "Brak"
+PALLET_SYMMETRIES = (
+    IDENTITY,
+    "Odbicie wzdłuż dłuższego boku",
+    "Odbicie wzdłuż krótszego boku",
+    "Obrót 180°",
+)
+
+
+def symmetry_flips(
+    transform: str, pallet_w: float, pallet_l: float
+) -> Tuple[bool, bool]:
+    """Return whether ``transform`` mirrors the x and the y coordinate."""
+
+    if transform == IDENTITY:
+        return False, False
+    if transform == "Obrót 180°":
+        return True, True
+    long_x = pallet_w >= pallet_l
+    if transform == "Odbicie wzdłuż dłuższego boku":
+        return long_x, not long_x
+    if transform == "Odbicie wzdłuż krótszego boku":
+        return not long_x, long_x
+    raise ValueError(f"unknown pallet symmetry: {transform!r}")
+
+
+def transform_rect(
+    rect: Rect, transform: str, pallet_w: float, pallet_l: float
+) -> Rect:
+    """``rect`` mapped by ``transform``; same as ``apply_transformation``."""
+
+    flip_x, flip_y = symmetry_flips(transform, pallet_w, pallet_l)
+    x, y, w, length = rect
+    return (
+        pallet_w - x - w if flip_x else x,
+        pallet_l - y - length if flip_y else y,
+        w,
+        length,
+    )
+
+
+def symmetric_images(
+    layout: Sequence[Rect], pallet_w: float, pallet_l: float
+) -> Iterator[Tuple[str, LayerLayout]]:
+    """Yield ``(transform, image)`` for the non-identity symmetries, lazily."""
+
+    for transform in PALLET_SYMMETRIES[1:]:
+        yield transform, [
+            transform_rect(rect, transform, pallet_w, pallet_l) for rect in layout
+        ]
+
+
+def _cells(layout: Sequence[Rect], eps: float) -> frozenset:
+    return frozenset(tuple(round(value / eps) for value in rect) for rect in layout)
+
+
+def find_symmetry(
+    source: Sequence[Rect],
+    target: Sequence[Rect],
+    pallet_w: float,
+    pallet_l: float,
+    eps: float = 1e-6,
+) -> Optional[str]:
+    """Return the first symmetry mapping ``source`` onto ``target``, if any.
+
+    Layouts are compared as sets of cartons quantised to ``eps``, in place:
+    a translated copy is not a symmetric twin.
+    """
+
+    if len(source) != len(target):
+        return None
+    wanted = _cells(target, eps)
+    if len(wanted) != len(target):
+        return None
+    for transform in PALLET_SYMMETRIES:
+        image = [transform_rect(rect, transform, pallet_w, pallet_l) for rect in source]
+        if _cells(image, eps) == wanted:
+            return transform
+    return None
+
+
+__all__ = [
+    "IDENTITY",
+    "PALLET_SYMMETRIES",
+    "find_symmetry",
+    "symmetric_images",
+    "symmetry_flips",
+    "transform_rect",
+]
@@ -2,38 +2,21 @@ from __future__ import annotations
 
 from typing import List, Tuple
 
+from .layer_array import AnyLayout, LayerArray, as_layer_array, like_input
+from .symmetry import symmetry_flips
 
 LayerLayout = List[Tuple[float, float, float, float]]
 
 
 def apply_transformation(
-    positions: LayerLayout, transform: str, pallet_w: float, pallet_l: float
-) -> LayerLayout:
-    new_positions: LayerLayout = []
-    for x, y, w, h in positions:
-        if transform == "Brak":
-            new_positions.append((x, y, w, h))
-        elif transform == "Odbicie wzdłuż dłuższego boku":
-            if pallet_w >= pallet_l:
-                new_x = pallet_w - x - w
-                new_y = y
-            else:
-                new_x = x
-                new_y = pallet_l - y - h
-            new_positions.append((new_x, new_y, w, h))
-        elif transform == "Odbicie wzdłuż krótszego boku":
-            if pallet_w < pallet_l:
-                new_x = pallet_w - x - w
-                new_y = y
-            else:
-                new_x = x
-                new_y = pallet_l - y - h
-            new_positions.append((new_x, new_y, w, h))
-        elif transform == "Obrót 180°":
-            new_x = pallet_w - x - w
-            new_y = pallet_l - y - h
-            new_positions.append((new_x, new_y, w, h))
-    return new_positions
+    positions: AnyLayout, transform: str, pallet_w: float, pallet_l: float
+) -> AnyLayout:
+    try:
+        flip_x, flip_y = symmetry_flips(transform, pallet_w, pallet_l)
+    except ValueError:
+        return like_input(positions, LayerArray.from_layout([]))
+    layer = as_layer_array(positions).mirror(flip_x, flip_y, pallet_w, pallet_l)
+    return like_input(positions, layer)
 
 
 def inverse_transformation(
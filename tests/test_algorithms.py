@@ -1,9 +1,16 @@
 from packing_app.core.algorithms import (
+    count_circle_layouts,
+    materialize_mixed_greedy,
     maximize_mixed_layout,
+    mixed_greedy_plan,
+    pack_circles_grid_bottomleft,
+    pack_hex_bottom_up,
+    pack_hex_top_down,
     pack_pinwheel,
     compute_interlocked_layout,
     pack_rectangles_mixed_max,
     pack_rectangles_dynamic,
+    pack_rectangles_mixed_greedy,
 )
 
 
@@ -127,6 +134,17 @@ def test_pack_rectangles_mixed_max_mixed_orientations():
             assert not _overlap(pos, other)
 
 
+def test_pack_rectangles_mixed_max_budgets_keep_a_valid_layout():
+    full_count, _ = pack_rectangles_mixed_max(1200, 800, 130, 90, max_nodes=10**6)
+    assert full_count == 78
+    for options in ({"max_nodes": 1}, {"time_limit": 0.0}):
+        count, positions = pack_rectangles_mixed_max(1200, 800, 130, 90, **options)
+        assert count == len(positions) <= full_count
+        for i, pos in enumerate(positions):
+            assert pos[0] + pos[2] <= 1200 and pos[1] + pos[3] <= 800
+            assert not any(_overlap(pos, other) for other in positions[i + 1 :])
+
+
 def test_pack_rectangles_dynamic_no_collisions():
     pallet_w, pallet_l = 1000, 800
     box_w, box_l = 250, 150
@@ -140,3 +158,31 @@ def test_pack_rectangles_dynamic_no_collisions():
         for other in positions[i + 1 :]:
             assert not _overlap(pos, other)
 
+
+
+def test_mixed_greedy_plan_counts_without_positions():
+    count, plan = mixed_greedy_plan(1200, 800, 250, 160, margin=10)
+    positions = materialize_mixed_greedy(plan)
+
+    assert (count, positions) == pack_rectangles_mixed_greedy(1200, 800, 250, 160, 10)
+    assert count == len(positions) > 0
+    for i, a in enumerate(positions):
+        assert a[0] + a[2] <= 1190 and a[1] + a[3] <= 790
+        assert not any(_overlap(a, b) for b in positions[i + 1 :])
+    assert mixed_greedy_plan(100, 100, 150, 120) == (0, None)
+    assert materialize_mixed_greedy(None) == []
+
+
+def test_count_circle_layouts_matches_materialised_centres():
+    widths, lengths = [230, 1000, 400, 90], [400, 1000, 300, 500]
+    grid, hex_count, hex_rev = count_circle_layouts(widths, lengths, 100, margin=0)
+
+    for i, (width, length) in enumerate(zip(widths, lengths)):
+        assert grid[i] == len(pack_circles_grid_bottomleft(width, length, 100))
+        assert hex_count[i] == len(pack_hex_top_down(width, length, 100))
+        assert hex_rev[i] == len(pack_hex_bottom_up(length, width, 100))
+    # The half-diameter shift leaves a 230 mm carton two short; shifting by
+    # the 30 mm slack keeps every row at two circles.
+    assert hex_count[0] == 8
+    assert (grid[1], hex_count[1]) == (100, 105)
+    assert hex_count[3] == 0
@@ -0,0 +1,57 @@
+import time
+
+from palletizer_core.algorithms import anneal_layout, pack_rectangles_dynamic
+from palletizer_core.algorithms.annealing import _decode, _sequence_pair
+from palletizer_core.models import Carton, Pallet
+from palletizer_core.selector import PatternSelector
+
+
+def _assert_layout_valid(layout, pallet_w, pallet_l):
+    for i, (ax, ay, aw, al) in enumerate(layout):
+        assert ax >= 0 and ay >= 0
+        assert ax + aw <= pallet_w + 1e-6 and ay + al <= pallet_l + 1e-6
+        for bx, by, bw, bl in layout[i + 1 :]:
+            assert not (ax < bx + bw and bx < ax + aw and ay < by + bl and by < ay + al)
+
+
+def test_sequence_pair_never_moves_cartons_right_or_up():
+    _, layout = pack_rectangles_dynamic(1200, 800, 230, 170)
+    boxes = [tuple(int(v) for v in box) for box in layout]
+    positive, negative = _sequence_pair(boxes)
+    xs, ys = _decode(
+        positive, negative, [box[2] for box in boxes], [box[3] for box in boxes]
+    )
+    for (x, y, _, _), new_x, new_y in zip(boxes, xs, ys):
+        assert new_x <= x and new_y <= y
+
+
+def test_annealing_fits_one_more_carton_deterministically():
+    _, seed_layout = pack_rectangles_dynamic(1140, 1140, 300, 200)
+    first = anneal_layout(1140, 1140, 300, 200, seed_layout, seed=0)
+    second = anneal_layout(1140, 1140, 300, 200, seed_layout, seed=0)
+
+    assert len(seed_layout) == 18
+    assert first.count == 19
+    assert first.layout == second.layout
+    _assert_layout_valid(first.layout, 1140, 1140)
+
+
+def test_annealing_past_deadline_keeps_the_seed():
+    _, seed_layout = pack_rectangles_dynamic(1200, 800, 200, 150)
+    result = anneal_layout(
+        1200, 800, 200, 150, seed_layout, deadline=time.monotonic() - 1
+    )
+
+    assert not result.complete
+    assert result.iterations == 0
+    assert result.count == len(seed_layout)
+
+
+def test_deep_search_registers_annealed_pattern():
+    selector = PatternSelector(Carton(300, 200, 100), Pallet(1140, 1140, 1500))
+    patterns = selector.generate_all(deep_search=True)
+
+    assert len(patterns["annealed"]) >= max(
+        len(pattern) for name, pattern in patterns.items() if name != "annealed"
+    )
+    _assert_layout_valid(patterns["annealed"], 1140, 1140)
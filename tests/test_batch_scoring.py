@@ -0,0 +1,72 @@
+import numpy as np
+
+from palletizer_core.batch_scoring import pack_layouts
+from palletizer_core.metrics import (
+    compute_edge_buffer_metrics,
+    compute_edge_contact_fraction,
+    compute_orientation_mix,
+)
+from palletizer_core.models import Carton, Pallet
+from palletizer_core.selector import PatternSelector
+
+
+def test_pack_layouts_pads_and_masks():
+    boxes, mask = pack_layouts([[(0, 0, 10, 20)], [], [(1, 2, 3, 4), (5, 6, 7, 8)]])
+
+    assert boxes.shape == (3, 2, 4)
+    assert mask.tolist() == [[True, False], [False, False], [True, True]]
+    assert boxes[2, 1].tolist() == [5, 6, 7, 8]
+
+
+def test_score_many_matches_scalar_metrics():
+    carton = Carton(200, 150, 120)
+    pallet = Pallet(1200, 800)
+    selector = PatternSelector(carton, pallet)
+    patterns = list(selector.generate_all(extended_library=True).values())
+    patterns.append([(x - 30.0, y + 12.5, w, length) for x, y, w, length in patterns[0]])
+
+    scores = selector.score_many(patterns)
+
+    norm = min(carton.width, carton.length) / 2.0
+    for pattern, score in zip(patterns, scores, strict=True):
+        assert score.carton_count == len(pattern)
+        if not pattern:
+            continue
+        buffer_score, min_clearance = compute_edge_buffer_metrics(
+            pattern, pallet.width, pallet.length, norm
+        )
+        assert score.edge_contact == compute_edge_contact_fraction(pattern)
+        assert score.edge_buffer == buffer_score
+        assert score.min_edge_clearance == min_clearance
+        assert score.orientation_mix == compute_orientation_mix(
+            pattern, default_orientation=True
+        )
+
+
+def test_score_many_equals_individual_scores():
+    selector = PatternSelector(Carton(300, 200), Pallet(1200, 1000))
+    patterns = [
+        [(0, 0, 300, 200), (300, 0, 300, 200)],
+        [],
+        [(1000, 900, 300, 200)],
+    ]
+
+    batch = selector.score_many(patterns)
+    single = [selector.score(pattern) for pattern in patterns]
+
+    assert batch == single
+    assert batch[1].stability == 0.0
+    assert batch[2].weakest_carton == (1000, 900, 300, 200)
+    assert batch[2].instability_risk
+
+
+def test_score_batch_accepts_packed_arrays():
+    selector = PatternSelector(Carton(100, 100), Pallet(300, 300))
+    patterns = [[(0, 0, 100, 100), (100, 0, 100, 100)], [(350, 0, 100, 100)]]
+    boxes, mask = pack_layouts(patterns)
+
+    scores = selector.score_batch(boxes, mask)
+
+    assert [score.carton_count for score in scores] == [2, 1]
+    assert scores[1].weakest_carton == (350.0, 0.0, 100.0, 100.0)
+    assert np.isclose(scores[1].min_support, 0.0)
@@ -0,0 +1,55 @@
+import importlib.util
+from pathlib import Path
+
+RUNNER = Path(__file__).resolve().parents[1] / "benchmarks" / "run_benchmarks.py"
+
+
+def _load_runner():
+    spec = importlib.util.spec_from_file_location("run_benchmarks", RUNNER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_corpus_covers_catalogue_and_synthetic_cases():
+    runner = _load_runner()
+    cases = runner.load_corpus()
+    names = [case["name"] for case in cases]
+    assert len(names) == len(set(names))
+    assert len(cases) == (
+        len(runner.load_cartons()) * len(runner.load_pallets())
+        + len(runner.SYNTHETIC_CASES)
+    )
+
+
+def test_run_case_records_stages_and_compares():
+    runner = _load_runner()
+    case = {"name": "EUR1/test", "pallet": [1200, 800, 144], "carton": [400, 300, 200]}
+    record = runner.run_case(case, "default", memory=False)
+    assert set(record["stages"]) == {"generators", "scorer", "sequencer", "pipeline"}
+    assert record["cartons"] == 8
+    counts = [
+        count
+        for entry in record["generators"].values()
+        for count in entry["cartons"].values()
+    ]
+    assert max(counts) == record["max_cartons"] == 8
+
+    report = {"summary": runner.summarize([record]), "results": [record]}
+    worse = dict(record, cartons=7)
+    baseline = {"summary": runner.summarize([worse]), "results": [worse]}
+    lines = runner.compare(report, baseline)
+    assert lines[0].startswith("default: pipeline")
+    assert "cartons 7 -> 8" in lines[-1]
+
+
+def test_run_case_handles_extended_and_deep_search_jobs():
+    runner = _load_runner()
+    case = {"name": "EUR1/test", "pallet": [1200, 800, 144], "carton": [400, 300, 200]}
+    for mode in ("extended_library", "deep_search"):
+        record = runner.run_case(case, mode, memory=False)
+        assert record["mode"] == mode
+        assert record["cartons"] == 8
+        for entry in record["generators"].values():
+            assert {"seconds", "cartons", "complete", "note"} <= set(entry)
+    assert "pallet_loading" in record["generators"]
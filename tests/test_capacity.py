@@ -0,0 +1,30 @@
+import random
+
+from palletizer_core.algorithms import CapacityTable, capacity_table
+
+
+def test_counts_match_direct_expressions():
+    rng = random.Random(3)
+    for _ in range(50):
+        box_w, box_l = rng.uniform(50, 400), rng.uniform(50, 400)
+        table = CapacityTable(box_w, box_l, 1200, 800)
+        for _ in range(20):
+            w, l_ = rng.uniform(0, 1200), rng.uniform(0, 800)
+            assert table.fit(w, box_w) == int(w // box_w)
+            assert table.count(w, l_) == int(w // box_w) * int(l_ // box_l)
+            assert table.count(w, l_, True) == int(w // box_l) * int(l_ // box_w)
+
+
+def test_block_materialises_grid():
+    table = CapacityTable(300, 200, 1200, 800)
+    block = table.block(100, 50, 650, 450, rotated=True)
+    assert block == [
+        (100 + c * 200, 50 + r * 300, 200, 300) for r in range(1) for c in range(3)
+    ]
+    assert table.block(0, 0, 250, 800) == []
+    assert table.best(1200, 800) == (16, False)
+    assert table.fit(100, 0) == 0
+
+
+def test_capacity_table_is_shared():
+    assert capacity_table(300, 200, 1200, 800) is capacity_table(300, 200, 1200, 800)
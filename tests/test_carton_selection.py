@@ -1,4 +1,12 @@
-from packing_app.core.carton_selection import best_product_fit, rank_cartons
+from packing_app.core.carton_selection import (
+    best_product_fit,
+    cartons_per_layer,
+    iter_rank_cartons,
+    layer_count_bounds,
+    rank_cartons,
+)
+from palletizer_core.engine import PalletInputs
+from palletizer_core.parallel import InlineExecutor
 from packing_app.core.test_card import build_packaging_test_card
 
 
@@ -15,6 +23,40 @@ def test_rank_cartons_sorts_by_products_per_pallet():
     assert results[0].status
 
 
+CARTONS = {
+    "A": (200, 200, 100),
+    "B": (400, 400, 200),
+    "C": (300, 200, 150),
+    "D": (95, 61, 80),
+    "E": (250, 180, 120),
+    "F": (610, 410, 300),
+    "tiny": (50, 50, 20),
+}
+PALLETS = [{"w": 1200, "l": 800, "h": 144, "weight": 20}]
+
+
+def test_layer_count_bounds_bracket_pipeline():
+    for dims in CARTONS.values():
+        inputs = PalletInputs(1200, 800, 144, *dims, 3, 0, 0, 4, 1600, True)
+        lower, upper = layer_count_bounds(inputs)
+        assert lower <= cartons_per_layer(inputs) <= upper
+
+
+def test_top_n_ranking_matches_full_ranking():
+    full = rank_cartons(CARTONS, PALLETS, product_dims=(45, 45, 18))
+    assert len(full) == len(CARTONS)
+    for top_n in (1, 3):
+        assert rank_cartons(CARTONS, PALLETS, product_dims=(45, 45, 18), top_n=top_n) == full[:top_n]
+    assert rank_cartons(CARTONS, PALLETS, product_dims=(45, 45, 18), top_n=3, executor=InlineExecutor()) == full[:3]
+
+
+def test_iter_rank_cartons_prunes_below_top_n():
+    streamed = list(iter_rank_cartons(CARTONS, PALLETS, product_dims=(45, 45, 18), top_n=1))
+    best = rank_cartons(CARTONS, PALLETS, product_dims=(45, 45, 18), top_n=1)[0]
+    assert best in streamed
+    assert len(streamed) < len(CARTONS)
+
+
 def test_packaging_test_card_contains_operator_checklist():
     card = build_packaging_test_card({"carton_name": "C1", "cartons_per_layer": 10})
     assert "# Karta testu opakowania" in card
@@ -0,0 +1,110 @@
+import csv
+import json
+from pathlib import Path
+
+import pytest
+
+from packing_app import batch
+from palletizer_core import cli
+from palletizer_core.cli import (
+    BatchDefaults,
+    finished_keys,
+    main,
+    read_catalog_tasks,
+    read_pairs_csv,
+)
+
+
+def _write_catalog(tmp_path):
+    cartons = tmp_path / "cartons.xml"
+    cartons.write_text(
+        "<cartons>"
+        '<carton code="A" w="400" l="300" h="200" weight="0.5"/>'
+        '<carton code="B" w="300" l="200" h="150" weight="0.5"/>'
+        "</cartons>",
+        encoding="utf-8",
+    )
+    pallets = tmp_path / "pallets.xml"
+    pallets.write_text(
+        '<pallets><pallet name="EUR1" w="1200" l="800" h="144" weight="25"/></pallets>',
+        encoding="utf-8",
+    )
+    return cartons, pallets
+
+
+def _read_jsonl(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_catalog_tasks_derive_layers_from_stack_height(tmp_path):
+    cartons, pallets = _write_catalog(tmp_path)
+    tasks = read_catalog_tasks(cartons, pallets, BatchDefaults(max_stack=1000))
+    assert [task.name for task in tasks] == ["EUR1/A", "EUR1/B"]
+    assert [task.inputs.num_layers for task in tasks] == [5, 6]
+
+
+def test_jsonl_run_and_resume_skip_finished_keys(tmp_path):
+    cartons, pallets = _write_catalog(tmp_path)
+    output = tmp_path / "out.jsonl"
+    args = ["--cartons", str(cartons), "--pallets", str(pallets), "-o", str(output)]
+
+    assert main([*args, "--workers", "1", "--layouts"]) == 0
+    records = _read_jsonl(output)
+    assert {r["name"] for r in records} == {"EUR1/A", "EUR1/B"}
+    first = next(r for r in records if r["name"] == "EUR1/A")
+    assert first["error"] is None
+    assert first["cartons_even"] == len(first["even"]) == 8
+
+    # Drop one record and leave a truncated line, as a crashed run would.
+    kept = output.read_text(encoding="utf-8").splitlines()[0]
+    output.write_text(kept + "\n{\"key\": \"tru", encoding="utf-8")
+    assert len(finished_keys(output, "jsonl")) == 1
+
+    assert main([*args, "--workers", "2", "--chunk-size", "2", "--resume"]) == 0
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    assert len(finished_keys(output, "jsonl")) == 2
+
+
+def test_pairs_csv_to_csv_output(tmp_path):
+    pairs = tmp_path / "pairs.csv"
+    pairs.write_text(
+        "pallet,carton,pallet_w,pallet_l,pallet_h,box_w,box_l,box_h,num_layers\n"
+        "EUR1,demo,1200,800,144,400,300,200,3\n"
+        ",,1200,800,144,0,300,200,\n",
+        encoding="utf-8",
+    )
+    tasks = read_pairs_csv(pairs)
+    assert tasks[0].inputs.num_layers == 3
+    assert tasks[1].name == "1200x800x144/0x300x200"
+
+    output = tmp_path / "out.csv"
+    assert main(["--pairs", str(pairs), "-o", str(output), "--workers", "1"]) == 0
+    with open(output, newline="", encoding="utf-8") as handle:
+        rows = {row["name"]: row for row in csv.DictReader(handle)}
+    assert rows["EUR1/demo"]["cartons_even"] == "8"
+    assert rows["EUR1/demo"]["error"] == ""
+    assert rows["1200x800x144/0x300x200"]["error"]
+
+
+def test_catalogs_come_from_environment_or_are_required(tmp_path, monkeypatch):
+    cartons, pallets = _write_catalog(tmp_path)
+    output = tmp_path / "out.jsonl"
+    monkeypatch.delenv(cli.CARTONS_ENV, raising=False)
+    monkeypatch.delenv(cli.PALLETS_ENV, raising=False)
+    with pytest.raises(SystemExit):
+        main(["-o", str(output)])
+
+    monkeypatch.setenv(cli.CARTONS_ENV, str(cartons))
+    monkeypatch.setenv(cli.PALLETS_ENV, str(pallets))
+    assert main(["-o", str(output), "--workers", "1"]) == 0
+    assert {r["name"] for r in _read_jsonl(output)} == {"EUR1/A", "EUR1/B"}
+
+
+def test_app_command_falls_back_to_bundled_catalogs(monkeypatch):
+    calls = []
+    monkeypatch.setattr(cli, "main", lambda argv, **kwargs: calls.append(kwargs) or 0)
+    assert batch.main(["-o", "out.jsonl"]) == 0
+    assert Path(calls[0]["default_cartons"]).name == "cartons.xml"
+    assert calls[0]["default_cartons"].is_file()
+    assert calls[0]["default_pallets"].is_file()
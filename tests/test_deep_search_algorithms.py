@@ -1,9 +1,14 @@
+import time
+
+import pytest
+
 from palletizer_core.algorithms import (
     generate_guillotine_layouts,
     generate_strip_layouts,
     pack_rectangles_2d,
 )
 from palletizer_core.engine import PalletInputs, build_layouts
+from palletizer_core.layout_cache import LayoutCache
 from palletizer_core.signature import layout_signature
 
 
@@ -111,3 +116,106 @@ def test_deep_search_build_layouts_deterministic():
 
     assert result_a.best_layout_key == result_b.best_layout_key
     assert sig_a == sig_b
+
+
+def test_guillotine_dp_orders_variants_and_scales_with_depth():
+    pallet_w, pallet_l = 1200.0, 1000.0
+    box_w, box_l = 123.0, 87.0
+
+    layouts = generate_guillotine_layouts(
+        pallet_w, pallet_l, box_w, box_l, max_variants=12, max_depth=8
+    )
+
+    counts = [len(layout) for layout in layouts]
+    assert counts == sorted(counts, reverse=True)
+    assert counts[0] == 110
+    assert len({layout_signature(layout) for layout in layouts}) == len(layouts)
+    for layout in layouts:
+        _assert_layout_valid(layout, pallet_w, pallet_l)
+
+
+def test_guillotine_dp_budget_is_deterministic():
+    args = (1200.0, 1000.0, 25.5, 17.3)
+
+    first = generate_guillotine_layouts(*args, max_variants=3, node_limit=2_000)
+    second = generate_guillotine_layouts(*args, max_variants=3, node_limit=2_000)
+
+    assert first == second
+    assert len(first[0]) >= pack_rectangles_2d(*args)[0]
+    _assert_layout_valid(first[0], args[0], args[1])
+
+
+def test_strip_dp_uses_mixed_strips():
+    # Strips stacking both orientations reach 24; one-orientation strips
+    # top out at 21.
+    layouts = generate_strip_layouts(1200, 800, 230, 170, max_variants=5)
+    assert len(layouts[0]) == 24
+    assert [len(layout) for layout in layouts] == sorted(
+        (len(layout) for layout in layouts), reverse=True
+    )
+    for layout in layouts:
+        _assert_layout_valid(layout, 1200, 800)
+
+
+@pytest.mark.parametrize(
+    "pallet_w, pallet_l, box_w, box_l, best",
+    [(1200, 800, 200, 150, 32), (1140, 1140, 300, 200, 19), (1200, 800, 333, 221, 11)],
+)
+def test_guillotine_honours_max_variants(pallet_w, pallet_l, box_w, box_l, best):
+    layouts = generate_guillotine_layouts(
+        pallet_w, pallet_l, box_w, box_l, max_variants=30
+    )
+
+    assert len(layouts) == 30
+    assert len(layouts[0]) == best
+    signatures = {layout_signature(layout, symmetric=True) for layout in layouts}
+    assert len(signatures) == 30
+    for layout in layouts:
+        _assert_layout_valid(layout, pallet_w, pallet_l)
+
+
+def test_guillotine_past_deadline_returns_incumbent():
+    layouts = generate_guillotine_layouts(
+        1200, 800, 25.5, 17.3, max_variants=5, deadline=time.monotonic()
+    )
+
+    grid_count, _ = pack_rectangles_2d(1200, 800, 25.5, 17.3)
+    assert layouts
+    assert len(layouts[0]) >= grid_count
+    _assert_layout_valid(layouts[0], 1200, 800)
+
+
+def test_time_budget_runs_cheap_generators_and_reports_truncation(tmp_path):
+    inputs = PalletInputs(
+        pallet_w=1200,
+        pallet_l=800,
+        pallet_h=1500,
+        box_w=200,
+        box_l=150,
+        box_h=100,
+        thickness=0,
+        spacing=0,
+        slip_count=0,
+        num_layers=1,
+        max_stack=0,
+        include_pallet_height=False,
+    )
+    cache = LayoutCache(tmp_path / "layouts.sqlite3")
+    result = build_layouts(
+        inputs,
+        maximize_mixed=False,
+        center_enabled=False,
+        center_mode="Cała warstwa",
+        shift_even=False,
+        deep_search=True,
+        cache=cache,
+        time_budget_s=0.0,
+    )
+
+    assert result.layouts
+    assert {"column", "row_by_row", "interlock"} <= set(result.completed_generators)
+    assert {"guillotine", "pallet_loading"} <= set(result.truncated_generators)
+    assert not set(result.completed_generators) & set(result.truncated_generators)
+    assert not any(key.startswith("guillotine") for key in result.display_map)
+    # Truncated results are not cached.
+    assert cache.stats.stores == 0
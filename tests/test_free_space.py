@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from palletizer_core.algorithms import maximize_mixed_layout, place_air_cushions
+from palletizer_core.algorithms.free_space import FreeSpace
+from palletizer_core.algorithms.void_fill import check_collision
+
+
+def _overlap(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return not (ax + aw <= bx or bx + bw <= ax or ay + ah <= by or by + bh <= ay)
+
+
+def test_occupy_keeps_maximal_rectangles_only():
+    space = FreeSpace(100, 100, cell=10)
+    space.occupy(40, 40, 20, 20)
+    assert sorted(space) == [
+        (0, 0, 40, 100),
+        (0, 0, 100, 40),
+        (0, 60, 100, 40),
+        (60, 0, 40, 100),
+    ]
+    # Pieces of a second split that lie inside other free rectangles go.
+    space.occupy(0, 0, 10, 10)
+    rects = list(space)
+    for a in rects:
+        for b in rects:
+            if a is not b:
+                assert not (
+                    b[0] <= a[0]
+                    and b[1] <= a[1]
+                    and a[0] + a[2] <= b[0] + b[2]
+                    and a[1] + a[3] <= b[1] + b[3]
+                )
+
+
+def test_largest_skips_deleted_entries():
+    space = FreeSpace(100, 50, cell=25)
+    assert space.largest() == (0, 0, 100, 50)
+    space.occupy(0, 0, 30, 50)
+    assert space.largest() == (30, 0, 70, 50)
+    space.occupy(30, 0, 70, 10)
+    assert space.largest() == (30, 10, 70, 40)
+    space.occupy(30, 10, 70, 40)
+    assert space.largest() is None
+    assert len(space) == 0
+
+
+def test_usable_filter_drops_small_rectangles():
+    space = FreeSpace(100, 100, usable=lambda w, h: w >= 30 and h >= 30)
+    space.occupy(0, 0, 80, 80)
+    assert sorted(space) == []
+    space = FreeSpace(100, 100, usable=lambda w, h: w >= 30 and h >= 30)
+    space.occupy(0, 0, 60, 60)
+    assert sorted(space) == [(0, 60, 100, 40), (60, 0, 40, 100)]
+
+
+def test_overlapping_and_is_free_match_brute_force():
+    rng = random.Random(5)
+    boxes = []
+    space = FreeSpace(500, 400, cell=60)
+    for _ in range(25):
+        box = (rng.uniform(0, 450), rng.uniform(0, 350), 50, 50)
+        if not check_collision(box, boxes):
+            boxes.append(box)
+            space.occupy(*box)
+    for _ in range(300):
+        probe = (rng.uniform(0, 480), rng.uniform(0, 380), 20, 20)
+        assert space.is_free(*probe) == (not check_collision(probe, boxes))
+        for rect in space.overlapping(*probe):
+            assert _overlap(rect, probe)
+    for rect in space:
+        assert not check_collision(rect, boxes)
+
+
+def test_maximize_mixed_layout_fills_free_space():
+    count, positions = maximize_mixed_layout(600, 400, 200, 150, 0, [(0, 0, 200, 150)])
+    assert count == len(positions) >= 6
+    assert positions[0] == (0, 0, 200, 150)
+    for i, a in enumerate(positions):
+        assert a[0] + a[2] <= 600 and a[1] + a[3] <= 400
+        for b in positions[i + 1 :]:
+            assert not _overlap(a, b)
+
+
+def test_air_cushions_avoid_products():
+    products = [(0, 0, 100, 100), (250, 150, 100, 100)]
+    cushions = place_air_cushions(400, 300, products, cushion_w=20, cushion_l=80)
+    assert cushions
+    for cushion in cushions:
+        assert not check_collision(cushion, products)
+    assert (0, 0, 20, 80) not in cushions
+    assert (0, 170, 20, 80) in cushions
+
+
+# Counts of the previous list-based implementation on the same inputs.
+@pytest.mark.parametrize(
+    "pallet, box, initial, previous",
+    [
+        ((600, 400), (200, 150), [(0, 0, 200, 150)], 6),
+        ((800, 600), (250, 150), [(0, 0, 300, 200), (0, 200, 300, 200)], 10),
+        ((500, 500), (120, 90), [(100, 100, 120, 90)], 18),
+        ((800, 600), (230, 170), [], 9),
+    ],
+)
+def test_maximize_mixed_layout_not_worse_than_previous(pallet, box, initial, previous):
+    count, positions = maximize_mixed_layout(*pallet, *box, 0, initial)
+    assert count >= previous
+    assert positions[: len(initial)] == initial
+    for i, a in enumerate(positions):
+        for b in positions[i + 1 :]:
+            assert not _overlap(a, b)
@@ -0,0 +1,49 @@
+import pytest
+
+from palletizer_core.engine import apply_spacing, center_layout
+from palletizer_core.layer_array import LayerArray
+from palletizer_core.symmetry import PALLET_SYMMETRIES, transform_rect
+from palletizer_core.transformations import apply_transformation
+
+LAYOUT = [(0, 0, 300, 200), (300, 0, 200, 300), (0, 200, 300, 200)]
+
+
+def test_round_trip_and_slices_share_the_buffer():
+    layer = LayerArray.from_layout(LAYOUT)
+    assert layer.to_layout() == LAYOUT
+    assert list(layer.orientation) == [0, 1, 0]
+    assert layer.bounds() == (0, 0, 500, 400)
+
+    head = layer[:2]
+    head.translate(10, 5)
+    assert layer[0] == (10, 5, 300, 200)
+    assert layer[2] == (0, 200, 300, 200)
+    assert LayerArray.from_layout(layer).digest() == layer.digest()
+    assert LayerArray.from_layout(LAYOUT).digest() != layer.digest()
+
+
+@pytest.mark.parametrize("transform", PALLET_SYMMETRIES)
+def test_transformation_accepts_either_form(transform):
+    expected = [transform_rect(rect, transform, 1200, 800) for rect in LAYOUT]
+    assert apply_transformation(LAYOUT, transform, 1200, 800) == expected
+
+    layer = LayerArray.from_layout(LAYOUT)
+    mirrored = apply_transformation(layer, transform, 1200, 800)
+    assert isinstance(mirrored, LayerArray)
+    assert mirrored.to_layout() == expected
+    assert layer.to_layout() == LAYOUT
+    assert apply_transformation(LAYOUT, "Obrót 90°", 1200, 800) == []
+
+
+def test_spacing_and_centering_match_tuple_arithmetic():
+    spaced = apply_spacing(LAYOUT, 10)
+    assert spaced == [(x + 5, y + 5, w - 10, h - 10) for x, y, w, h in LAYOUT]
+    assert apply_spacing(LayerArray.from_layout(LAYOUT), 10).to_layout() == spaced
+
+    centered = center_layout(LAYOUT, 1200, 800, True, "Cała warstwa")
+    assert centered == [(x + 350, y + 200, w, h) for x, y, w, h in LAYOUT]
+    layer = center_layout(
+        LayerArray.from_layout(LAYOUT), 1200, 800, True, "Cała warstwa"
+    )
+    assert layer.to_layout() == centered
+    assert center_layout(LAYOUT, 1200, 800, False, "Cała warstwa") is LAYOUT
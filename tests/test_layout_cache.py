@@ -0,0 +1,116 @@
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+from palletizer_core.engine import PalletInputs, build_layouts
+from palletizer_core.layout_cache import LayoutCache, get_cache_dir, layout_cache_key
+
+
+def _inputs(**overrides):
+    inputs = PalletInputs(
+        pallet_w=1200,
+        pallet_l=800,
+        pallet_h=144,
+        box_w=200,
+        box_l=150,
+        box_h=100,
+        thickness=0,
+        spacing=5,
+        slip_count=0,
+        num_layers=4,
+        max_stack=0,
+        include_pallet_height=False,
+    )
+    return replace(inputs, **overrides)
+
+
+def _build(inputs, cache, **options):
+    return build_layouts(
+        inputs,
+        maximize_mixed=False,
+        center_enabled=True,
+        center_mode="Cała warstwa",
+        shift_even=True,
+        cache=cache,
+        **options,
+    )
+
+
+def test_cache_hit_returns_identical_result(tmp_path):
+    cache = LayoutCache(tmp_path / "layouts.sqlite3")
+
+    first = _build(_inputs(), cache)
+    second = _build(_inputs(), cache)
+
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 1
+    assert cache.stats.stores == 1
+    assert second.best_layout_key == first.best_layout_key
+    assert second.layouts == first.layouts
+    assert second.best_even == first.best_even
+    assert second.solution_catalog.solutions == first.solution_catalog.solutions
+
+
+def test_cache_is_persistent_across_instances(tmp_path):
+    path = tmp_path / "layouts.sqlite3"
+    _build(_inputs(), LayoutCache(path))
+
+    reopened = LayoutCache(path)
+    _build(_inputs(), reopened)
+
+    assert reopened.stats.hits == 1
+    assert len(reopened) == 1
+
+
+def test_cache_key_covers_inputs_and_options():
+    base = layout_cache_key(_inputs(), {"deep_search": False})
+
+    assert layout_cache_key(_inputs(), {"deep_search": False}) == base
+    assert layout_cache_key(_inputs(box_w=201), {"deep_search": False}) != base
+    assert layout_cache_key(_inputs(), {"deep_search": True}) != base
+    assert layout_cache_key(_inputs(box_w=200.0000001), {"deep_search": False}) == base
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = LayoutCache(tmp_path / "layouts.sqlite3", max_entries=2)
+    a, b, c = _inputs(box_w=200), _inputs(box_w=210), _inputs(box_w=220)
+
+    _build(a, cache)
+    _build(b, cache)
+    _build(a, cache)  # refresh a, so b is the oldest entry
+    _build(c, cache)
+
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+    hits = cache.stats.hits
+    _build(a, cache)
+    assert cache.stats.hits == hits + 1
+    _build(b, cache)
+    assert cache.stats.hits == hits + 1
+
+
+def test_customizer_without_token_bypasses_cache(tmp_path):
+    cache = LayoutCache(tmp_path / "layouts.sqlite3")
+
+    def customizer(carton, pallet, pattern):
+        return pattern, 0, 0
+
+    _build(_inputs(), cache, row_by_row_customizer=customizer)
+    _build(_inputs(), cache, row_by_row_customizer=customizer)
+    assert cache.stats.hits == 0
+    assert len(cache) == 0
+
+    _build(_inputs(), cache, row_by_row_customizer=customizer, cache_token=(False, 0, 0))
+    _build(_inputs(), cache, row_by_row_customizer=customizer, cache_token=(False, 0, 0))
+    assert cache.stats.hits == 1
+
+
+def test_cache_dir_outside_package_when_run_as_module(tmp_path, monkeypatch):
+    main = tmp_path / "src" / "packing_app" / "__main__.py"
+    main.parent.mkdir(parents=True)
+    main.write_text("")
+    monkeypatch.delenv("PALLETIZER_CACHE_DIR", raising=False)
+    monkeypatch.setattr(sys, "argv", [str(main)])
+    monkeypatch.chdir(tmp_path)
+
+    assert Path(get_cache_dir()) == (tmp_path / "data" / "layout_cache").resolve()
@@ -0,0 +1,84 @@
+import pytest
+
+from palletizer_core.engine import PalletInputs, build_layouts
+
+
+def _inputs(pallet, box, *, spacing=0):
+    return PalletInputs(
+        pallet_w=pallet[0],
+        pallet_l=pallet[1],
+        pallet_h=144,
+        box_w=box[0],
+        box_l=box[1],
+        box_h=150,
+        thickness=0,
+        spacing=spacing,
+        slip_count=0,
+        num_layers=4,
+        max_stack=0,
+        include_pallet_height=False,
+    )
+
+
+def _build(inputs, **options):
+    return build_layouts(
+        inputs,
+        maximize_mixed=False,
+        center_enabled=True,
+        center_mode="Cała warstwa",
+        shift_even=False,
+        **options,
+    )
+
+
+CASES = [
+    ((1200, 800), (300, 200)),
+    ((1200, 800), (400, 300)),
+    ((1200, 1000), (250, 180)),
+    ((1200, 800), (95, 61)),
+    ((800, 600), (310, 230)),
+]
+
+
+@pytest.mark.parametrize("pallet, box", CASES)
+@pytest.mark.parametrize("filter_sanity", [False, True])
+@pytest.mark.parametrize("extended_library", [False, True])
+@pytest.mark.parametrize("result_limit", [1, 3])
+def test_lazy_matches_full_evaluation(
+    pallet, box, filter_sanity, extended_library, result_limit
+):
+    inputs = _inputs(pallet, box)
+    options = dict(
+        filter_sanity=filter_sanity,
+        extended_library=extended_library,
+        result_limit=result_limit,
+    )
+    eager = _build(inputs, **options)
+    lazy = _build(inputs, lazy=True, **options)
+
+    assert lazy.solution_catalog.solutions == eager.solution_catalog.solutions
+    assert lazy.best_layout_key == eager.best_layout_key
+    assert lazy.best_layout_name == eager.best_layout_name
+    assert lazy.best_even == eager.best_even
+    assert lazy.best_odd == eager.best_odd
+    assert lazy.raw_layout_entries == eager.raw_layout_entries
+    assert set(lazy.scores) <= set(eager.scores)
+
+
+def test_lazy_scores_only_top_candidates():
+    inputs = _inputs((1200, 800), (300, 200))
+    eager = _build(inputs, extended_library=True, result_limit=1)
+    lazy = _build(inputs, extended_library=True, result_limit=1, lazy=True)
+
+    assert len(lazy.scores) < len(eager.scores)
+    best = eager.solution_catalog.solutions[0]
+    assert lazy.scores[best.key] == eager.scores[best.key]
+
+
+def test_lazy_without_limit_evaluates_everything():
+    inputs = _inputs((1200, 800), (400, 300))
+    eager = _build(inputs)
+    lazy = _build(inputs, lazy=True)
+
+    assert lazy.scores.keys() == eager.scores.keys()
+    assert lazy.solution_catalog.solutions == eager.solution_catalog.solutions
@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+from palletizer_core.algorithms import pack_rectangles_dynamic_variants
+from palletizer_core.algorithms.maxrects import (
+    BEST_SHORT_SIDE_FIT,
+    STRATEGIES,
+    MaxRectsBin,
+    pack_identical,
+)
+from palletizer_core.models import Carton, Pallet
+from palletizer_core.spatial import boxes_overlap
+
+
+def _assert_layout_valid(layout, width, height):
+    for x, y, w, length in layout:
+        assert x >= 0 and y >= 0
+        assert x + w <= width and y + length <= height
+    for i in range(len(layout)):
+        for j in range(i):
+            assert not boxes_overlap(layout[i], layout[j])
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_strategies_produce_valid_layouts(strategy):
+    rng = random.Random(7)
+    for _ in range(30):
+        width = rng.choice([800, 1000, 1200])
+        height = rng.choice([800, 1000, 1200])
+        box_w = rng.randint(40, 400)
+        box_l = rng.randint(40, 400)
+        layout = pack_identical(width, height, box_w, box_l, strategy=strategy)
+        _assert_layout_valid(layout, width, height)
+        assert len(layout) <= (width * height) // (box_w * box_l)
+
+
+def test_matches_rectpack_default_packer():
+    rectpack = pytest.importorskip("rectpack")
+    rng = random.Random(3)
+    cases = [(1200, 800, 200, 150), (1200, 1000, 60, 40), (1140, 760.3, 95.5, 61.25)]
+    for _ in range(40):
+        cases.append(
+            (
+                rng.choice([800, 1000, 1200]),
+                rng.choice([800, 1000, 1200]),
+                round(rng.uniform(40, 400), 1),
+                round(rng.uniform(40, 400), 1),
+            )
+        )
+    for width, height, box_w, box_l in cases:
+        count = int((width * height) // (box_w * box_l)) + 5
+        packer = rectpack.newPacker(rotation=True)
+        for i in range(count):
+            packer.add_rect(box_w, box_l, i)
+        packer.add_bin(width, height)
+        packer.pack()
+        expected = [(x, y, w, h) for (_, x, y, w, h, _) in packer.rect_list()]
+        assert pack_identical(width, height, box_w, box_l, max_items=count) == expected
+
+
+def test_free_list_keeps_only_usable_rectangles():
+    packer = MaxRectsBin(100, 100, 30, 20, strategy=BEST_SHORT_SIDE_FIT)
+    while packer.insert() is not None:
+        for _, _, w, h, _, _ in packer.free:
+            assert (w >= 30 and h >= 20) or (w >= 20 and h >= 30)
+    assert packer.free == []
+    assert len(packer.placed) == 15
+
+
+def test_bottom_left_fills_rows_from_the_bottom():
+    layout = pack_identical(100, 50, 25, 25, strategy="bottom_left")
+    assert [(x, y) for x, y, _, _ in layout[:4]] == [(0, 0), (25, 0), (50, 0), (75, 0)]
+
+
+def test_unknown_strategy_and_item_limit():
+    with pytest.raises(ValueError):
+        MaxRectsBin(100, 100, 10, 10, strategy="best_fit")
+    assert len(pack_identical(100, 100, 10, 10, max_items=7)) == 7
+    assert pack_identical(100, 100, 120, 10, rotation=False) == []
+
+
+def test_full_dynamic_variants_use_strategies():
+    variants = pack_rectangles_dynamic_variants(
+        Carton(230, 150, 100), Pallet(1200, 800, 1500), full_variants=True
+    )
+    assert set(variants) == {
+        "dynamic_default",
+        "dynamic_rotated",
+        "dynamic_bottom_left",
+        "dynamic_contact_point",
+    }
+    for layout in variants.values():
+        _assert_layout_valid(layout, 1200, 800)
+
+
+def test_dynamic_variants_never_below_default_strategy():
+    # Bottom-left and contact point place 9 cartons here, the default 11.
+    variants = pack_rectangles_dynamic_variants(
+        Carton(333, 221, 100), Pallet(1200, 800, 1500), full_variants=True
+    )
+    assert len(variants["dynamic_default"]) == 11
+    assert "dynamic_bottom_left" not in variants
+    assert "dynamic_contact_point" not in variants
@@ -1,4 +1,5 @@
 import math
+import random
 
 from palletizer_core.metrics import (
     compute_edge_buffer_metrics,
@@ -29,3 +30,58 @@ def test_edge_buffer_metrics_nonzero_clearance():
     )
     assert math.isclose(buffer_score, 0.4, rel_tol=1e-6)
     assert math.isclose(min_clearance, 10.0, rel_tol=1e-6)
+
+
+def _all_pairs_contact_fraction(pattern, eps=1e-6, clamp=True):
+    perimeter = 0.0
+    contact = 0.0
+    for _, _, w, length in pattern:
+        perimeter += 2.0 * (w + length)
+    for i, (x1, y1, w1, l1) in enumerate(pattern):
+        for x2, y2, w2, l2 in pattern[i + 1 :]:
+            if abs((x1 + w1) - x2) < eps or abs((x2 + w2) - x1) < eps:
+                contact += max(0.0, min(y1 + l1, y2 + l2) - max(y1, y2))
+            if abs((y1 + l1) - y2) < eps or abs((y2 + l2) - y1) < eps:
+                contact += max(0.0, min(x1 + w1, x2 + w2) - max(x1, x2))
+    if perimeter <= eps:
+        return 0.0
+    value = contact / perimeter
+    return max(0.0, min(1.0, value)) if clamp else value
+
+
+def test_edge_contact_matches_all_pairs_reference():
+    rng = random.Random(7)
+    for _ in range(200):
+        pattern = [
+            (
+                rng.randint(0, 20) * 10.0 + rng.choice([0.0, 0.0, 3e-7]),
+                rng.randint(0, 20) * 10.0,
+                rng.choice([10.0, 20.0, 0.0]),
+                rng.choice([10.0, 30.0]),
+            )
+            for _ in range(rng.randint(1, 40))
+        ]
+        for eps in (1e-6, 0.5):
+            for clamp in (True, False):
+                assert compute_edge_contact_fraction(
+                    pattern, eps=eps, clamp=clamp
+                ) == _all_pairs_contact_fraction(pattern, eps, clamp)
+
+
+def test_edge_contact_eps_tolerance():
+    pattern = [(0.0, 0.0, 100.0, 50.0), (100.4, 10.0, 100.0, 50.0)]
+
+    assert compute_edge_contact_fraction(pattern) == 0.0
+    assert compute_edge_contact_fraction(pattern, eps=0.5) == 40.0 / 600.0
+    assert compute_edge_contact_fraction(pattern, eps=0.0) == 0.0
+
+
+def test_edge_contact_large_grid():
+    pattern = [
+        (col * 40.0, row * 60.0, 40.0, 60.0) for col in range(30) for row in range(16)
+    ]
+
+    # 29 vertical seams of 16 * 60 and 15 horizontal seams of 30 * 40.
+    expected = (29 * 16 * 60.0 + 15 * 30 * 40.0) / (len(pattern) * 200.0)
+    assert math.isclose(compute_edge_contact_fraction(pattern), expected)
+    assert compute_edge_contact_fraction(pattern) == _all_pairs_contact_fraction(pattern)
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+from palletizer_core.algorithms import (
+    generate_guillotine_layouts,
+    layer_upper_bound,
+    solve_pallet_loading,
+)
+from palletizer_core.models import Carton, Pallet
+from palletizer_core.profiling import Profiler
+from palletizer_core.selector import PatternSelector
+
+
+def _assert_layout_valid(layout, pallet_w, pallet_l):
+    for x, y, w, length in layout:
+        assert x >= -1e-6 and y >= -1e-6
+        assert x + w <= pallet_w + 1e-6
+        assert y + length <= pallet_l + 1e-6
+    for i, (ax, ay, aw, al) in enumerate(layout):
+        for bx, by, bw, bl in layout[i + 1 :]:
+            overlap_x = ax < bx + bw - 1e-6 and bx < ax + aw - 1e-6
+            overlap_y = ay < by + bl - 1e-6 and by < ay + al - 1e-6
+            assert not (overlap_x and overlap_y)
+
+
+@pytest.mark.parametrize(
+    "pallet_w, pallet_l, box_w, box_l, expected",
+    [
+        (1200, 800, 200, 150, 32),
+        (1200, 1000, 260, 150, 29),
+        (1200, 1000, 333.3, 211.7, 16),
+    ],
+)
+def test_solver_proves_optimum(pallet_w, pallet_l, box_w, box_l, expected):
+    result = solve_pallet_loading(pallet_w, pallet_l, box_w, box_l)
+
+    assert result.count == expected
+    assert result.optimal
+    assert result.gap == 0
+    assert len(result.layout) == result.count
+    _assert_layout_valid(result.layout, pallet_w, pallet_l)
+
+
+def test_five_block_beats_guillotine_and_reports_gap():
+    # Morabito & Morales: the best first-order pattern holds 52 boxes, the
+    # Barnes bound allows 53.
+    result = solve_pallet_loading(43, 26, 7, 3)
+    guillotine = max(
+        len(layout) for layout in generate_guillotine_layouts(43, 26, 7, 3)
+    )
+
+    assert result.count == 52
+    assert result.upper_bound == 53
+    assert result.gap == 1
+    assert result.complete
+    assert result.count >= guillotine
+    _assert_layout_valid(result.layout, 43, 26)
+
+
+def test_budget_keeps_result_deterministic_and_valid():
+    first = solve_pallet_loading(1200, 800, 95, 61, node_limit=5_000)
+    second = solve_pallet_loading(1200, 800, 95, 61, node_limit=5_000)
+
+    assert not first.complete
+    assert first.layout == second.layout
+    assert first.count <= first.upper_bound
+    assert len(first.layout) == first.count
+    _assert_layout_valid(first.layout, 1200, 800)
+
+
+def test_carton_larger_than_pallet():
+    result = solve_pallet_loading(100, 100, 150, 50)
+
+    assert result.count == 0
+    assert result.layout == []
+    assert result.optimal
+
+
+def test_registered_in_deep_search():
+    selector = PatternSelector(Carton(200, 150), Pallet(1200, 800))
+
+    assert "pallet_loading" not in selector.generate_all()
+    patterns = selector.generate_all(deep_search=True)
+    assert len(patterns["pallet_loading"]) == 32
+
+
+def test_deep_search_caps_solver_time_and_reports_gap():
+    selector = PatternSelector(Carton(123.4, 77.7), Pallet(1200, 800))
+    profiler = Profiler()
+    start = time.perf_counter()
+    selector.generate_all(deep_search=True, profiler=profiler, solver_time_limit=0.05)
+    report = profiler.report()
+    timing = next(t for t in report.generators if t.name == "pallet_loading")
+    assert timing.seconds < 0.5
+    assert time.perf_counter() - start < 10
+    assert not timing.complete
+    assert "gap" in timing.note
+    assert report.as_dict()["generators"]["pallet_loading"]["complete"] is False
+    assert any("truncated" in line for line in report.format_lines())
+
+
+@pytest.mark.parametrize(
+    "pallet_w, pallet_l, box_w, box_l",
+    [(1200, 800, 300, 200), (1200, 1000, 95, 61), (1200, 800, 2000, 100)],
+)
+def test_layer_upper_bound_matches_solver(pallet_w, pallet_l, box_w, box_l):
+    result = solve_pallet_loading(pallet_w, pallet_l, box_w, box_l, node_limit=0)
+    assert layer_upper_bound(pallet_w, pallet_l, box_w, box_l) == result.upper_bound
@@ -0,0 +1,80 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from palletizer_core.engine import PalletInputs, build_layouts
+from palletizer_core.models import Carton, Pallet
+from palletizer_core.parallel import InlineExecutor, create_executor, run_jobs
+from palletizer_core.selector import PatternSelector
+
+
+def _inputs():
+    return PalletInputs(
+        pallet_w=1200,
+        pallet_l=800,
+        pallet_h=1500,
+        box_w=200,
+        box_l=150,
+        box_h=100,
+        thickness=0,
+        spacing=5,
+        slip_count=0,
+        num_layers=1,
+        max_stack=0,
+        include_pallet_height=False,
+    )
+
+
+def _boom():
+    raise ValueError("boom")
+
+
+def test_inline_executor_matches_serial_generation():
+    selector = PatternSelector(Carton(200, 150), Pallet(1200, 800))
+    options = {"extended_library": True, "deep_search": True, "maximize_mixed": True}
+
+    serial = selector.generate_all(**options)
+    inline = selector.generate_all(executor=InlineExecutor(), **options)
+
+    assert list(inline) == list(serial)
+    assert inline == serial
+
+
+def test_process_pool_matches_serial_generation():
+    selector = PatternSelector(Carton(200, 150), Pallet(1200, 800))
+    serial = selector.generate_all(extended_library=True)
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        parallel = selector.generate_all(extended_library=True, executor=pool)
+        again = selector.generate_all(extended_library=True, executor=pool)
+
+    assert list(parallel) == list(serial)
+    assert parallel == serial
+    assert again == serial
+
+
+def test_build_layouts_accepts_shared_executor():
+    options = dict(
+        maximize_mixed=False,
+        center_enabled=False,
+        center_mode="Cała warstwa",
+        shift_even=False,
+        extended_library=True,
+    )
+    serial = build_layouts(_inputs(), **options)
+    with create_executor(2) as pool:
+        parallel = build_layouts(_inputs(), executor=pool, **options)
+
+    assert parallel.best_layout_key == serial.best_layout_key
+    assert parallel.layouts == serial.layouts
+    assert parallel.best_odd == serial.best_odd
+
+
+def test_create_executor_single_worker_is_inline():
+    assert isinstance(create_executor(1), InlineExecutor)
+
+
+def test_run_jobs_propagates_job_errors():
+    jobs = [("ok", max, (1, 2)), ("bad", _boom, ())]
+    with pytest.raises(ValueError, match="boom"):
+        run_jobs(jobs, InlineExecutor())
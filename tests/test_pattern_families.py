@@ -0,0 +1,42 @@
+from palletizer_core.models import Carton, Pallet
+from palletizer_core.pattern_families import (
+    generate_block3,
+    generate_block4,
+    iter_block2,
+    iter_block4,
+    iter_hybrid,
+    select_descriptors,
+)
+
+
+def test_descriptor_counts_match_materialised_layouts():
+    carton = Carton(width=230, length=170)
+    pallet = Pallet(width=1200, length=800)
+    for iterate in (iter_block2, iter_block4, iter_hybrid):
+        for descriptor in iterate(carton, pallet):
+            assert descriptor.count == len(descriptor.materialize()) > 0
+
+
+def test_limit_keeps_highest_counts():
+    carton = Carton(width=95, length=61)
+    pallet = Pallet(width=1200, length=800)
+    descriptors = list(iter_block4(carton, pallet))
+    assert len(descriptors) > 50
+
+    patterns = generate_block4(carton, pallet)
+    assert len(patterns) == 50
+    counts = sorted((d.count for d in descriptors), reverse=True)
+    assert sorted(map(len, patterns.values()), reverse=True) == counts[:50]
+    # Survivors keep generation order.
+    order = [d.name for d in descriptors]
+    assert list(patterns) == sorted(patterns, key=order.index)
+
+
+def test_equal_layouts_are_materialised_once():
+    carton = Carton(width=200, length=200)
+    pallet = Pallet(width=1200, length=800)
+    # For a square carton ABA and BAB place the same cartons.
+    names = list(generate_block3(carton, pallet, limit=1000))
+    assert names
+    assert all(name.endswith("_ABA") for name in names)
+    assert select_descriptors(iter_block2(carton, pallet), limit=0) == {}
@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from packing_app.gui.pallet_helpers import profile_rows, profile_summary
+from palletizer_core.engine import PalletInputs, build_layouts
+from palletizer_core.layout_cache import LayoutCache
+from palletizer_core.parallel import create_executor
+from palletizer_core.profiling import Profiler
+
+INPUTS = PalletInputs(
+    pallet_w=1200,
+    pallet_l=800,
+    pallet_h=144,
+    box_w=300,
+    box_l=200,
+    box_h=100,
+    thickness=0,
+    spacing=0,
+    slip_count=0,
+    num_layers=4,
+    max_stack=0,
+    include_pallet_height=False,
+)
+
+
+def _build(**options):
+    return build_layouts(
+        INPUTS,
+        maximize_mixed=False,
+        center_enabled=True,
+        center_mode="Cała warstwa",
+        shift_even=False,
+        **options,
+    )
+
+
+def test_profile_reports_stages_generators_and_dedupe():
+    seen = []
+    profiler = Profiler(callback=lambda name, seconds: seen.append(name))
+    result = _build(extended_library=True, filter_sanity=True, profiler=profiler)
+
+    report = result.profile
+    stages = {timing.name: timing for timing in report.stages}
+    assert {"generate", "score", "center_layout", "is_sane", "sequencer"} <= set(
+        stages
+    )
+    assert stages["center_layout"].calls == report.candidates
+    assert "dynamic" in {timing.name for timing in report.generators}
+    assert sum(t.items for t in report.generators) == report.candidates
+    assert 0 < report.unique <= report.candidates
+    assert 0.0 <= report.dedupe_ratio < 1.0
+    assert "generator:dynamic" in seen and "sequencer" in seen
+    # Mirror twins share one score, so only symmetry classes are scored.
+    scored = report.as_dict()["stages"]["score"]["items"]
+    assert report.unique <= scored <= report.candidates
+    assert stages["symmetry"].items == report.candidates
+    hits, misses = report.memo["interlock_block"]
+    assert hits > 0 and report.as_dict()["memo"]["interlock_block"]["hits"] == hits
+
+
+def test_profile_counts_memo_hits_inside_worker_processes():
+    inline = _build(extended_library=True).profile.memo
+    with create_executor(2) as pool:
+        pooled = _build(extended_library=True, executor=pool).profile.memo
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        threaded = _build(extended_library=True, executor=pool).profile.memo
+
+    # Worker caches may start warm or cold, but every lookup is counted.
+    assert pooled["interlock_block"][0] > 0
+    assert sum(pooled["interlock_block"]) == sum(inline["interlock_block"])
+    assert threaded == {}
+
+
+def test_profile_with_executor_matches_serial_generators():
+    serial = _build().profile
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        parallel = _build(executor=pool).profile
+    assert [(t.name, t.items) for t in parallel.generators] == [
+        (t.name, t.items) for t in serial.generators
+    ]
+
+
+def test_cache_hit_profile(tmp_path):
+    cache = LayoutCache(tmp_path / "layouts.sqlite3")
+    first = _build(cache=cache).profile
+    second = _build(cache=cache).profile
+    assert not first.cache_hit and second.cache_hit
+    assert second.candidates == first.candidates
+    assert [timing.name for timing in second.stages] == ["cache_lookup"]
+    assert "pamięci podręcznej" in profile_summary(second)
+
+
+def test_profile_rows_list_stages_before_generators():
+    report = _build().profile
+    rows = profile_rows(report)
+    assert len(rows) == len(report.stages) + len(report.generators)
+    assert rows[-1][0].startswith("generator: ")
+    assert profile_rows(None) == []
@@ -1,6 +1,7 @@
 import pytest
 
 from palletizer_core.models import Carton, Pallet
+from palletizer_core.selector import PatternSelector
 from palletizer_core.sequencer import EvenOddSequencer
 
 
@@ -46,3 +47,36 @@ def test_allow_offsets_filters_low_support():
     )
     even, odd = seq.best_shift()
     assert odd == even
+
+
+@pytest.mark.parametrize(
+    "carton, pallet",
+    [
+        (Carton(200, 150), Pallet(1200, 800)),
+        (Carton(333.3, 211.7), Pallet(1200, 1000)),
+        (Carton(250, 150), Pallet(1000, 800)),
+    ],
+)
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"allow_offsets": True}, {"allow_offsets": True, "min_support": 0.5}],
+)
+def test_incremental_shift_matches_legacy_search(carton, pallet, options):
+    patterns = PatternSelector(carton, pallet).generate_all(extended_library=True)
+    for pattern in patterns.values():
+        if not pattern:
+            continue
+        inset = [(x * 0.9 + 7.5, y * 0.9, w, length) for x, y, w, length in pattern]
+        for layer in (pattern, inset):
+            legacy = EvenOddSequencer(
+                layer, carton, pallet, incremental=False, **options
+            )
+            fast = EvenOddSequencer(layer, carton, pallet, **options)
+            assert fast.best_shift() == legacy.best_shift()
+
+
+def test_incremental_shift_skips_overlapping_layer():
+    pattern = [(0, 0, 100, 100), (50, 0, 100, 100)]
+    seq = EvenOddSequencer(pattern, Carton(100, 100), Pallet(300, 200))
+    even, odd = seq.best_shift()
+    assert odd is even
@@ -0,0 +1,51 @@
+import pickle
+
+from palletizer_core.signature import Signature, canonicalize, layout_signature
+from palletizer_core.transformations import apply_transformation
+
+LAYOUT = [(0, 0, 300, 200), (300, 0, 200, 300), (0, 200, 300, 200)]
+
+
+def test_signature_ignores_translation_and_order():
+    shifted = [(x + 50, y + 25, w, length) for x, y, w, length in reversed(LAYOUT)]
+    assert layout_signature(shifted) == layout_signature(LAYOUT)
+    assert hash(layout_signature(shifted)) == hash(layout_signature(LAYOUT))
+
+
+def test_signature_str_matches_canonical_tuple():
+    signature = layout_signature(LAYOUT, eps=0.5)
+    assert str(signature) == str(tuple(canonicalize(LAYOUT, eps=0.5)))
+    assert str(signature) == (
+        "((0.0, 0.0, 300.0, 200.0), (300.0, 0.0, 200.0, 300.0),"
+        " (0.0, 200.0, 300.0, 200.0))"
+    )
+
+
+def test_signature_tolerates_eps_noise():
+    noisy = [LAYOUT[0], (300.1, 0.1, 200, 300), LAYOUT[2]]
+    assert layout_signature(noisy, eps=0.5) == layout_signature(LAYOUT, eps=0.5)
+    assert layout_signature(noisy) != layout_signature(LAYOUT)
+
+
+def test_symmetric_signature_collapses_pallet_mirrors():
+    plain = layout_signature(LAYOUT)
+    for transform in (
+        "Odbicie wzdłuż dłuższego boku",
+        "Odbicie wzdłuż krótszego boku",
+        "Obrót 180°",
+    ):
+        mirrored = apply_transformation(LAYOUT, transform, 1200, 800)
+        assert layout_signature(mirrored) != plain
+        assert layout_signature(mirrored, symmetric=True) == layout_signature(
+            LAYOUT, symmetric=True
+        )
+
+
+def test_signature_pickles_and_orders():
+    signature = layout_signature(LAYOUT)
+    restored = pickle.loads(pickle.dumps(signature))
+    assert restored == signature
+    assert hash(restored) == hash(signature)
+    smaller = layout_signature(LAYOUT[:1])
+    assert sorted([signature, smaller]) == [smaller, signature]
+    assert layout_signature([]) == Signature((), 1e-6)
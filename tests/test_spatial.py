@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from palletizer_core.engine import group_cartons
+from palletizer_core.sanity import connected_components
+from palletizer_core.spatial import (
+    OVERLAP,
+    TOUCH,
+    DisjointSet,
+    boxes_overlap,
+    boxes_touch,
+    candidate_pairs,
+    connected_groups,
+    count_components,
+)
+
+
+def _all_pairs_groups(layout, linked):
+    components = DisjointSet(len(layout))
+    for i in range(len(layout)):
+        for j in range(i + 1, len(layout)):
+            if linked(layout[i], layout[j]):
+                components.union(i, j)
+    return components.groups()
+
+
+def test_touch_and_overlap_semantics():
+    layout = [(0.0, 0.0, 10.0, 10.0), (10.0, 0.0, 10.0, 10.0), (30.0, 0.0, 10.0, 10.0)]
+
+    assert connected_groups(layout, mode=TOUCH) == [[0, 1], [2]]
+    assert connected_groups(layout, mode=OVERLAP) == [[0], [1], [2]]
+    assert count_components(layout, mode=TOUCH, eps=10.0) == 1
+
+
+def test_groups_match_all_pairs_reference():
+    rng = random.Random(11)
+    for _ in range(300):
+        layout = [
+            (
+                rng.randint(0, 30) * 5.0,
+                rng.randint(0, 30) * 5.0,
+                rng.choice([10.0, 20.0, 0.0, 400.0]),
+                rng.choice([10.0, 30.0, 5.0]),
+            )
+            for _ in range(rng.randint(0, 40))
+        ]
+        for eps in (1e-6, 2.0):
+            expected = _all_pairs_groups(layout, lambda a, b: boxes_touch(a, b, eps))
+            assert connected_groups(layout, mode=TOUCH, eps=eps) == expected
+            assert count_components(layout, mode=TOUCH, eps=eps) == len(expected)
+        expected = _all_pairs_groups(layout, boxes_overlap)
+        assert connected_groups(layout, mode=OVERLAP) == expected
+
+
+def test_candidate_pairs_are_unique():
+    layout = [(0.0, 0.0, 100.0, 100.0)] + [
+        (col * 10.0, row * 10.0, 10.0, 10.0) for col in range(5) for row in range(5)
+    ]
+    pairs = list(candidate_pairs(layout, margin=1e-6))
+
+    assert len(pairs) == len(set(pairs))
+    assert all(i < j for i, j in pairs)
+    assert {(0, j) for j in range(1, len(layout))} <= set(pairs)
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        connected_groups([(0.0, 0.0, 1.0, 1.0)], mode="adjacent")
+
+
+def test_sanity_and_engine_use_shared_index():
+    layout = [(0.0, 0.0, 10.0, 10.0), (5.0, 5.0, 10.0, 10.0), (10.0, 20.0, 5.0, 5.0)]
+
+    assert connected_components(layout) == 2
+    assert connected_components([]) == 0
+    assert group_cartons(layout) == [layout[:2], layout[2:]]
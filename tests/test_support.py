@@ -1,4 +1,7 @@
+import random
+
 from palletizer_core.support import (
+    SupportIndex,
     avg_support_fraction,
     min_support_fraction,
     support_fraction_per_box,
@@ -30,3 +33,22 @@ def test_support_no_coverage():
     assert support == [0.0]
     assert min_support_fraction(layer_above, layer_below) == 0.0
     assert avg_support_fraction(layer_above, layer_below) == 0.0
+
+
+def test_support_index_matches_pairwise_fractions():
+    rng = random.Random(3)
+    layer_below = [
+        (rng.uniform(0, 900), rng.uniform(0, 700), rng.choice([100.0, 250.0]), 150.0)
+        for _ in range(40)
+    ]
+    layer_above = [
+        (rng.uniform(0, 900), rng.uniform(0, 700), rng.choice([100.0, 0.0]), 150.0)
+        for _ in range(40)
+    ]
+    index = SupportIndex(layer_below)
+
+    expected = support_fraction_per_box(layer_above, layer_below)
+    assert [index.support_fraction(box) for box in layer_above] == expected
+    assert index.min_support_fraction(layer_above) == min(expected)
+    assert index.meets_support(layer_above, min(expected))
+    assert not index.meets_support(layer_above, min(expected) + 1e-9)
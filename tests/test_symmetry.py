@@ -0,0 +1,76 @@
+import pytest
+
+from palletizer_core.engine import PalletInputs, build_layouts
+from palletizer_core.models import Carton, Pallet
+from palletizer_core.pattern_families import iter_block2
+from palletizer_core.signature import layout_signature
+from palletizer_core.symmetry import (
+    PALLET_SYMMETRIES,
+    find_symmetry,
+    symmetric_images,
+    transform_rect,
+)
+from palletizer_core.transformations import apply_transformation
+
+LAYOUT = [(0, 0, 300, 200), (300, 0, 200, 300), (0, 200, 300, 200)]
+
+
+@pytest.mark.parametrize("pallet_w, pallet_l", [(1200, 800), (800, 1200)])
+@pytest.mark.parametrize("transform", PALLET_SYMMETRIES)
+def test_transform_rect_matches_layer_transformation(transform, pallet_w, pallet_l):
+    expected = apply_transformation(LAYOUT, transform, pallet_w, pallet_l)
+    assert [
+        transform_rect(rect, transform, pallet_w, pallet_l) for rect in LAYOUT
+    ] == expected
+
+
+def test_find_symmetry_recognises_mirrors_but_not_translations():
+    for transform, image in symmetric_images(LAYOUT, 1200, 800):
+        assert find_symmetry(LAYOUT, image, 1200, 800) == transform
+    shifted = [(x + 10, y, w, length) for x, y, w, length in LAYOUT]
+    assert find_symmetry(LAYOUT, shifted, 1200, 800) is None
+    with pytest.raises(ValueError):
+        transform_rect(LAYOUT[0], "Obrót 90°", 1200, 800)
+
+
+def test_block_descriptors_keep_one_pattern_per_mirror_class():
+    seen = {}
+    merged = 0
+    for descriptor in iter_block2(Carton(300, 200), Pallet(1200, 800)):
+        twin = seen.setdefault(descriptor.key(), descriptor)
+        if twin is not descriptor:
+            merged += 1
+            assert layout_signature(
+                twin.materialize(), symmetric=True
+            ) == layout_signature(descriptor.materialize(), symmetric=True)
+    assert merged
+
+
+def test_mirror_twins_share_scores():
+    inputs = PalletInputs(
+        pallet_w=1200,
+        pallet_l=800,
+        pallet_h=144,
+        box_w=250,
+        box_l=160,
+        box_h=100,
+        thickness=0,
+        spacing=0,
+        slip_count=0,
+        num_layers=4,
+        max_stack=0,
+        include_pallet_height=False,
+    )
+    result = build_layouts(
+        inputs,
+        maximize_mixed=False,
+        center_enabled=False,
+        center_mode="Cała warstwa",
+        shift_even=False,
+        extended_library=True,
+    )
+
+    stages = {timing.name: timing for timing in result.profile.stages}
+    assert stages["score"].items < result.profile.candidates
+    for key, score in result.scores.items():
+        assert score.name and score.display_name == result.display_map[key]